@@ -0,0 +1,650 @@
+#!/usr/bin/env python3
+"""
+Synthetic spec trees and benchmarks for index.py, validate.py and stats.py.
+
+generate writes a reproducible why/what/how tree: the same seed and
+parameters always give the same files. Every spec follows its schema
+(const $schema, id and version patterns, enums, required fields and
+required sections), and references point at other generated specs. Tunable:
+    --specs         number of specs (one vision, ~10% why, ~55% what, ~35% how)
+    --ref-density   average references per spec
+    --cycle-rate    fraction of specs that close a reference cycle (length 2-4)
+    --broken-rate   fraction of specs with a reference to a missing spec
+    --depth         directory levels under each type directory
+    --body-lines    average body length in lines (large specs included)
+
+run generates (or reuses) one tree per size and times each phase in
+process: walk, read, hash, frontmatter parse, ref extraction, section
+parse, full and incremental index builds, index write and load, every
+validation check, stats; then the index.py, validate.py and stats
+commands end to end. Times are the best of --repeat runs. A second pass
+records each phase's peak traced memory (commands: peak RSS).
+
+--save writes the results as a baseline (sorted, rounded JSON, so a
+change shows up as a readable diff); --compare prints the change against
+one and exits 1 if any phase slowed down by more than --threshold percent.
+Baselines record the machine (CPU model and count, Python) and are only
+meaningful on it: against one recorded elsewhere --compare reports the
+changes but does not fail. bench/.gitignore keeps them out of git.
+
+Lives outside scripts/ so that projects set up by spec-init do not get it;
+it runs the skill's scripts/ directly.
+
+Usage:
+    python3 bench/bench.py generate /tmp/tree --specs 5000 --seed 7
+    python3 bench/bench.py run --sizes 100,1000,10000 --save bench/baseline.json
+    python3 bench/bench.py run --sizes 100,1000,10000 --compare bench/baseline.json
+"""
+
+import hashlib
+import json
+import os
+import platform
+import random
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, timedelta
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).resolve().parent.parent / 'scripts'
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+from index import TYPE_PATHS  # noqa: E402
+
+BENCH_VERSION = 1
+
+# Share of the non-vision specs in each layer
+LAYER_SHARE = (('why', 0.10), ('what', 0.55), ('how', 0.35))
+LAYER_TYPES = {
+    'why': ['goal', 'persona', 'constraint', 'decision'],
+    'what': ['entity', 'feature', 'rule', 'journey', 'interface'],
+    'how': ['agent', 'skill', 'lens', 'workflow', 'stack'],
+}
+# Specs per leaf directory when --depth > 0, and directories per level
+DIR_SPECS = 50
+DIR_FANOUT = 8
+OPTIONAL_RATE = 0.3
+
+DEFAULTS = {
+    'specs': 1000,
+    'seed': 1,
+    'ref_density': 3.0,
+    'cycle_rate': 0.01,
+    'broken_rate': 0.0,
+    'depth': 1,
+    'body_lines': 40,
+}
+
+WORDS = ('order customer payment invoice account checkout cart product price discount '
+         'shipping address refund tax report audit session token login profile search '
+         'catalog stock warehouse delivery notice retry limit batch export import queue '
+         'event schedule review approve reject archive sync cache policy rule owner').split()
+KEYWORDS = ('MUST', 'SHOULD', 'MAY')
+PLAIN_RE = re.compile(r'[A-Za-z][\w./-]*(?: [\w./-]+)*')
+YAML_WORDS = {'true', 'false', 'yes', 'no', 'on', 'off', 'null', 'y', 'n'}
+
+# ---------------------------------------------------------------------------
+# Tree generation
+# ---------------------------------------------------------------------------
+
+def phrase(rng, count=3):
+    return ' '.join(rng.choice(WORDS) for _ in range(count))
+
+def sentence(rng):
+    return f"The {phrase(rng, 2)} {rng.choice(KEYWORDS)} {phrase(rng, rng.randint(3, 8))}."
+
+def spec_id(spec_type, n):
+    """TYPE-NNN ids; past 999 the prefix grows (FEATB-000), so ids stay unique and match the schema."""
+    prefix = spec_type.upper()[:4]
+    block = n // 1000
+    while block:
+        block, digit = divmod(block - 1, 26)
+        prefix += chr(ord('A') + digit)
+    return f"{prefix}-{n % 1000:03d}"
+
+def spec_path(spec_type, n, depth):
+    """Path of the n-th spec of a type, nested depth directories below its type directory."""
+    if spec_type == 'vision':
+        return 'why/vision.md'
+    dirs = [f"g{(n // DIR_SPECS // DIR_FANOUT ** level) % DIR_FANOUT}" for level in reversed(range(depth))]
+    return '/'.join([TYPE_PATHS[spec_type]] + dirs + [f"{spec_type}-{n:05d}.md"])
+
+def is_ref_rule(rule):
+    return rule.get('type') == 'ref' or (rule.get('type') == 'list' and (rule.get('items') or {}).get('type') == 'ref')
+
+def pick_status(rule, rng):
+    values = [str(v) for v in rule.get('values') or []]
+    roll = rng.random()
+    if 'active' in values and roll < 0.65:
+        return 'active'
+    if 'deprecated' in values and roll > 0.97:
+        return 'deprecated'
+    others = [v for v in values if v not in ('active', 'deprecated')]
+    return rng.choice(others or values)
+
+def field_value(rule, rng, pick_ref):
+    """A value that passes the schema rule."""
+    if 'const' in rule:
+        return rule['const']
+    kind = rule.get('type', 'any')
+    if kind == 'enum':
+        return rng.choice(rule.get('values') or [''])
+    if kind == 'ref':
+        return pick_ref()
+    if kind == 'list':
+        low = rule.get('min') or 1
+        high = rule.get('max') or low + 2
+        items = rule.get('items') or {'type': 'string'}
+        return [field_value(items, rng, pick_ref) for _ in range(rng.randint(low, max(low, high)))]
+    if kind == 'object':
+        return object_value(rule.get('fields') or {}, rng, pick_ref)
+    if kind == 'union':
+        variant = rng.choice(rule['variants'])
+        return dict({'$type': variant.get('tag')}, **object_value(variant.get('fields') or {}, rng, pick_ref))
+    if kind == 'date':
+        return (date(2024, 1, 1) + timedelta(days=rng.randint(0, 700))).isoformat()
+    if kind in ('number', 'integer'):
+        return rng.randint(int(rule.get('min') or 1), int(rule.get('max') or 10))
+    if kind == 'boolean':
+        return rng.random() < 0.5
+    return phrase(rng, rng.randint(1, 3))
+
+def object_value(fields, rng, pick_ref):
+    return {name: field_value(sub, rng, pick_ref) for name, sub in fields.items()
+            if sub.get('required') or rng.random() < OPTIONAL_RATE}
+
+def yaml_scalar(value):
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, (int, float)):
+        return str(value)
+    text = str(value)
+    if PLAIN_RE.fullmatch(text) and text.lower() not in YAML_WORDS:
+        return text
+    return json.dumps(text)
+
+def yaml_lines(key, value, indent=''):
+    """Block YAML for one key; short scalar lists in flow style, like hand-written specs."""
+    if isinstance(value, dict):
+        lines = [f"{indent}{key}:"]
+        for sub_key, sub_value in value.items():
+            lines += yaml_lines(sub_key, sub_value, indent + '  ')
+        return lines
+    if isinstance(value, list):
+        if all(not isinstance(item, (dict, list)) for item in value):
+            if len(value) <= 3 and not any('/' in str(item) for item in value):
+                return [f"{indent}{key}: [{', '.join(yaml_scalar(item) for item in value)}]"]
+            return [f"{indent}{key}:"] + [f"{indent}  - {yaml_scalar(item)}" for item in value]
+        lines = [f"{indent}{key}:"]
+        for item in value:
+            item_lines = []
+            for sub_key, sub_value in item.items():
+                item_lines += yaml_lines(sub_key, sub_value, indent + '    ')
+            if not item_lines:
+                lines.append(f"{indent}  - {{}}")
+                continue
+            lines.append(f"{indent}  - {item_lines[0].lstrip()}")
+            lines += item_lines[1:]
+        return lines
+    return [f"{indent}{key}: {yaml_scalar(value)}"]
+
+def section_lines(definitions, rng, level=2):
+    """Markdown for schema sections: every required one, optional ones some of the time."""
+    lines = []
+    for definition in definitions:
+        if not definition.get('required') and rng.random() >= OPTIONAL_RATE:
+            continue
+        if definition.get('heading'):
+            headings = [definition['heading']]
+        else:
+            pattern = definition.get('pattern', '*')
+            headings = [pattern.replace('*', phrase(rng, 2).capitalize()) for _ in range(rng.randint(1, 2))]
+        for heading in headings:
+            lines += ['', f"{'#' * level} {heading}", '']
+            content = definition.get('content', 'any')
+            if content == 'list':
+                count = max(definition.get('min_items') or 0, 1) + rng.randint(0, 2)
+                lines += [f"- {sentence(rng)}" for _ in range(count)]
+            elif content != 'none':
+                lines.append(sentence(rng))
+            lines += section_lines(definition.get('sections') or [], rng, level + 1)
+    return lines
+
+def plan_tree(params):
+    """[(type, n, path)] for every spec: the vision first, then why, what and how in a shuffled type mix."""
+    rng = random.Random(f"{params['seed']}:plan")
+    rest = params['specs'] - 1
+    counts = {}
+    plan = [('vision', 0, 'why/vision.md')]
+    for layer, share in LAYER_SHARE:
+        size = round(rest * share) if layer != 'how' else rest - len(plan) + 1
+        layer_specs = []
+        for _ in range(max(size, 0)):
+            spec_type = rng.choice(LAYER_TYPES[layer])
+            n = counts[spec_type] = counts.get(spec_type, 0) + 1
+            layer_specs.append((spec_type, n, spec_path(spec_type, n, params['depth'])))
+        plan += layer_specs
+    return plan[:params['specs']]
+
+def plan_refs(plan, params):
+    """
+    Reference targets per spec (indexes into plan). Specs refer to earlier
+    specs, mostly in the layer above, so the graph is acyclic except for
+    the cycles added on purpose; broken refs point at paths never generated.
+    """
+    rng = random.Random(f"{params['seed']}:refs")
+    layer_of = [path.split('/', 1)[0] for _, _, path in plan]
+    upstream = {'why': 'why', 'what': 'why', 'how': 'what'}
+    by_layer = {'why': [], 'what': [], 'how': []}
+    refs = [[] for _ in plan]
+    for i in range(1, len(plan)):
+        above = by_layer[upstream[layer_of[i]]] or [0]
+        count = min(i, int(rng.expovariate(1 / params['ref_density'])) if params['ref_density'] > 0 else 0)
+        targets = set()
+        for _ in range(count):
+            targets.add(rng.choice(above) if rng.random() < 0.6 else rng.randrange(i))
+        refs[i] = sorted(targets)
+        by_layer[layer_of[i]].append(i)
+
+    for i in range(1, len(plan)):
+        if rng.random() < params['cycle_rate'] and refs[i]:
+            # Walk 1-3 refs down from i and point back at it
+            node = i
+            for _ in range(rng.randint(1, 3)):
+                if not refs[node]:
+                    break
+                node = rng.choice(refs[node])
+            if node != i and i not in refs[node]:
+                refs[node].append(i)
+    return refs
+
+def spec_text(spec_type, n, schema, ref_paths, broken, rng, body_lines):
+    refs = [path[:-3] for path in ref_paths]
+    pool = list(refs)
+
+    def pick_ref():
+        return pool.pop() if pool else (refs[0] if refs else 'why/vision')
+
+    fields = schema['fields'] if schema else {}
+    frontmatter = {'$schema': spec_type, 'id': spec_id(spec_type, n),
+                   'title': phrase(rng, rng.randint(2, 4)).capitalize(),
+                   'status': pick_status(fields.get('status') or {'values': ['active']}, rng),
+                   'version': f"{rng.randint(0, 3)}.{rng.randint(0, 9)}.{rng.randint(0, 9)}"}
+    for name, rule in fields.items():
+        if name in frontmatter or not (rule.get('required') or (not is_ref_rule(rule) and rng.random() < OPTIONAL_RATE)):
+            continue
+        frontmatter[name] = field_value(rule, rng, pick_ref)
+    leftover = pool + (['what/missing/' + phrase(rng, 1) + f"-{n}"] if broken else [])
+    if leftover:
+        frontmatter['refs'] = leftover
+
+    lines = ['---']
+    for key, value in frontmatter.items():
+        lines += yaml_lines(key, value)
+    lines += ['---', '', f"# {frontmatter['title']}"]
+    lines += section_lines(schema['sections'] if schema else [], rng)
+    # Pad the body to a length spread around body_lines
+    target = rng.randint(body_lines // 2, body_lines * 3 // 2) if body_lines else 0
+    if len(lines) < target:
+        lines += ['', '## Notes', '']
+        while len(lines) < target:
+            lines.append(f"- {sentence(rng)}" if rng.random() < 0.5 else sentence(rng))
+    return '\n'.join(lines) + '\n'
+
+def generate_tree(root, **params):
+    """Write a synthetic spec tree into root/specs. Returns the number of specs written."""
+    from schema import find_schemas_dir, resolve_schemas
+
+    params = dict(DEFAULTS, **params)
+    specs_dir = Path(root) / 'specs'
+    if specs_dir.exists():
+        shutil.rmtree(specs_dir)
+    schemas_dir = find_schemas_dir(str(specs_dir))
+    schemas = resolve_schemas(schemas_dir) if schemas_dir else {}
+
+    plan = plan_tree(params)
+    refs = plan_refs(plan, params)
+    made = set()
+    for i, (spec_type, n, path) in enumerate(plan):
+        rng = random.Random(f"{params['seed']}:spec:{i}")
+        broken = rng.random() < params['broken_rate']
+        text = spec_text(spec_type, n, schemas.get(spec_type), [plan[j][2] for j in refs[i]], broken, rng,
+                         params['body_lines'])
+        target = specs_dir / path
+        if target.parent not in made:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            made.add(target.parent)
+        target.write_text(text)
+    return len(plan)
+
+# ---------------------------------------------------------------------------
+# Benchmarks
+# ---------------------------------------------------------------------------
+
+def bench_phases():
+    """
+    (name, setup, run) in order. Both take the shared state dict; setup is
+    untimed and prepares a run that has side effects (a previous index, an
+    empty parse cache).
+    """
+    import index
+    import stats
+    import validate
+    from model import SpecGraph
+    from parsecache import project_cache
+    from sections import parse_sections
+    from suggest import Suggester, TrigramIndex
+
+    def walk(state):
+        state['paths'] = index.walk_specs(state['specs_path'])
+
+    def read(state):
+        state['data'] = [(state['specs_path'] / path).read_bytes() for path in state['paths']]
+
+    def hash_all(state):
+        for data in state['data']:
+            index.blob_hash(data)
+
+    def frontmatter(state):
+        split = [index.split_frontmatter(data) for data in state['data']]
+        state['offsets'] = [offset for _, offset in split]
+        state['frontmatter'] = [index.load_frontmatter(text)[0] if text else {} for text, _ in split]
+
+    def refs(state):
+        index.normalize_ref.cache_clear()
+        for fm in state['frontmatter']:
+            index.extract_all_refs(fm)
+
+    def sections(state):
+        for data, offset in zip(state['data'], state['offsets']):
+            parse_sections(data, offset)
+
+    def clear_cache(state):
+        cache = project_cache(state['specs_dir'])
+        cache.clear()
+        cache.close()
+
+    def load_previous(state):
+        state['previous'] = index.read_index(os.path.join(state['specs_dir'], 'specs-index.json'))
+
+    def setup_validate(state):
+        state['schemas'], _ = validate.load_project_schemas(state['specs_dir'])
+        state['graph'] = SpecGraph.from_index(state['index'])
+
+    def cross_check(check):
+        return lambda state: check(state['index'], lambda item: None)
+
+    def spec_check(check, *args):
+        def run(state):
+            extra = [state[arg] for arg in args]
+            for path, spec in state['index']['specs'].items():
+                check(path, spec, *extra)
+        return run
+
+    phases = [
+        ('walk', None, walk),
+        ('read', None, read),
+        ('hash', None, hash_all),
+        ('parse.frontmatter', None, frontmatter),
+        ('parse.refs', None, refs),
+        ('parse.sections', None, sections),
+        ('index.build', None, lambda state: state.update(
+            index=index.build_index(state['specs_dir'], use_cache=False))),
+        ('index.write', None, lambda state: index.write_index(state['index'], state['specs_dir'])),
+        ('index.load', None, lambda state: index.read_index(os.path.join(state['specs_dir'], 'specs-index.json'))),
+        ('index.cache-fill', clear_cache, lambda state: index.build_index(state['specs_dir'])),
+        ('index.cached', None, lambda state: index.build_index(state['specs_dir'])),
+        ('index.incremental', load_previous, lambda state: index.build_index(state['specs_dir'], state['previous'])),
+        ('graph.build', None, lambda state: SpecGraph.from_index(state['index'])),
+        ('check1.broken-refs', setup_validate, cross_check(validate.check_broken_refs)),
+        ('check2.broken-parents', None, cross_check(validate.check_broken_parents)),
+        ('suggest.build', None, lambda state: TrigramIndex.from_specs(state['index']['specs'])),
+        ('check1.suggestions', None, lambda state: validate.check_broken_refs(
+            state['index'], lambda item: None, Suggester(state['index']['specs']))),
+        ('check3.orphans', None, cross_check(validate.check_orphans)),
+        ('check4.deprecated-refs', None, cross_check(validate.check_deprecated_refs)),
+        ('check5.fields', None, spec_check(validate.check_fields)),
+        ('check6.size', None, spec_check(validate.check_size, 'specs_dir')),
+        ('check7.cycles', None, lambda state: validate.check_cycles(state['index'], lambda item: None,
+                                                                     state['graph'])),
+        ('check8.layer', None, spec_check(validate.check_layer)),
+        ('check9.schema', None, spec_check(validate.check_schema, 'schemas')),
+        ('check10.duplicate-ids', None, cross_check(validate.check_duplicate_ids)),
+        ('validate', None, lambda state: validate.validate_index(state['index'], state['specs_dir'],
+                                                                 state['schemas'])),
+        ('validate.quick', None, lambda state: validate.validate_index(
+            state['index'], state['specs_dir'], checks=validate.select_checks(['quick']))),
+        ('stats', None, lambda state: stats.compute_stats(
+            state['index'], stats.unindexed_files(state['index'], state['specs_dir']))),
+    ]
+    return phases
+
+def command_phases():
+    """(name, argv) of the commands timed end to end (run with the tree's root as cwd)."""
+    stats_cmd = (['bash', str(SCRIPTS_DIR / 'stats.sh')] if (SCRIPTS_DIR / 'stats.sh').exists()
+                 else [sys.executable, str(SCRIPTS_DIR / 'stats.py')])
+    return [
+        ('cli.index', [sys.executable, str(SCRIPTS_DIR / 'index.py')]),
+        ('cli.index-incremental', [sys.executable, str(SCRIPTS_DIR / 'index.py'), '--incremental']),
+        ('cli.validate', [sys.executable, str(SCRIPTS_DIR / 'validate.py')]),
+        ('cli.stats', stats_cmd),
+    ]
+
+# Runs a command and prints its wall time (ms) and peak RSS. It is started
+# fresh so that the command is not forked from the (large) benchmark
+# process, whose RSS would count towards the command's peak.
+RSS_PROBE = """
+import os, subprocess, sys, time
+start = time.perf_counter()
+proc = subprocess.Popen(sys.argv[1:], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+usage = os.wait4(proc.pid, 0)[2]
+print((time.perf_counter() - start) * 1000, usage.ru_maxrss)
+"""
+
+def run_command(argv, cwd):
+    """Wall time (ms) and peak RSS (KiB) of one command."""
+    output = subprocess.run([sys.executable, '-c', RSS_PROBE] + argv, cwd=cwd, capture_output=True,
+                            text=True, check=True).stdout.split()
+    elapsed, rss = float(output[0]), int(output[1])
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    return elapsed, rss // 1024 if sys.platform == 'darwin' else rss
+
+def run_benchmarks(root, repeat=3, commands=True):
+    """{phase: {'ms': best wall time, 'cpu_ms': its CPU time, 'peak_kb': memory}} for the tree at root."""
+    specs_dir = os.path.join(root, 'specs')
+    state = {'specs_dir': specs_dir, 'specs_path': Path(specs_dir)}
+    for name in ('specs-index.json', 'specs-graph.json'):
+        if os.path.exists(os.path.join(specs_dir, name)):
+            os.unlink(os.path.join(specs_dir, name))
+    shutil.rmtree(os.path.join(specs_dir, '.cache'), ignore_errors=True)
+
+    results = {}
+    phases = bench_phases()
+    for name, setup, run in phases:
+        best = None
+        for _ in range(repeat):
+            if setup:
+                setup(state)
+            wall, cpu = time.perf_counter(), time.process_time()
+            run(state)
+            timing = ((time.perf_counter() - wall) * 1000, (time.process_time() - cpu) * 1000)
+            best = timing if best is None or timing[0] < best[0] else best
+        results[name] = {'ms': best[0], 'cpu_ms': best[1]}
+
+    # Memory pass: tracing slows everything down, so it is kept out of the timings
+    tracemalloc.start()
+    try:
+        for name, setup, run in phases:
+            if setup:
+                setup(state)
+            base = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            run(state)
+            results[name]['peak_kb'] = max(0, tracemalloc.get_traced_memory()[1] - base) // 1024
+    finally:
+        tracemalloc.stop()
+
+    if commands:
+        for name, argv in command_phases():
+            runs = [run_command(argv, root) for _ in range(repeat)]
+            elapsed = min(ms for ms, _ in runs)
+            results[name] = {'ms': elapsed, 'peak_kb': max(rss for _, rss in runs)}
+    return results
+
+def tree_root(workdir, params):
+    """Directory of the generated tree for these parameters (reused across runs)."""
+    key = hashlib.sha1(json.dumps([BENCH_VERSION, params], sort_keys=True).encode()).hexdigest()[:10]
+    return os.path.join(workdir, f"specs-{params['specs']}-{key}")
+
+def ensure_tree(workdir, params):
+    root = tree_root(workdir, params)
+    marker = os.path.join(root, 'generated.json')
+    if not os.path.exists(marker):
+        generate_tree(root, **params)
+        with open(marker, 'w') as f:
+            json.dump(params, f)
+    return root
+
+def rounded(results):
+    return {phase: {key: round(value, 2) if isinstance(value, float) else value for key, value in entry.items()}
+            for phase, entry in results.items()}
+
+def change(now, before):
+    return (now - before) / before * 100 if before else 0.0
+
+def print_results(size, results, baseline=None):
+    print(f"\n{size} specs")
+    header = f"  {'phase':<24}{'ms':>10}{'us/spec':>10}{'peak MB':>10}"
+    if baseline is not None:
+        header += f"{'baseline':>10}{'change':>9}"
+    print(header)
+    for phase, entry in results.items():
+        line = f"  {phase:<24}{entry['ms']:>10.1f}{entry['ms'] * 1000 / size:>10.1f}{entry['peak_kb'] / 1024:>10.1f}"
+        before = (baseline or {}).get(phase)
+        if before:
+            line += f"{before['ms']:>10.1f}{change(entry['ms'], before['ms']):>+8.0f}%"
+        print(line)
+
+def regressions(results, baseline, threshold, min_ms):
+    """[(size, phase, before, now)] slower than the baseline by threshold percent and at least min_ms."""
+    found = []
+    for size, phases in results.items():
+        for phase, entry in phases.items():
+            before = baseline.get(size, {}).get(phase)
+            if before and entry['ms'] - before['ms'] >= min_ms and change(entry['ms'], before['ms']) > threshold:
+                found.append((size, phase, before['ms'], entry['ms']))
+    return found
+
+def cpu_model():
+    try:
+        with open('/proc/cpuinfo') as f:
+            for line in f:
+                if line.startswith('model name'):
+                    return line.partition(':')[2].strip()
+    except OSError:
+        pass
+    return platform.processor() or platform.machine()
+
+def machine():
+    """What a baseline's timings depend on besides the code."""
+    return {
+        'cpu': cpu_model(),
+        'cpus': os.cpu_count(),
+        'python': platform.python_version(),
+        'platform': platform.system(),
+    }
+
+def add_tree_arguments(parser):
+    parser.add_argument('--seed', type=int, default=DEFAULTS['seed'])
+    parser.add_argument('--ref-density', type=float, default=DEFAULTS['ref_density'],
+                        help='Average references per spec')
+    parser.add_argument('--cycle-rate', type=float, default=DEFAULTS['cycle_rate'],
+                        help='Fraction of specs that close a reference cycle')
+    parser.add_argument('--broken-rate', type=float, default=DEFAULTS['broken_rate'],
+                        help='Fraction of specs with a broken reference')
+    parser.add_argument('--depth', type=int, default=DEFAULTS['depth'],
+                        help='Directory levels below each type directory')
+    parser.add_argument('--body-lines', type=int, default=DEFAULTS['body_lines'],
+                        help='Average body length in lines')
+
+def tree_params(args, specs):
+    return {'specs': specs, 'seed': args.seed, 'ref_density': args.ref_density, 'cycle_rate': args.cycle_rate,
+            'broken_rate': args.broken_rate, 'depth': args.depth, 'body_lines': args.body_lines}
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Synthetic spec trees and benchmarks.')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    gen = commands.add_parser('generate', help='Write a synthetic spec tree into DIR/specs')
+    gen.add_argument('dir')
+    gen.add_argument('--specs', type=int, default=DEFAULTS['specs'])
+    add_tree_arguments(gen)
+
+    run = commands.add_parser('run', help='Benchmark index/validate/stats on generated trees')
+    run.add_argument('--sizes', default='100,1000,10000', help='Comma-separated tree sizes (up to 100000)')
+    add_tree_arguments(run)
+    run.add_argument('--repeat', type=int, default=3, help='Runs per phase; the fastest counts')
+    run.add_argument('--no-commands', action='store_true', help='Skip the end-to-end command timings')
+    run.add_argument('--workdir', default=os.path.join(tempfile.gettempdir(), 'spec-bench'),
+                     help='Where generated trees are kept between runs')
+    run.add_argument('--save', metavar='FILE', help='Write the results as a baseline')
+    run.add_argument('--compare', metavar='FILE', help='Compare with a saved baseline')
+    run.add_argument('--threshold', type=float, default=25.0,
+                     help='With --compare, fail on phases slower by more than this percent')
+    run.add_argument('--min-ms', type=float, default=2.0,
+                     help='With --compare, ignore slowdowns smaller than this many milliseconds')
+    args = parser.parse_args()
+
+    if args.command == 'generate':
+        count = generate_tree(args.dir, **tree_params(args, args.specs))
+        print(f"Generated {count} specs in {os.path.join(args.dir, 'specs')}")
+        exit(0)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if baseline.get('params') != tree_params(args, None):
+            print(f"Note: {args.compare} was recorded with different tree parameters: {baseline.get('params')}")
+        same_machine = baseline.get('machine') == machine()
+        if not same_machine:
+            print(f"Note: {args.compare} was recorded on another machine ({baseline.get('machine')}); "
+                  f"changes are reported but do not fail the run")
+
+    sizes = [int(size) for size in args.sizes.split(',') if size.strip()]
+    results = {}
+    for size in sizes:
+        params = tree_params(args, size)
+        started = time.perf_counter()
+        root = ensure_tree(args.workdir, params)
+        print(f"Tree: {root} ({time.perf_counter() - started:.1f}s)", file=sys.stderr)
+        results[str(size)] = rounded(run_benchmarks(root, args.repeat, not args.no_commands))
+        print_results(size, results[str(size)], (baseline or {}).get('results', {}).get(str(size)))
+
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        with open(args.save, 'w') as f:
+            json.dump({
+                'bench_version': BENCH_VERSION,
+                'params': tree_params(args, None),
+                'machine': machine(),
+                'results': results,
+            }, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f"\nBaseline: {args.save}")
+
+    if baseline is not None:
+        slower = regressions(results, baseline.get('results', {}), args.threshold, args.min_ms)
+        if slower:
+            print(f"\nSlower than {args.compare} by more than {args.threshold:.0f}%:")
+            for size, phase, before, now in slower:
+                print(f"  {size} specs  {phase}: {before:.1f} ms -> {now:.1f} ms ({change(now, before):+.0f}%)")
+            exit(1 if same_machine else 0)
+        print(f"\nNo phase slower than {args.compare} by more than {args.threshold:.0f}%")
@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+Scan source code for @spec annotations and join them with specs-index.json.
+Run from project root (parent of specs/).
+
+Annotations name one or more spec ids, each optionally followed by
+#<blob hash prefix> (see references/integration-levels.md, level 5).
+
+Files are listed with git (honoring .gitignore) or, outside a git work
+tree, by walking the tree and applying .gitignore files (negation and **
+included; core.excludesFile and .git/info/exclude are not read). Each file is
+prefiltered with a plain byte search for "@spec" before any regex work,
+scanned on a thread pool, and cached by mtime/size in specs/.cache/.
+"""
+
+import json
+import mmap
+import os
+import re
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from index import MMAP_THRESHOLD, write_json_atomic
+
+MARKER = b'@spec'
+ANNOTATION_RE = re.compile(rb'@spec((?:[ \t,]+[A-Z][A-Z0-9]*-\d+(?:#[0-9a-fA-F]{4,40})?)+)')
+REF_RE = re.compile(rb'([A-Z][A-Z0-9]*-\d+)(?:#([0-9a-fA-F]{4,40}))?')
+
+# Bump when the cached per-file result format changes
+CACHE_VERSION = 1
+
+def git_files(root):
+    """Tracked and untracked, non-ignored files under root, or None outside git."""
+    try:
+        result = subprocess.run(
+            ['git', 'ls-files', '-z', '-c', '-o', '--exclude-standard', '--', '.'],
+            cwd=root, capture_output=True, check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return sorted({path for path in result.stdout.decode('utf-8', 'replace').split('\0') if path})
+
+def compile_gitignore(pattern):
+    """
+    (regex, negate, dir_only) for one .gitignore line, or None for blank
+    lines and comments. The regex matches paths relative to the directory
+    holding the .gitignore.
+    """
+    pattern = pattern.rstrip()
+    if not pattern or pattern.startswith('#'):
+        return None
+    negate = pattern.startswith('!')
+    if negate or pattern.startswith(('\\#', '\\!')):
+        pattern = pattern[1:]
+    dir_only = pattern.endswith('/')
+    pattern = pattern.rstrip('/')
+    anchored = '/' in pattern  # a slash anywhere but the end anchors to the directory
+    pattern = pattern.lstrip('/')
+
+    out = []
+    i = 0
+    while i < len(pattern):
+        ch = pattern[i]
+        if pattern.startswith('**', i) and (i == 0 or pattern[i - 1] == '/'):
+            if i + 2 == len(pattern):
+                out.append('.*')           # "dir/**": everything inside
+                i += 2
+                continue
+            if pattern[i + 2] == '/':
+                out.append('(?:.*/)?')     # "**/": any number of directories
+                i += 3
+                continue
+        if ch == '*':
+            out.append('[^/]*')
+        elif ch == '?':
+            out.append('[^/]')
+        elif ch == '[' and pattern.find(']', i + 2) > 0:
+            end = pattern.find(']', i + 2)
+            body = pattern[i + 1:end]
+            out.append('[' + ('^' + body[1:] if body.startswith('!') else body) + ']')
+            i = end
+        elif ch == '\\' and i + 1 < len(pattern):
+            i += 1
+            out.append(re.escape(pattern[i]))
+        else:
+            out.append(re.escape(ch))
+        i += 1
+    return re.compile(('' if anchored else '(?:.*/)?') + ''.join(out)), negate, dir_only
+
+def read_gitignore(directory):
+    """Compiled rules from a directory's .gitignore (see compile_gitignore)."""
+    path = os.path.join(directory, '.gitignore')
+    if not os.path.exists(path):
+        return []
+    with open(path, errors='replace') as f:
+        rules = [compile_gitignore(line) for line in f]
+    return [rule for rule in rules if rule]
+
+def is_ignored(rel_path, is_dir, rules):
+    """
+    Match a path (relative to root) against (base, regex, negate, dir_only)
+    rules, outer .gitignore files first: as in git, the last match decides.
+    """
+    ignored = False
+    for base, regex, negate, dir_only in rules:
+        if base:
+            if not rel_path.startswith(base + '/'):
+                continue
+            local = rel_path[len(base) + 1:]
+        else:
+            local = rel_path
+        if dir_only and not is_dir:
+            continue
+        if regex.fullmatch(local):
+            ignored = not negate
+    return ignored
+
+def walk_files(root):
+    """Walk root honoring .gitignore files (fallback when git is unavailable)."""
+    root = Path(root)
+    files = []
+    rules_by_dir = {}
+    for current, dirs, names in os.walk(root):
+        rel_dir = Path(current).relative_to(root).as_posix()
+        rel_dir = '' if rel_dir == '.' else rel_dir
+        parent = rel_dir.rsplit('/', 1)[0] if '/' in rel_dir else ''
+        rules = list(rules_by_dir.get(parent, [])) if rel_dir else []
+        rules += [(rel_dir, *rule) for rule in read_gitignore(current)]
+        rules_by_dir[rel_dir] = rules
+
+        prefix = f"{rel_dir}/" if rel_dir else ''
+        dirs[:] = sorted(d for d in dirs
+                         if not d.startswith('.') and not is_ignored(prefix + d, True, rules))
+        files.extend(prefix + name for name in names if not is_ignored(prefix + name, False, rules))
+    return sorted(files)
+
+def scan_file(filepath):
+    """
+    Find @spec annotations in one file. Returns [[line, spec_id, hash], ...].
+    Files without the "@spec" bytes are rejected before any regex runs.
+    """
+    try:
+        with open(filepath, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if size == 0:
+                return []
+            if size >= MMAP_THRESHOLD:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                    return _scan_buffer(data)
+            return _scan_buffer(f.read())
+    except OSError:
+        return []
+
+def _scan_buffer(data):
+    start = data.find(MARKER)
+    if start < 0:
+        return []
+
+    found = []
+    line = 1
+    pos = 0
+    for match in ANNOTATION_RE.finditer(data, start):
+        line += data[pos:match.start()].count(b'\n')
+        pos = match.start()
+        for ref in REF_RE.finditer(match.group(1)):
+            spec_hash = ref.group(2).decode().lower() if ref.group(2) else None
+            found.append([line, ref.group(1).decode(), spec_hash])
+    return found
+
+def load_cache(cache_file, root):
+    if cache_file and cache_file.exists():
+        try:
+            with open(cache_file) as f:
+                cache = json.load(f)
+            if cache.get('version') == CACHE_VERSION and cache.get('root') == str(root):
+                return cache['files']
+        except (OSError, ValueError, KeyError):
+            pass
+    return {}
+
+def scan_tree(root='.', exclude=(), cache_file=None, jobs=None):
+    """
+    Scan every non-ignored file under root. Returns {rel_path: annotations}
+    for files that contain at least one annotation.
+    """
+    root = Path(root).resolve()
+    files = git_files(root)
+    if files is None:
+        files = walk_files(root)
+    files = [path for path in files if not any(path == ex or path.startswith(ex + '/') for ex in exclude)]
+
+    cached = load_cache(cache_file, root)
+    results = {}
+    signatures = {}
+    to_scan = []
+    for path in files:
+        try:
+            st = os.stat(root / path)
+        except OSError:
+            continue
+        signature = [st.st_mtime_ns, st.st_size]
+        signatures[path] = signature
+        entry = cached.get(path)
+        if entry and entry['stat'] == signature:
+            results[path] = entry['annotations']
+        else:
+            to_scan.append(path)
+
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        for path, found in zip(to_scan, pool.map(scan_file, [root / path for path in to_scan])):
+            results[path] = found
+
+    if cache_file:
+        write_json_atomic(cache_file, {
+            'version': CACHE_VERSION,
+            'root': str(root),
+            'files': {path: {'stat': signatures[path], 'annotations': results[path]} for path in results},
+        })
+    return {path: found for path, found in sorted(results.items()) if found}
+
+def coverage_report(index, annotated_files):
+    """
+    Join annotations with the spec index.
+
+    Returns a dict with 'annotations' (total count), 'files', 'annotated'
+    ({spec_path: [locations]}), 'unannotated' (spec paths), 'dangling'
+    (annotations naming unknown spec ids) and 'outdated' (annotations whose
+    hash does not match the spec's current hash).
+    """
+    by_id = {spec['id']: path for path, spec in index['specs'].items() if isinstance(spec.get('id'), str)}
+    report = {'annotations': 0, 'files': len(annotated_files), 'annotated': {},
+              'unannotated': [], 'dangling': [], 'outdated': []}
+
+    for file_path, found in annotated_files.items():
+        for line, spec_id, spec_hash in found:
+            report['annotations'] += 1
+            location = f"{file_path}:{line}"
+            spec_path = by_id.get(spec_id)
+            if not spec_path:
+                report['dangling'].append({'location': location, 'id': spec_id})
+                continue
+            report['annotated'].setdefault(spec_path, []).append(location)
+            current = index['specs'][spec_path]['hash']
+            if spec_hash and not (current.startswith(spec_hash) or spec_hash.startswith(current)):
+                report['outdated'].append({'location': location, 'id': spec_id,
+                                           'hash': spec_hash, 'current': current})
+
+    report['unannotated'] = [path for path in index['specs'] if path not in report['annotated']]
+    return report
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Report @spec annotation coverage.')
+    parser.add_argument('specs_dir', nargs='?', default='specs')
+    parser.add_argument('--root', default='.', help='Source tree to scan (default: current directory)')
+    parser.add_argument('--jobs', '-j', type=int, help='Scanner threads')
+    parser.add_argument('--no-cache', action='store_true', help='Rescan every file')
+    parser.add_argument('--json', action='store_true', help='Print the report as JSON')
+    args = parser.parse_args()
+
+    index_path = os.path.join(args.specs_dir, 'specs-index.json')
+    if not os.path.exists(index_path):
+        print(f"Index not found: {index_path}")
+        print("Run: python3 scripts/index.py first")
+        exit(1)
+    with open(index_path) as f:
+        index = json.load(f)
+
+    root = Path(args.root).resolve()
+    specs_path = Path(args.specs_dir).resolve()
+    exclude = []
+    if specs_path == root or root in specs_path.parents:
+        exclude.append(specs_path.relative_to(root).as_posix())
+    cache_file = None if args.no_cache else Path(args.specs_dir) / '.cache' / 'annotations.json'
+
+    report = coverage_report(index, scan_tree(root, exclude, cache_file, args.jobs))
+    if args.json:
+        print(json.dumps(report, indent=2))
+        exit(0)
+
+    print("Annotations:")
+    print(f"  Total:          {report['annotations']} annotations across {report['files']} files")
+    print(f"  Unique specs:   {len(report['annotated'])} specs referenced in code")
+    print(f"  Hash drift:     {len(report['outdated'])} annotations reference outdated spec versions")
+    print(f"  Unreferenced:   {len(report['unannotated'])} specs have no code annotations")
+    print(f"  Dangling:       {len(report['dangling'])} annotations reference unknown spec ids")
+
+    if report['outdated']:
+        print("\nHash drift:")
+        for item in report['outdated']:
+            print(f"  {item['location']}: {item['id']}#{item['hash']} (current {item['current']})")
+    if report['dangling']:
+        print("\nDangling:")
+        for item in report['dangling']:
+            print(f"  {item['location']}: {item['id']}")
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Compact in-memory model of the spec index.
+
+specs-index.json repeats every spec path in the specs map, the by_type,
+by_status and by_layer lists and every {from, to} reference, and
+json.load gives each occurrence its own string. In memory:
+
+- each spec entry is a SpecRecord (__slots__, no per-entry dict), which
+  still answers entry['field'] and entry.get('field') so every consumer
+  of the JSON shape keeps working;
+- paths, types, statuses and reference targets are interned, so all
+  occurrences share one string;
+- the reference graph is a SpecGraph: integer node ids with forward and
+  reverse edge lists packed into array('I') (offsets + targets), built
+  once and shared by specs-graph.json, the cycle check and the daemon.
+
+The JSON shape is produced only when writing (json_default, to_entry).
+"""
+
+import sys
+from array import array
+
+# Spec entry fields, in the order they appear in specs-index.json
+ENTRY_FIELDS = ('path', 'id', 'title', 'type', 'status', 'version', 'hash', 'blob', 'stat', 'lines',
+                'body_offset', 'sections', 'refs', 'parent', 'children', 'frontmatter', 'frontmatter_error')
+FIELD_SET = frozenset(ENTRY_FIELDS)
+INTERNED_FIELDS = frozenset(('path', 'type', 'status', 'parent'))
+
+def intern(value):
+    return sys.intern(value) if type(value) is str else value
+
+class SpecRecord:
+    """One spec entry. Behaves like the entry dict for reading and item assignment."""
+
+    __slots__ = ENTRY_FIELDS
+
+    @classmethod
+    def from_entry(cls, entry, **changes):
+        """Record from an entry dict (or another record), interning shared strings."""
+        record = cls()
+        if isinstance(entry, SpecRecord):
+            entry = entry.to_entry()
+        for field, value in (dict(entry, **changes) if changes else entry).items():
+            if field in INTERNED_FIELDS:
+                if type(value) is str:
+                    value = sys.intern(value)
+            elif field == 'refs':
+                value = [sys.intern(ref) for ref in value]
+            elif field not in FIELD_SET:
+                continue
+            setattr(record, field, value)
+        return record
+
+    def to_entry(self):
+        """The entry dict written to specs-index.json."""
+        return {field: getattr(self, field) for field in ENTRY_FIELDS if hasattr(self, field)}
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except (AttributeError, TypeError):
+            raise KeyError(key) from None
+
+    def __setitem__(self, key, value):
+        setattr(self, key, value)
+
+    def __contains__(self, key):
+        return key in FIELD_SET and hasattr(self, key)
+
+    def get(self, key, default=None):
+        return getattr(self, key, default) if key in FIELD_SET else default
+
+    def keys(self):
+        return [field for field in ENTRY_FIELDS if hasattr(self, field)]
+
+    def __eq__(self, other):
+        if isinstance(other, SpecRecord):
+            other = other.to_entry()
+        return self.to_entry() == other
+
+    def __repr__(self):
+        return f"SpecRecord({self.to_entry()!r})"
+
+def json_default(value):
+    """json.dump hook: write SpecRecords in the entry dict shape."""
+    if isinstance(value, SpecRecord):
+        return value.to_entry()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def intern_index(index):
+    """
+    Convert a loaded specs-index.json in place: entries become SpecRecords
+    and every repeated path string is shared. Returns the index (as is if
+    it is already in that form).
+    """
+    specs = index['specs']
+    if not any(type(entry) is dict for entry in specs.values()):
+        return index
+    for path in list(specs):
+        entry = specs.pop(path)
+        record = entry if isinstance(entry, SpecRecord) else SpecRecord.from_entry(entry)
+        specs[record.path] = record
+    for group in ('by_type', 'by_status', 'by_layer'):
+        index[group] = {intern(key): [intern(path) for path in paths] for key, paths in index[group].items()}
+    relationships = index['relationships']
+    relationships['refs'] = [{'from': intern(rel['from']), 'to': intern(rel['to'])} for rel in relationships['refs']]
+    relationships['parents'] = [{'child': intern(rel['child']), 'parent': intern(rel['parent'])}
+                                for rel in relationships['parents']]
+    relationships['orphans'] = [intern(path) for path in relationships['orphans']]
+    return index
+
+class SpecGraph:
+    """
+    The reference graph of an index. Node ids are positions in paths:
+    existing specs first (index order, which is sorted path order), then
+    referenced paths that do not exist. Edges are sorted and unique.
+
+    Works as the adjacency mapping the algorithms in graph.py expect
+    (iteration over nodes, get(node) -> successors).
+    """
+
+    __slots__ = ('paths', 'node', 'spec_count', 'offsets', 'targets', 'reverse_offsets', 'reverse_targets')
+
+    @classmethod
+    def from_index(cls, index):
+        specs = index['specs']
+        graph = cls()
+        paths = [intern(path) for path in specs]
+        resolved = {}
+        for rel in index['relationships']['refs']:
+            to_path = rel['to']
+            if to_path not in resolved:
+                stripped = to_path.lstrip('/')
+                resolved[to_path] = stripped if to_path not in specs and stripped in specs else to_path
+        paths += sorted({intern(to) for to in resolved.values() if to not in specs})
+
+        node = {path: i for i, path in enumerate(paths)}
+        forward = [set() for _ in paths]
+        reverse = [set() for _ in paths]
+        for rel in index['relationships']['refs']:
+            from_id = node[rel['from']]
+            to_id = node[resolved[rel['to']]]
+            forward[from_id].add(to_id)
+            reverse[to_id].add(from_id)
+
+        graph.paths = paths
+        graph.node = node
+        graph.spec_count = len(specs)
+        graph.offsets, graph.targets = pack(forward)
+        graph.reverse_offsets, graph.reverse_targets = pack(reverse)
+        return graph
+
+    def successors(self, node):
+        return self.targets[self.offsets[node]:self.offsets[node + 1]]
+
+    def predecessors(self, node):
+        return self.reverse_targets[self.reverse_offsets[node]:self.reverse_offsets[node + 1]]
+
+    # Adjacency mapping interface for graph.py's algorithms
+    def __iter__(self):
+        return iter(range(len(self.paths)))
+
+    def __len__(self):
+        return len(self.paths)
+
+    def get(self, node, default=()):
+        offsets = self.offsets
+        try:
+            return self.targets[offsets[node]:offsets[node + 1]]
+        except (IndexError, TypeError):
+            return default
+
+def pack(edge_sets):
+    """Pack per-node edge sets into (offsets, targets) arrays."""
+    offsets = array('I', [0])
+    targets = array('I')
+    for edges in edge_sets:
+        targets.extend(sorted(edges))
+        offsets.append(len(targets))
+    return offsets, targets
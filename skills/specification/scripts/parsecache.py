@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Content-addressed parse cache shared by index.py and validate.py.
+
+Results that depend only on a spec's bytes (parsed frontmatter, refs,
+section tree, line count) and on a spec's bytes plus its schema (schema
+check messages) are stored under specs/.cache/parse.sqlite, keyed by the
+git blob hash of the file and the frontmatter parser that read it
+(libyaml or the pure-Python one, which do not accept the same YAML). A
+spec that reappears with the same content (a branch switch, a revert, a
+rename, a fresh clone of the index) is therefore never parsed or checked
+twice.
+
+Values are JSON-like and stored with marshal, which is several times
+faster to encode and decode than json and about as compact for these
+small records. Lookups hit the database directly; new values are queued
+and written in one transaction by flush(), which also evicts the least
+recently used rows once the stored values grow past max_bytes.
+
+The cache is an optimization only: when sqlite3 is unavailable or the
+database cannot be used, every lookup misses and nothing is stored.
+
+Usage:
+    python3 scripts/parsecache.py            # Size and row count
+    python3 scripts/parsecache.py --clear    # Drop all cached results
+"""
+
+import marshal
+import os
+import time
+from pathlib import Path
+
+try:
+    import sqlite3
+except ImportError:  # Python built without sqlite
+    sqlite3 = None
+
+CACHE_VERSION = 1
+CACHE_NAME = 'parse.sqlite'
+DEFAULT_MAX_BYTES = 64 << 20
+# Eviction frees down to this fraction of max_bytes, so it does not run on every flush
+EVICT_TO = 0.8
+
+def cache_path(specs_dir='specs'):
+    return os.path.join(specs_dir, '.cache', CACHE_NAME)
+
+def encode(value):
+    return marshal.dumps(value)
+
+def decode(data):
+    """Stored value, or None if it cannot be read (e.g. written by a newer Python)."""
+    try:
+        return marshal.loads(data)
+    except (EOFError, ValueError, TypeError):
+        return None
+
+class ParseCache:
+    """Blob-hash keyed result cache in a SQLite file, with size-bounded LRU eviction."""
+
+    def __init__(self, path, max_bytes=DEFAULT_MAX_BYTES):
+        self.path = str(path)
+        self.max_bytes = max_bytes
+        self.pending = {}
+        self.used = set()
+        self._db = None
+        self._disabled = sqlite3 is None
+
+    def _connect(self):
+        if self._db is None and not self._disabled:
+            try:
+                Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+                db = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+                db.execute('PRAGMA journal_mode=WAL')
+                db.execute('PRAGMA synchronous=NORMAL')
+                if db.execute('PRAGMA user_version').fetchone()[0] != CACHE_VERSION:
+                    with db:
+                        db.execute('DROP TABLE IF EXISTS entries')
+                        db.execute('CREATE TABLE entries (key TEXT PRIMARY KEY, data BLOB NOT NULL, '
+                                   'size INTEGER NOT NULL, used INTEGER NOT NULL) WITHOUT ROWID')
+                        db.execute('CREATE INDEX entries_used ON entries (used)')
+                        db.execute(f'PRAGMA user_version={CACHE_VERSION}')
+                self._db = db
+            except (OSError, sqlite3.Error):
+                self._disabled = True
+        return self._db
+
+    def connect(self):
+        """Open the database now rather than on the first lookup. Returns whether it can be used."""
+        return self._connect() is not None
+
+    def get(self, key):
+        """Cached value for key, or None."""
+        if key in self.pending:
+            return self.pending[key]
+        db = self._connect()
+        if db is None:
+            return None
+        try:
+            row = db.execute('SELECT data FROM entries WHERE key = ?', (key,)).fetchone()
+        except sqlite3.Error:
+            return None
+        if row is None:
+            return None
+        self.used.add(key)
+        return decode(row[0])
+
+    def put(self, key, value):
+        """Queue a value; it is written by the next flush()."""
+        self.pending[key] = value
+
+    def take(self):
+        """Remove and return the queued values (worker processes hand them to the parent)."""
+        pending, self.pending = self.pending, {}
+        return pending
+
+    def update(self, values):
+        self.pending.update(values)
+
+    def flush(self):
+        """Write queued values, mark hits as recently used and evict down to max_bytes."""
+        if not self.pending and not self.used:
+            return
+        db = self._connect()
+        if db is None:
+            self.pending.clear()
+            self.used.clear()
+            return
+        now = time.time_ns()
+        rows = [(key, data, len(data), now) for key, data in
+                ((key, encode(value)) for key, value in self.pending.items())]
+        try:
+            with db:
+                db.executemany('INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?)', rows)
+                db.executemany('UPDATE entries SET used = ? WHERE key = ?',
+                               [(now, key) for key in self.used if key not in self.pending])
+                self._evict(db)
+        except sqlite3.Error:
+            pass
+        self.pending.clear()
+        self.used.clear()
+
+    def _evict(self, db):
+        total = db.execute('SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        excess = total - int(self.max_bytes * EVICT_TO)
+        doomed = []
+        for key, size in db.execute('SELECT key, size FROM entries ORDER BY used'):
+            if excess <= 0:
+                break
+            doomed.append((key,))
+            excess -= size
+        db.executemany('DELETE FROM entries WHERE key = ?', doomed)
+
+    def stats(self):
+        """{'entries': n, 'bytes': total value size} of what is stored."""
+        db = self._connect()
+        if db is None:
+            return {'entries': 0, 'bytes': 0}
+        count, size = db.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries').fetchone()
+        return {'entries': count, 'bytes': size}
+
+    def clear(self):
+        db = self._connect()
+        if db is not None:
+            with db:
+                db.execute('DELETE FROM entries')
+            db.execute('VACUUM')
+
+    def close(self):
+        self.flush()
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+_worker_caches = {}
+
+def open_cache(path):
+    """The ParseCache for path in this process (worker processes reuse one per path)."""
+    if path is None:
+        return None
+    if path not in _worker_caches:
+        _worker_caches[path] = ParseCache(path)
+    return _worker_caches[path]
+
+def project_cache(specs_dir='specs'):
+    """The parse cache of a spec tree, or None if specs_dir does not exist."""
+    return ParseCache(cache_path(specs_dir)) if os.path.isdir(specs_dir) else None
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Inspect or clear the spec parse cache.')
+    parser.add_argument('specs_dir', nargs='?', default='specs')
+    parser.add_argument('--clear', action='store_true', help='Drop all cached results')
+    args = parser.parse_args()
+
+    cache = project_cache(args.specs_dir)
+    if cache is None:
+        print(f"Directory not found: {args.specs_dir}")
+        exit(1)
+    if args.clear:
+        cache.clear()
+        print(f"Cleared {cache.path}")
+    else:
+        stats = cache.stats()
+        print(f"{cache.path}: {stats['entries']} entries, {stats['bytes'] / 1024:.0f} KiB")
@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+"""
+Schema engine for typed spec validation.
+
+Loads the YAML schemas (schemas/{why,what,how}/*.yaml), resolves
+$extends and $imports once, compiles each schema into a flat list of
+field checks and caches the resolved form on disk, keyed by the hashes
+of the schema files.
+"""
+
+import hashlib
+import json
+import re
+from datetime import date
+from pathlib import Path
+
+import timing
+from frontmatter import load_yaml
+from index import write_json_atomic
+from sections import compile_sections
+
+# Bump when the resolved schema format or the checks made against it change
+SCHEMA_CACHE_VERSION = 2
+
+# ---------------------------------------------------------------------------
+# Schema discovery and resolution
+# ---------------------------------------------------------------------------
+
+def find_schemas_dir(specs_dir='specs'):
+    """
+    Locate the schemas for a spec tree: project overrides in specs/schemas/,
+    then schemas/ next to specs/, then the built-in schemas.
+    """
+    specs_path = Path(specs_dir)
+    candidates = [
+        specs_path / 'schemas',
+        specs_path.resolve().parent / 'schemas',
+        Path(__file__).resolve().parent.parent / 'schemas',
+    ]
+    for candidate in candidates:
+        if (candidate / '_base').is_dir() or any(candidate.glob('*/*.yaml')):
+            return candidate
+    return None
+
+def schema_files(schemas_dir):
+    """All schema files under a schemas directory, sorted."""
+    return sorted(Path(schemas_dir).rglob('*.yaml'))
+
+def _schema_file(base_dir, ref):
+    """Resolve an $extends/$imports reference (no extension, may be a directory)."""
+    target = (base_dir / ref).resolve()
+    if target.is_dir():
+        return target / 'index.yaml'
+    return target.with_suffix('.yaml')
+
+def _load_file(path, cache):
+    if path not in cache:
+        with open(path) as f:
+            text = f.read()
+        timing.count_read(len(text))
+        cache[path] = load_yaml(text) or {}
+    return cache[path]
+
+def resolve_schema(path, cache=None, seen=()):
+    """
+    Load a schema file and flatten its $extends chain and $imports into
+    one dict with 'name', 'types', 'frontmatter' and 'sections'.
+    """
+    cache = {} if cache is None else cache
+    path = Path(path).resolve()
+    if path in seen:
+        raise ValueError(f"Circular $extends: {path}")
+    raw = _load_file(path, cache)
+
+    resolved = {'name': raw.get('name'), 'types': {}, 'frontmatter': {}, 'sections': []}
+    if raw.get('$extends'):
+        base = resolve_schema(_schema_file(path.parent, raw['$extends']), cache, seen + (path,))
+        resolved['types'].update(base['types'])
+        resolved['frontmatter'].update(base['frontmatter'])
+        resolved['sections'] = base['sections']
+
+    for spec in raw.get('$imports') or []:
+        imported = _load_file(_schema_file(path.parent, spec['from']), cache).get('types') or {}
+        for name in spec.get('types') or []:
+            if name in imported:
+                resolved['types'][name] = imported[name]
+
+    resolved['types'].update(raw.get('types') or {})
+    resolved['frontmatter'].update(raw.get('frontmatter') or {})
+    if raw.get('sections'):
+        resolved['sections'] = raw['sections']
+    return resolved
+
+def _expand_rule(rule, types, depth=0):
+    """Inline named types so every rule is self-contained."""
+    if isinstance(rule, str):
+        rule = {'type': rule}
+    rule = dict(rule)
+    named = types.get(rule.get('type')) if depth < 8 else None
+    if named and named.get('type') != 'generic':
+        merged = dict(named)
+        merged.update({k: v for k, v in rule.items() if k != 'type'})
+        rule = _expand_rule(merged, types, depth + 1)
+    if 'items' in rule:
+        rule['items'] = _expand_rule(rule['items'], types, depth + 1)
+    if isinstance(rule.get('fields'), dict):
+        rule['fields'] = {name: _expand_rule(sub, types, depth + 1)
+                          for name, sub in rule['fields'].items()}
+    if isinstance(rule.get('variants'), list):
+        rule['variants'] = [_expand_rule(sub, types, depth + 1) for sub in rule['variants']]
+    return rule
+
+def flatten_schema(resolved):
+    """Reduce a resolved schema to the JSON-serializable form that gets cached."""
+    types = resolved['types']
+    fields = {name: _expand_rule(rule or {}, types)
+              for name, rule in resolved['frontmatter'].items()}
+    schema_type = (fields.get('$schema') or {}).get('const')
+    return {
+        'type': schema_type,
+        'name': resolved['name'],
+        'fields': fields,
+        'sections': resolved['sections'],
+    }
+
+def schemas_key(files):
+    """Cache key over the blob hashes of all schema files."""
+    digest = hashlib.sha1(b'%d\0' % SCHEMA_CACHE_VERSION)
+    for path in files:
+        with open(path, 'rb') as f:
+            content = f.read()
+        timing.count_read(len(content))
+        digest.update(str(path).encode() + b'\0')
+        digest.update(hashlib.sha1(b'blob %d\0' % len(content) + content).digest())
+    return digest.hexdigest()
+
+def resolve_schemas(schemas_dir, cache_dir=None):
+    """
+    Resolve every typed schema under schemas_dir into {type: flattened schema}.
+    With a cache_dir the result is reused until any schema file changes.
+    """
+    files = schema_files(schemas_dir)
+    key = schemas_key(files)
+    cache_file = Path(cache_dir) / 'schemas.json' if cache_dir else None
+
+    if cache_file and cache_file.exists():
+        try:
+            with open(cache_file) as f:
+                cached = json.load(f)
+            if cached.get('key') == key:
+                return cached['schemas']
+        except (OSError, ValueError):
+            pass
+
+    loaded = {}
+    schemas = {}
+    for path in files:
+        rel = path.relative_to(schemas_dir).parts
+        if rel[0] in ('_base', 'common'):
+            continue
+        flat = flatten_schema(resolve_schema(path, loaded))
+        if flat['type']:
+            schemas[flat['type']] = flat
+
+    if cache_file:
+        write_json_atomic(cache_file, {'key': key, 'schemas': schemas})
+    return schemas
+
+# ---------------------------------------------------------------------------
+# Compilation and validation
+# ---------------------------------------------------------------------------
+
+def _is_date(value):
+    try:
+        date.fromisoformat(str(value))
+        return True
+    except ValueError:
+        return False
+
+def _is_number(value):
+    if isinstance(value, bool):
+        return False
+    try:
+        float(value)
+        return True
+    except (TypeError, ValueError):
+        return False
+
+SCALAR_CHECKS = {
+    'string': lambda v: isinstance(v, str),
+    'ref': lambda v: isinstance(v, str) and bool(v.strip()),
+    'date': _is_date,
+    'number': _is_number,
+    'integer': lambda v: not isinstance(v, bool) and str(v).lstrip('-').isdigit(),
+    'boolean': lambda v: isinstance(v, bool) or v in ('true', 'false'),
+}
+
+def compile_rule(rule):
+    """
+    Compile one field rule into a check function returning an error
+    message, or None when the value is valid.
+    """
+    kind = rule.get('type', 'any')
+    checks = []
+
+    if 'const' in rule:
+        const = rule['const']
+        checks.append(lambda v: None if v == const else f"must be '{const}'")
+
+    if kind == 'enum':
+        values = frozenset(str(v) for v in rule.get('values') or [])
+        shown = ', '.join(str(v) for v in rule.get('values') or [])
+        checks.append(lambda v: None if str(v) in values else f"'{v}' is not one of [{shown}]")
+    elif kind in SCALAR_CHECKS:
+        is_valid = SCALAR_CHECKS[kind]
+        checks.append(lambda v: None if is_valid(v) else f"expected {kind}")
+    elif kind == 'list':
+        item_check = compile_rule(rule['items']) if rule.get('items') else None
+        low, high = rule.get('min'), rule.get('max')
+
+        def check_list(v):
+            items = [v] if isinstance(v, str) else v
+            if not isinstance(items, list):
+                return "expected list"
+            if low is not None and len(items) < low:
+                return f"needs at least {low} item(s)"
+            if high is not None and len(items) > high:
+                return f"allows at most {high} item(s)"
+            if item_check:
+                for n, item in enumerate(items):
+                    message = item_check(item)
+                    if message:
+                        return f"item {n + 1} {message}"
+            return None
+        checks.append(check_list)
+    elif kind == 'object' and isinstance(rule.get('fields'), dict):
+        checks.append(compile_object(rule['fields']))
+    elif kind == 'union' and isinstance(rule.get('variants'), list):
+        variants = {str(variant.get('tag')): compile_object(variant.get('fields') or {})
+                    for variant in rule['variants'] if isinstance(variant, dict)}
+        shown = ', '.join(variants)
+
+        def check_union(v):
+            if not isinstance(v, dict):
+                return f"expected an object with $type one of [{shown}]"
+            tag = v.get('$type')
+            if tag not in variants:
+                return f"$type '{tag}' is not one of [{shown}]"
+            return variants[tag](v)
+        checks.append(check_union)
+
+    if rule.get('pattern'):
+        pattern = re.compile(rule['pattern'])
+        checks.append(lambda v: None if pattern.search(str(v)) else f"does not match {pattern.pattern}")
+
+    if kind in ('number', 'integer') and (rule.get('min') is not None or rule.get('max') is not None):
+        low, high = rule.get('min'), rule.get('max')
+
+        def check_range(v):
+            if (low is not None and float(v) < low) or (high is not None and float(v) > high):
+                return f"must be between {low} and {high}"
+            return None
+        checks.append(check_range)
+
+    if len(checks) == 1:
+        return checks[0]
+
+    def check_all(v):
+        for check in checks:
+            message = check(v)
+            if message:
+                return message
+        return None
+    return check_all
+
+def compile_object(fields):
+    """Check function for a nested object: required sub-fields and their rules."""
+    compiled = [(name, bool(sub.get('required')), compile_rule(sub)) for name, sub in fields.items()]
+
+    def check_object(v):
+        if not isinstance(v, dict):
+            return "expected object"
+        for name, required, check in compiled:
+            value = v.get(name)
+            if value is None or value == '' or value == []:
+                if required:
+                    return f"missing '{name}'"
+                continue
+            message = check(value)
+            if message:
+                return f"'{name}' {message}"
+        return None
+    return check_object
+
+def schema_digest(flat):
+    """Content hash of one flattened schema; keys cached check results (see validate.py)."""
+    digest = hashlib.sha1(b'%d\0' % SCHEMA_CACHE_VERSION)
+    digest.update(json.dumps(flat, sort_keys=True).encode())
+    return digest.hexdigest()
+
+def compile_schema(flat):
+    """Compile a flattened schema into (field, required, check) tuples and section checks."""
+    return {
+        'type': flat['type'],
+        'digest': schema_digest(flat),
+        'fields': [(name, bool(rule.get('required')), compile_rule(rule))
+                   for name, rule in flat['fields'].items()],
+        'sections': compile_sections(flat['sections']),
+    }
+
+def load_schemas(specs_dir='specs', schemas_dir=None, use_cache=True):
+    """Load and compile all schemas for a spec tree. Returns {type: compiled}."""
+    schemas_dir = schemas_dir or find_schemas_dir(specs_dir)
+    if not schemas_dir:
+        return {}
+    cache_dir = Path(specs_dir) / '.cache' if use_cache and Path(specs_dir).is_dir() else None
+    return {schema_type: compile_schema(flat)
+            for schema_type, flat in resolve_schemas(schemas_dir, cache_dir).items()}
+
+def validate_frontmatter(compiled, frontmatter):
+    """Validate one spec's frontmatter against its compiled schema. Returns messages."""
+    messages = []
+    for name, required, check in compiled['fields']:
+        value = frontmatter.get(name)
+        if value is None or value == '' or value == []:
+            if required:
+                messages.append(f"missing required field '{name}'")
+            continue
+        message = check(value)
+        if message:
+            messages.append(f"'{name}' {message}")
+    return messages
+
+if __name__ == '__main__':
+    import sys
+
+    specs_dir = sys.argv[1] if len(sys.argv) > 1 else 'specs'
+    schemas_dir = find_schemas_dir(specs_dir)
+    if not schemas_dir:
+        print("No schemas found")
+        exit(1)
+
+    schemas = load_schemas(specs_dir, schemas_dir)
+    print(f"Schemas: {schemas_dir}")
+    for schema_type, compiled in sorted(schemas.items()):
+        required = [name for name, is_required, _ in compiled['fields'] if is_required]
+        print(f"  {schema_type:<12} {len(compiled['fields'])} fields, required: {', '.join(required)}")
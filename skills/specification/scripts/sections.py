@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Markdown section tree for spec bodies.
+
+Builds the heading tree of a spec in one streaming pass over the raw
+bytes (no Markdown AST), recording byte offsets so sections can later be
+sliced straight out of the file, and checks it against the `sections:`
+definitions of a schema.
+"""
+
+import re
+from fnmatch import translate
+
+HEADING_RE = re.compile(rb'^(#{1,6})[ \t]+(.*?)(?:[ \t]+#+)?[ \t]*$')
+LIST_ITEM_RE = re.compile(rb'^[ \t]*(?:[-*+]|\d+[.)])[ \t]+\S')
+FENCE_PREFIXES = (b'```', b'~~~')
+
+def parse_sections(data, start=0):
+    """
+    Parse ATX headings into a tree of sections.
+
+    Each node is a dict with the heading text and level, byte offsets
+    ('start' of the heading line, 'body' after it, 'end' of the section
+    including subsections), counts of its own list items and other text
+    lines, and its child 'sections'. Headings inside fenced code blocks
+    are ignored.
+    """
+    roots = []
+    stack = []
+    fence = None
+    pos = start
+    size = len(data)
+
+    while pos < size:
+        newline = data.find(b'\n', pos)
+        end = size if newline < 0 else newline + 1
+        line = data[pos:end].rstrip(b'\r\n')
+        stripped = line.strip()
+        node = stack[-1] if stack else None
+
+        if fence:
+            if stripped.startswith(fence):
+                fence = None
+            if node:
+                node['text'] += 1
+        elif stripped.startswith(FENCE_PREFIXES):
+            fence = stripped[:3]
+            if node:
+                node['text'] += 1
+        elif stripped.startswith(b'#') and HEADING_RE.match(stripped):
+            match = HEADING_RE.match(stripped)
+            level = len(match.group(1))
+            while stack and stack[-1]['level'] >= level:
+                stack.pop()['end'] = pos
+            node = {
+                'heading': match.group(2).decode('utf-8', 'replace'),
+                'level': level,
+                'start': pos,
+                'body': end,
+                'end': size,
+                'items': 0,
+                'text': 0,
+                'sections': [],
+            }
+            (stack[-1]['sections'] if stack else roots).append(node)
+            stack.append(node)
+        elif node and stripped:
+            if LIST_ITEM_RE.match(line):
+                node['items'] += 1
+            else:
+                node['text'] += 1
+
+        pos = end
+
+    for node in stack:
+        node['end'] = size
+    return roots
+
+def top_sections(tree):
+    """Sections a schema's top-level headings are matched against (skips a lone # title)."""
+    result = []
+    for node in tree:
+        if node['level'] == 1:
+            result.extend(node['sections'])
+        else:
+            result.append(node)
+    return result
+
+def compile_sections(definitions):
+    """
+    Compile schema `sections:` definitions into
+    (label, matcher, required, content, min_items, children) tuples.
+    """
+    compiled = []
+    for definition in definitions or []:
+        if not isinstance(definition, dict):
+            continue
+        if definition.get('heading'):
+            label = definition['heading']
+            wanted = label.strip().lower()
+            matcher = (lambda wanted: lambda heading: heading.strip().lower() == wanted)(wanted)
+        elif definition.get('pattern'):
+            label = definition['pattern']
+            matcher = re.compile(translate(label), re.IGNORECASE).match
+        else:
+            continue
+        compiled.append((
+            label,
+            matcher,
+            bool(definition.get('required')),
+            definition.get('content', 'any'),
+            definition.get('min_items') or 0,
+            compile_sections(definition.get('sections')),
+        ))
+    return compiled
+
+def check_content(node, content, min_items):
+    """Check a section's own content kind and list size. Returns a message or None."""
+    if content == 'list':
+        needed = max(min_items, 1)
+        if node['items'] < needed:
+            return f"needs at least {needed} list item(s)"
+    elif content == 'paragraph':
+        if not node['text'] and not node['items']:
+            return "is empty"
+    return None
+
+def validate_sections(compiled, nodes, parent=None):
+    """Validate section nodes against compiled section definitions. Returns messages."""
+    messages = []
+    for label, matcher, required, content, min_items, children in compiled:
+        matches = [node for node in nodes if matcher(node['heading'])]
+        if not matches:
+            if required:
+                where = f" under '{parent}'" if parent else ''
+                messages.append(f"missing section '{label}'{where}")
+            continue
+        for node in matches:
+            message = check_content(node, content, min_items)
+            if message:
+                messages.append(f"section '{node['heading']}' {message}")
+            if children:
+                messages.extend(validate_sections(children, node['sections'], node['heading']))
+    return messages
@@ -0,0 +1,402 @@
+#!/usr/bin/env python3
+"""
+Local spec query daemon.
+Run from project root (parent of specs/).
+
+`specd.py serve` builds the index once, keeps it (and the reference
+graph, schemas and validation results) in memory, patches it as files
+change (see watch.py) and answers JSON requests on a Unix socket in
+specs/.cache/. Every other command is a client: it sends one request to
+the daemon, or runs the same query in-process when no daemon is running.
+
+Protocol: one JSON object per line, {"op": ..., "args": {...}}, answered
+with {"result": ...} or {"error": "..."}.
+
+Usage:
+    python3 scripts/specd.py serve &
+    python3 scripts/specd.py stats
+    python3 scripts/specd.py refs-to what/features/checkout
+    python3 scripts/specd.py impact why/constraints/gdpr --layer how
+    python3 scripts/specd.py stop
+
+Heavier modules are imported where they are needed, so the client path
+costs little more than interpreter startup.
+"""
+
+import json
+import os
+import socket
+import sys
+
+SOCKET_NAME = 'specd.sock'
+
+def socket_path(specs_dir='specs'):
+    return os.path.join(specs_dir, '.cache', SOCKET_NAME)
+
+def index_path(specs_dir='specs'):
+    return os.path.join(specs_dir, 'specs-index.json')
+
+class LocalState:
+    """Query state read from specs-index.json and specs-graph.json (no daemon)."""
+
+    def __init__(self, specs_dir='specs'):
+        from index import read_index
+        from validate import validate_index
+
+        self.specs_dir = specs_dir
+        self.index = read_index(index_path(specs_dir))
+        self._graph = None
+        self._validate = validate_index
+
+    def graph(self):
+        if self._graph is None:
+            from graph import add_lookups, build_adjacency, load_adjacency
+            try:
+                self._graph = load_adjacency(self.specs_dir)
+            except FileNotFoundError:
+                # Written by older versions of index.py without specs-graph.json
+                self._graph = add_lookups(build_adjacency(self.index))
+        return self._graph
+
+    def validate(self):
+        return self._validate(self.index, self.specs_dir)
+
+    def hashes(self):
+        """Current blob hashes for drift: None, so that the files are hashed (the index may be stale)."""
+        return None
+
+    def search_db(self):
+        from search import connect
+        return connect(self.specs_dir)
+
+class DaemonState:
+    """Query state owned by the daemon: a LiveIndex plus a graph rebuilt after each patch."""
+
+    def __init__(self, live):
+        import threading
+
+        self.live = live
+        self.specs_dir = live.specs_dir
+        self.lock = threading.Lock()
+        self._graph = None
+        self._validation = None
+        self._search_db = None
+
+    @property
+    def index(self):
+        return self.live.index
+
+    def changed(self):
+        if 'graph' in self.live.changed:
+            self._graph = None
+        self._validation = None
+
+    def graph(self):
+        if self._graph is None:
+            from graph import add_lookups, build_adjacency
+            self._graph = add_lookups(build_adjacency(self.live.index, self.live.graph))
+        return self._graph
+
+    def validate(self):
+        if self._validation is None:
+            self._validation = self.live.validate()
+        return self._validation
+
+    def hashes(self):
+        """Current blob hashes for drift: the live index has them, nothing needs hashing."""
+        return {path: spec['blob'] for path, spec in self.live.index['specs'].items() if spec.get('blob')}
+
+    def search_db(self):
+        if self._search_db is None:
+            from search import connect
+            self._search_db = connect(self.specs_dir)
+        return self._search_db
+
+def resolve(graph, names):
+    from graph import resolve_node
+
+    nodes = []
+    for name in names:
+        node = resolve_node(graph, name)
+        if node is None:
+            raise ValueError(f"Unknown spec: {name}")
+        nodes.append(node)
+    return nodes
+
+def op_stats(state, args):
+    from stats import compute_stats, unindexed_files
+
+    return compute_stats(state.index, unindexed_files(state.index, state.specs_dir))
+
+def op_validate(state, args):
+    errors, warnings = state.validate()
+    return {'errors': errors, 'warnings': warnings}
+
+def op_refs_to(state, args):
+    from graph import refs_to
+
+    graph = state.graph()
+    return refs_to(graph, resolve(graph, [args['spec']])[0])
+
+def op_refs_from(state, args):
+    from graph import refs_from
+
+    graph = state.graph()
+    return refs_from(graph, resolve(graph, [args['spec']])[0])
+
+def op_impact(state, args):
+    from graph import impact
+
+    graph = state.graph()
+    return impact(graph, resolve(graph, args['specs']), args.get('depth'), args.get('layers'), args.get('types'))
+
+def op_drift(state, args):
+    from drift import check_drift
+
+    return check_drift(state.specs_dir, hashes=state.hashes())
+
+def op_search(state, args):
+    """Ranked full-text and fielded search (see search.py for the query syntax)."""
+    from search import refresh, search
+
+    db = state.search_db()
+    refresh(db, state.specs_dir, state.index)
+    return search(db, args['query'], args.get('limit') or 20)
+
+# Argument types: requests arrive as JSON, so a wrong type would otherwise
+# fail deep inside a query (a string 'specs' is resolved letter by letter)
+ARG_TYPES = {
+    'spec': str,
+    'specs': list,
+    'depth': int,
+    'layers': list,
+    'types': list,
+    'query': str,
+    'limit': int,
+}
+
+TYPE_NAMES = {str: 'a string', list: 'a list of strings', int: 'an integer'}
+
+def check_args(args):
+    """ValueError for the first argument of the wrong type (None counts as absent)."""
+    for key, value in args.items():
+        expected = ARG_TYPES.get(key)
+        if expected is None or value is None:
+            continue
+        if (not isinstance(value, expected) or isinstance(value, bool)
+                or expected is list and not all(isinstance(item, str) for item in value)):
+            raise ValueError(f"Invalid argument '{key}': expected {TYPE_NAMES[expected]}, "
+                             f"got {json.dumps(value)}")
+
+OPS = {
+    'stats': op_stats,
+    'validate': op_validate,
+    'refs-to': op_refs_to,
+    'refs-from': op_refs_from,
+    'impact': op_impact,
+    'drift': op_drift,
+    'search': op_search,
+}
+
+def run_op(state, op, args):
+    """Run one query. Returns the response dict sent over the socket."""
+    if op not in OPS:
+        return {'error': f"Unknown op: {op}"}
+    try:
+        check_args(args or {})
+        return {'result': OPS[op](state, args or {})}
+    except (KeyError, ValueError, OSError) as e:
+        return {'error': f"{type(e).__name__}: {e}" if isinstance(e, KeyError) else str(e)}
+
+def run_local(specs_dir, op, args):
+    """Run a query in-process on specs-index.json (no daemon)."""
+    if not os.path.exists(index_path(specs_dir)):
+        return {'error': f"Index not found: {index_path(specs_dir)} (run: python3 scripts/index.py first)"}
+    return run_op(LocalState(specs_dir), op, args)
+
+def parse_request(line):
+    """(op, args) of one request line; ValueError if it is not a request object."""
+    try:
+        message = json.loads(line)
+    except ValueError as e:
+        raise ValueError(f"Invalid request: {e}") from None
+    if not isinstance(message, dict) or not isinstance(message.get('args') or {}, dict):
+        raise ValueError('Invalid request: expected {"op": ..., "args": {...}}')
+    return message.get('op'), message.get('args') or {}
+
+def send(specs_dir, op, args=None, timeout=30):
+    """
+    Send one request to the daemon and return its response. Raises OSError
+    when there is no answer (FileNotFoundError or ConnectionRefusedError: no
+    daemon is running; TimeoutError: it did not answer in time) and
+    ValueError when the answer is not a response.
+    """
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    client.settimeout(timeout)
+    try:
+        client.connect(socket_path(specs_dir))
+        client.sendall(json.dumps({'op': op, 'args': args or {}}).encode() + b'\n')
+        with client.makefile('rb') as f:
+            line = f.readline()
+    finally:
+        client.close()
+    if not line:
+        raise ConnectionResetError("connection closed without an answer")
+    response = json.loads(line)
+    if not isinstance(response, dict):
+        raise ValueError(f"not a response: {line[:80]!r}")
+    return response
+
+def request(specs_dir, op, args=None, timeout=30):
+    """
+    Send one request to a running daemon. Returns its response, None if none
+    is running, or an error response if it did not answer.
+    """
+    try:
+        return send(specs_dir, op, args, timeout)
+    except (FileNotFoundError, ConnectionRefusedError):
+        return None
+    except (OSError, ValueError) as e:
+        return {'error': f"No answer from {socket_path(specs_dir)}: {e or type(e).__name__}"}
+
+def query(specs_dir, op, args=None, timeout=30):
+    """Run a query on the daemon if one answers, otherwise in-process."""
+    try:
+        return send(specs_dir, op, args, timeout)
+    except (OSError, ValueError):
+        return run_local(specs_dir, op, args)
+
+def apply_changes(live, changed, log=None):
+    """
+    live.apply(changed) for the daemon, falling back to a full rescan when
+    patching fails so that one bad event does not stop it following changes.
+    Returns what was patched.
+    """
+    from watch import RESCAN
+
+    log = log or sys.stderr
+    try:
+        return live.apply(changed)
+    except Exception as e:
+        print(f"specd: patching {len(changed)} changed path(s) failed ({type(e).__name__}: {e}); rescanning",
+              file=log)
+    try:
+        return live.apply({RESCAN})
+    except Exception as e:
+        print(f"specd: rescan failed ({type(e).__name__}: {e}); waiting for the next change", file=log)
+    live.changed = {'index', 'graph', 'files'}
+    live.stale = None  # recheck everything on the next validate()
+    return {'rescan'}
+
+def serve(specs_dir='specs', jobs=1, poll=None):
+    """Run the daemon in the foreground until stopped."""
+    import socketserver
+    import threading
+
+    from index import INDEX_VERSION, build_index, read_index, write_index
+    from watch import LiveIndex, make_watcher, next_changes
+
+    path = socket_path(specs_dir)
+    if request(specs_dir, 'stats') is not None:
+        print(f"Already running: {path}")
+        return 1
+    if os.path.exists(path):
+        os.unlink(path)  # left behind by a daemon that did not shut down cleanly
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    previous = None
+    if os.path.exists(index_path(specs_dir)):
+        previous = read_index(index_path(specs_dir))
+        if previous.get('index_version') != INDEX_VERSION:
+            previous = None
+    index = build_index(specs_dir, previous, jobs)
+    write_index(index, specs_dir)
+    state = DaemonState(LiveIndex(index, specs_dir, jobs))
+    watcher = make_watcher(specs_dir, poll, state.live.watch_dirs())
+
+    def follow_changes():
+        while True:
+            changed = next_changes(watcher)
+            with state.lock:
+                if apply_changes(state.live, changed):
+                    state.changed()
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            for line in self.rfile:
+                try:
+                    op, args = parse_request(line)
+                except ValueError as e:
+                    self.wfile.write(json.dumps({'error': str(e)}).encode() + b'\n')
+                    continue
+                if op == 'shutdown':
+                    self.wfile.write(json.dumps({'result': 'stopping'}).encode() + b'\n')
+                    threading.Thread(target=self.server.shutdown).start()
+                    return
+                with state.lock:
+                    response = run_op(state, op, args)
+                self.wfile.write(json.dumps(response).encode() + b'\n')
+
+    threading.Thread(target=follow_changes, daemon=True).start()
+    server = socketserver.ThreadingUnixStreamServer(path, Handler)
+    server.daemon_threads = True
+    print(f"Serving {len(index['specs'])} specs on {path} ({watcher.name})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        watcher.close()
+        if os.path.exists(path):
+            os.unlink(path)
+    print("Stopped")
+    return 0
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Spec query daemon and client.')
+    parser.add_argument('--specs-dir', default='specs')
+    parser.add_argument('--local', action='store_true', help='Do not contact the daemon; run in-process')
+    commands = parser.add_subparsers(dest='command', required=True)
+    serve_parser = commands.add_parser('serve', help='Run the daemon in the foreground')
+    serve_parser.add_argument('--jobs', '-j', type=int, default=1, help='Worker processes for full rescans')
+    serve_parser.add_argument('--poll', type=float, metavar='SECONDS', help='Poll instead of using inotify')
+    commands.add_parser('stop', help='Stop a running daemon')
+    commands.add_parser('stats', help='Spec counts by layer, type and status')
+    commands.add_parser('validate', help='Errors and warnings')
+    commands.add_parser('drift', help='Implementation drift (.implemented.json)')
+    commands.add_parser('refs-to', help='Specs that reference a spec').add_argument('spec')
+    commands.add_parser('refs-from', help='Specs a spec references').add_argument('spec')
+    impact_parser = commands.add_parser('impact', help='Specs affected (transitively) by a change to specs')
+    impact_parser.add_argument('specs', nargs='+')
+    impact_parser.add_argument('--depth', type=int)
+    impact_parser.add_argument('--layer', action='append', dest='layers', choices=['why', 'what', 'how'])
+    impact_parser.add_argument('--type', action='append', dest='types')
+    search_parser = commands.add_parser('search', help='Ranked search: words, "phrases", field:value filters')
+    search_parser.add_argument('query')
+    search_parser.add_argument('--limit', type=int)
+    args = parser.parse_args()
+
+    if args.command == 'serve':
+        exit(serve(args.specs_dir, args.jobs if args.jobs > 0 else (os.cpu_count() or 1), args.poll))
+    if args.command == 'stop':
+        response = request(args.specs_dir, 'shutdown')
+        if response is not None and 'error' in response:
+            print(response['error'])
+            exit(1)
+        print("Stopped" if response else "Not running")
+        exit(0)
+
+    op_args = {key: value for key, value in vars(args).items()
+               if key not in ('specs_dir', 'local', 'command') and value is not None}
+    if args.local:
+        response = run_local(args.specs_dir, args.command, op_args)
+    else:
+        response = query(args.specs_dir, args.command, op_args)
+
+    if 'error' in response:
+        print(response['error'])
+        exit(1)
+    print(json.dumps(response['result'], indent=2))
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+SQLite form of the spec index.
+Run from project root (parent of specs/).
+
+`index.py --sqlite` writes specs/specs-index.sqlite next to
+specs-index.json; once that file exists every later index.py run (and
+--watch) keeps it up to date. A query touches only the rows it needs
+instead of loading the whole JSON index.
+
+Tables:
+    specs     path, id, title, type, status, version, layer, hash, blob,
+              lines, parent, orphan, frontmatter (JSON text)
+    refs      source, target
+    parents   child, parent
+    sections  path, seq, parent_seq, heading, level, start_offset,
+              body_offset, end_offset, items, text_lines
+    drift     path, state (in_sync/drifted/unimplemented), recorded, current
+    meta      key, value (index_version, generated_at)
+
+Usage:
+    python3 scripts/index.py --sqlite
+    python3 scripts/sqlindex.py "SELECT path FROM specs WHERE status = 'draft'"
+    python3 scripts/sqlindex.py --json "SELECT source FROM refs WHERE target = ?" what/features/checkout.md
+"""
+
+import json
+import os
+import sqlite3
+
+SQLITE_NAME = 'specs-index.sqlite'
+
+SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE specs (
+    path TEXT PRIMARY KEY,
+    id TEXT,
+    title TEXT,
+    type TEXT,
+    status TEXT,
+    version TEXT,
+    layer TEXT,
+    hash TEXT,
+    blob TEXT,
+    lines INTEGER,
+    parent TEXT,
+    orphan INTEGER NOT NULL,
+    frontmatter TEXT
+);
+CREATE INDEX specs_id ON specs (id);
+CREATE INDEX specs_type ON specs (type);
+CREATE INDEX specs_status ON specs (status);
+CREATE INDEX specs_layer ON specs (layer);
+CREATE TABLE refs (source TEXT NOT NULL, target TEXT NOT NULL);
+CREATE INDEX refs_source ON refs (source);
+CREATE INDEX refs_target ON refs (target);
+CREATE TABLE parents (child TEXT NOT NULL, parent TEXT NOT NULL);
+CREATE INDEX parents_child ON parents (child);
+CREATE INDEX parents_parent ON parents (parent);
+CREATE TABLE sections (
+    path TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    parent_seq INTEGER,
+    heading TEXT,
+    level INTEGER,
+    start_offset INTEGER,
+    body_offset INTEGER,
+    end_offset INTEGER,
+    items INTEGER,
+    text_lines INTEGER,
+    PRIMARY KEY (path, seq)
+);
+CREATE INDEX sections_heading ON sections (heading);
+CREATE TABLE drift (path TEXT PRIMARY KEY, state TEXT NOT NULL, recorded TEXT, current TEXT);
+CREATE INDEX drift_state ON drift (state);
+"""
+
+def sqlite_path(specs_dir='specs'):
+    return os.path.join(specs_dir, SQLITE_NAME)
+
+def text(value):
+    """Scalar frontmatter values as stored in a TEXT column (lists and maps as JSON)."""
+    if value is None or isinstance(value, str):
+        return value
+    return json.dumps(value)
+
+def section_rows(path, sections):
+    """Rows of the sections table: the tree in document order, linked by seq."""
+    rows = []
+    stack = [(node, None) for node in reversed(sections)]
+    while stack:
+        node, parent_seq = stack.pop()
+        seq = len(rows)
+        rows.append((path, seq, parent_seq, node['heading'], node['level'], node['start'],
+                     node['body'], node['end'], node['items'], node['text']))
+        stack.extend((child, seq) for child in reversed(node['sections']))
+    return rows
+
+def drift_rows(index, specs_dir='specs'):
+    """Rows of the drift table, using the blob hashes already in the index."""
+    from drift import check_drift
+
+    hashes = {path: spec['blob'] for path, spec in index['specs'].items() if spec.get('blob')}
+    report = check_drift(specs_dir, hashes=hashes)
+    rows = [(path, 'in_sync', None, hashes[path]) for path in report['in_sync']]
+    rows += [(path, 'drifted', recorded, current) for path, recorded, current in report['drifted']]
+    rows += [(path, 'unimplemented', None, hashes[path]) for path in report['unimplemented']]
+    return rows
+
+def write_sqlite(index, specs_dir='specs'):
+    """Write the index to specs-index.sqlite (via a temporary file and rename). Returns its path."""
+    from index import spec_layer
+
+    path = sqlite_path(specs_dir)
+    tmp = os.path.join(specs_dir, f".{SQLITE_NAME}.{os.getpid()}.tmp")
+    if os.path.exists(tmp):
+        os.unlink(tmp)
+
+    orphans = set(index['relationships']['orphans'])
+    db = sqlite3.connect(tmp)
+    try:
+        db.executescript(SCHEMA)
+        with db:
+            db.executemany('INSERT INTO meta VALUES (?, ?)', [
+                ('index_version', str(index.get('index_version'))),
+                ('generated_at', index.get('generated_at')),
+            ])
+            db.executemany('INSERT INTO specs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', [
+                (path, text(spec['id']), text(spec['title']), text(spec['type']), text(spec['status']),
+                 text(spec['version']), spec_layer(path), spec['hash'], spec.get('blob'), spec.get('lines'),
+                 text(spec.get('parent')), path in orphans, json.dumps(spec.get('frontmatter', {})))
+                for path, spec in index['specs'].items()
+            ])
+            db.executemany('INSERT INTO refs VALUES (?, ?)',
+                           [(rel['from'], rel['to']) for rel in index['relationships']['refs']])
+            db.executemany('INSERT INTO parents VALUES (?, ?)',
+                           [(rel['child'], rel['parent']) for rel in index['relationships']['parents']])
+            db.executemany('INSERT INTO sections VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                           [row for path, spec in index['specs'].items()
+                            for row in section_rows(path, spec.get('sections', []))])
+            db.executemany('INSERT INTO drift VALUES (?, ?, ?, ?)', drift_rows(index, specs_dir))
+    finally:
+        db.close()
+    os.replace(tmp, path)
+    return path
+
+def connect(specs_dir='specs'):
+    """Read-only connection to specs-index.sqlite."""
+    path = sqlite_path(specs_dir)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"{path} not found (run: python3 scripts/index.py --sqlite)")
+    db = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    db.row_factory = sqlite3.Row
+    return db
+
+def query(specs_dir, sql, params=()):
+    """Run one statement against specs-index.sqlite. Returns rows as dicts."""
+    db = connect(specs_dir)
+    try:
+        return [dict(row) for row in db.execute(sql, params)]
+    finally:
+        db.close()
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Query specs-index.sqlite.')
+    parser.add_argument('sql', help='SQL statement; ? placeholders take the remaining arguments')
+    parser.add_argument('params', nargs='*')
+    parser.add_argument('--specs-dir', default='specs')
+    parser.add_argument('--json', action='store_true', help='Print rows as a JSON list of objects')
+    args = parser.parse_args()
+
+    try:
+        rows = query(args.specs_dir, args.sql, args.params)
+    except (OSError, sqlite3.Error) as e:
+        print(e)
+        exit(1)
+
+    if args.json:
+        print(json.dumps(rows, indent=2))
+    else:
+        for row in rows:
+            print('\t'.join('' if value is None else str(value) for value in row.values()))
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Quick stats about the spec system.
+Run from project root (parent of specs/).
+
+Everything is computed from the index in one pass: the previous
+specs-index.json is brought up to date in memory (only changed files are
+re-parsed) unless --cached is given, in which case it is used as is.
+Markdown files without frontmatter are not in the index; as in stats.sh
+they still count towards the layer totals, large specs and missing
+$schema (only those files are read).
+
+Supports three-layer model: why/, what/, how/
+"""
+
+import json
+import os
+from pathlib import Path
+
+from index import LAYERS, TYPE_PATHS, build_index, count_lines, read_index, spec_layer, walk_specs
+
+STATUSES = ('draft', 'active', 'deprecated')
+LARGE_SPEC_LINES = 150
+
+def ordered_counts(groups, order):
+    """{key: count} for non-empty groups, known keys first in the given order."""
+    keys = [key for key in order if groups.get(key)]
+    keys += sorted(key for key in groups if key not in order and groups[key])
+    return {key: len(groups[key]) for key in keys}
+
+def unindexed_files(index, specs_dir='specs'):
+    """{path: line count} of the markdown files under specs_dir the index leaves out (no frontmatter)."""
+    specs_path = Path(specs_dir)
+    found = {}
+    for path in walk_specs(specs_path):
+        if path not in index['specs']:
+            found[path] = count_lines((specs_path / path).read_bytes())
+    return found
+
+def compute_stats(index, unindexed=None):
+    """
+    Layer, type and status counts plus quick checks, from an index.
+    unindexed ({path: lines}, see unindexed_files) adds the files without
+    frontmatter to the layer counts, large specs and missing $schema.
+    """
+    specs = index['specs']
+    unindexed = unindexed or {}
+    by_type = {key: paths for key, paths in index['by_type'].items() if key != 'unknown'}
+    layered = [path for path in specs if spec_layer(path)]
+    by_layer = {layer: len(index['by_layer'][layer]) for layer in LAYERS}
+    for path in unindexed:
+        if spec_layer(path):
+            by_layer[spec_layer(path)] += 1
+
+    return {
+        'total': sum(by_layer.values()),
+        'by_layer': by_layer,
+        'by_type': ordered_counts(by_type, list(TYPE_PATHS)),
+        'by_status': ordered_counts(index['by_status'], STATUSES),
+        'orphans': [path for path in index['relationships']['orphans']
+                    if spec_layer(path) and not specs[path].get('parent')],
+        'large': sorted([path for path, spec in specs.items() if (spec.get('lines') or 0) > LARGE_SPEC_LINES]
+                        + [path for path, lines in unindexed.items() if lines > LARGE_SPEC_LINES]),
+        'missing_schema': sorted([path for path in layered if specs[path]['type'] == 'unknown']
+                                 + [path for path in unindexed if spec_layer(path)]),
+    }
+
+def load_index(specs_dir='specs', cached=False):
+    """The current index: specs-index.json refreshed in memory, or as stored if cached."""
+    index_path = os.path.join(specs_dir, 'specs-index.json')
+    previous = None
+    if os.path.exists(index_path):
+        previous = read_index(index_path)
+        if cached:
+            return previous
+    return build_index(specs_dir, previous)
+
+def print_stats(stats):
+    print("=== Spec System Stats ===")
+    print()
+    print(f"Why specs:   {stats['by_layer']['why']}")
+    print(f"What specs:  {stats['by_layer']['what']}")
+    print(f"How specs:   {stats['by_layer']['how']}")
+    print(f"Total:       {stats['total']}")
+    print()
+
+    print("By type:")
+    for spec_type, count in stats['by_type'].items():
+        print(f"  {spec_type + ':':<12} {count}")
+    print()
+
+    print("By status:")
+    for status, count in stats['by_status'].items():
+        print(f"  {status + ':':<12} {count}")
+    print()
+
+    print("Quick checks:")
+    print(f"  Potential orphans: {len(stats['orphans'])}")
+    print(f"  Large specs (>{LARGE_SPEC_LINES} lines): {len(stats['large'])}")
+    print(f"  Missing $schema: {len(stats['missing_schema'])}")
+    print()
+    print("Run 'python3 scripts/validate.py' for detailed validation")
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Quick stats about the spec system.')
+    parser.add_argument('specs_dir', nargs='?', default='specs')
+    parser.add_argument('--cached', action='store_true',
+                        help='Use specs-index.json as stored instead of refreshing it')
+    parser.add_argument('--json', action='store_true', help='Print the stats as JSON')
+    args = parser.parse_args()
+
+    index = load_index(args.specs_dir, args.cached)
+    stats = compute_stats(index, unindexed_files(index, args.specs_dir))
+    if args.json:
+        print(json.dumps(stats, indent=2))
+    else:
+        print_stats(stats)
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Opt-in per-phase timing for index.py and validate.py.
+
+Enabled by --profile [FILE] or the SPECS_PROFILE environment variable
+(1 for the default location, or an output directory). The scripts then record:
+    - wall and CPU time of each phase (walk, read, hash, frontmatter,
+      refs and section parsing, merge, write; loading, each validation check)
+    - files read and bytes read, parse cache hits and misses
+    - the slowest individual specs
+and write them as JSON (specs/.cache/profile-<script>.json by default)
+plus a Chrome trace-event file next to it (<name>.trace.json; open it in
+chrome://tracing or https://ui.perfetto.dev).
+
+When profiling is off, `profiler` is None and every hook is a single
+check of it, so the hooks stay in place at no measurable cost.
+"""
+
+import atexit
+import json
+import os
+import sys
+from contextlib import nullcontext
+from datetime import datetime
+from time import perf_counter, process_time
+
+ENV_VAR = 'SPECS_PROFILE'
+SLOWEST_SPECS = 20
+
+# The active Profiler, or None when profiling is off
+profiler = None
+_NULL = nullcontext()
+
+class Span:
+    """Times a block into a profiler (record: also keep it as a trace event)."""
+
+    __slots__ = ('profiler', 'name', 'record', 'start', 'cpu')
+
+    def __init__(self, profiler, name, record):
+        self.profiler = profiler
+        self.name = name
+        self.record = record
+
+    def __enter__(self):
+        self.start = perf_counter()
+        self.cpu = process_time()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.add(self.name, perf_counter() - self.start, process_time() - self.cpu,
+                          self.start if self.record else None)
+
+class Profiler:
+    """Timings, counters and per-spec times of one script run."""
+
+    def __init__(self, script=None, output=None):
+        self.script = script
+        self.output = output
+        self.pid = os.getpid()
+        self.started = datetime.now().isoformat()
+        self.origin = perf_counter()
+        self.cpu_origin = process_time()
+        self.totals = {}        # name -> [wall, cpu, calls]
+        self.counters = {}      # name -> n
+        self.events = []        # (name, category, start, wall, tid)
+        self.spec_times = {}    # path -> wall
+
+    def add(self, name, wall, cpu, start=None):
+        total = self.totals.get(name)
+        if total is None:
+            total = self.totals[name] = [0.0, 0.0, 0]
+        total[0] += wall
+        total[1] += cpu
+        total[2] += 1
+        if start is not None:
+            self.events.append((name, 'phase', start, wall, self.pid))
+
+    def count(self, name, n=1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def spec(self, path, start, wall, tid=None):
+        self.spec_times[path] = self.spec_times.get(path, 0.0) + wall
+        self.events.append((path, 'spec', start, wall, tid or self.pid))
+
+    def drain(self):
+        """Hand over what was recorded so far (worker processes) and start afresh."""
+        data = (self.totals, self.counters, self.events, self.spec_times)
+        self.totals, self.counters, self.events, self.spec_times = {}, {}, [], {}
+        return data
+
+    def merge(self, data):
+        """Add what a worker process recorded (see drain)."""
+        totals, counters, events, spec_times = data
+        for name, (wall, cpu, calls) in totals.items():
+            total = self.totals.setdefault(name, [0.0, 0.0, 0])
+            total[0] += wall
+            total[1] += cpu
+            total[2] += calls
+        for name, n in counters.items():
+            self.count(name, n)
+        self.events += events
+        for path, wall in spec_times.items():
+            self.spec_times[path] = self.spec_times.get(path, 0.0) + wall
+
+    def report(self):
+        slowest = sorted(self.spec_times.items(), key=lambda item: -item[1])[:SLOWEST_SPECS]
+        return {
+            'script': self.script,
+            'argv': sys.argv[1:],
+            'started': self.started,
+            'wall_ms': ms(perf_counter() - self.origin),
+            'cpu_ms': ms(process_time() - self.cpu_origin),
+            'counters': dict(sorted(self.counters.items())),
+            'phases': [{'name': name, 'calls': calls, 'wall_ms': ms(wall), 'cpu_ms': ms(cpu)}
+                       for name, (wall, cpu, calls) in self.totals.items()],
+            'slowest_specs': [{'path': path, 'ms': ms(wall)} for path, wall in slowest],
+        }
+
+    def trace(self):
+        """Chrome trace-event form: complete events for phases and specs, one row per process."""
+        events = [{'name': 'process_name', 'ph': 'M', 'pid': self.pid, 'tid': self.pid,
+                   'args': {'name': self.script or 'specs'}}]
+        for tid in sorted({event[4] for event in self.events} - {self.pid}):
+            events.append({'name': 'thread_name', 'ph': 'M', 'pid': self.pid, 'tid': tid,
+                           'args': {'name': f"worker {tid}"}})
+        for name, category, start, wall, tid in self.events:
+            events.append({'name': name, 'cat': category, 'ph': 'X', 'pid': self.pid, 'tid': tid,
+                           'ts': round((start - self.origin) * 1e6, 1), 'dur': round(wall * 1e6, 1)})
+        events.append({'name': 'counters', 'ph': 'C', 'pid': self.pid, 'tid': self.pid,
+                       'ts': round((perf_counter() - self.origin) * 1e6, 1), 'args': dict(self.counters)})
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def write(self, path):
+        """Write the JSON report to path and the trace next to it. Returns both paths."""
+        base = path[:-5] if path.endswith('.json') else path
+        trace_path = base + '.trace.json'
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(self.report(), f, indent=2)
+        with open(trace_path, 'w') as f:
+            json.dump(self.trace(), f, separators=(',', ':'))
+        return path, trace_path
+
+def ms(seconds):
+    return round(seconds * 1000, 3)
+
+def output_path(script, flag=None, specs_dir='specs'):
+    """
+    Where to write the profile of script, or None when profiling is off.
+    flag is the --profile value (a file, or True for the default place);
+    otherwise SPECS_PROFILE is 1 (default place) or a directory, so that
+    index.py and validate.py run in a row keep separate reports.
+    """
+    name = f"profile-{script.rsplit('.', 1)[0]}.json"
+    if flag and flag is not True:
+        return flag
+    value = os.environ.get(ENV_VAR, '')
+    if not flag and value.lower() in ('', '0', 'false', 'no', 'off'):
+        return None
+    if flag or value.lower() in ('1', 'true', 'yes', 'on'):
+        return os.path.join(specs_dir, '.cache', name)
+    return os.path.join(value, name)
+
+def enable(script, output):
+    """Start profiling this process; the report is written to output when it exits."""
+    global profiler
+    profiler = Profiler(script, output)
+    atexit.register(finish)
+    return profiler
+
+def enable_worker():
+    """Profile a pool worker: results go back to the parent through drain()."""
+    global profiler
+    if profiler is None or profiler.pid != os.getpid():
+        # Forked workers inherit the parent's profiler; start a clean one
+        profiler = Profiler()
+    return profiler
+
+def finish():
+    global profiler
+    if profiler is None or not profiler.output:
+        return
+    done, profiler = profiler, None
+    try:
+        path, trace_path = done.write(done.output)
+    except OSError as e:
+        print(f"Cannot write profile: {e}", file=sys.stderr)
+        return
+    print(f"Profile: {path} (trace: {trace_path})", file=sys.stderr)
+
+def phase(name):
+    """Context manager timing a phase (kept as a trace event); no-op when profiling is off."""
+    return Span(profiler, name, True) if profiler is not None else _NULL
+
+def span(name):
+    """Context manager adding a block's time to a phase total, without a trace event per call."""
+    return Span(profiler, name, False) if profiler is not None else _NULL
+
+def timed(name, func, *args):
+    """func(*args), its time added to the named total when profiling."""
+    if profiler is None:
+        return func(*args)
+    start, cpu = perf_counter(), process_time()
+    result = func(*args)
+    profiler.add(name, perf_counter() - start, process_time() - cpu)
+    return result
+
+def spec_call(path, func, *args):
+    """func(*args) as the work done on one spec, recorded per spec when profiling."""
+    if profiler is None:
+        return func(*args)
+    start = perf_counter()
+    result = func(*args)
+    profiler.spec(path, start, perf_counter() - start)
+    return result
+
+def count(name, n=1):
+    if profiler is not None:
+        profiler.count(name, n)
+
+def count_read(nbytes):
+    """One file read of nbytes."""
+    if profiler is not None:
+        profiler.count('files_read')
+        profiler.count('bytes_read', nbytes)
@@ -0,0 +1,371 @@
+#!/usr/bin/env python3
+"""
+Watch mode for index.py: keep specs-index.json live while specs change.
+
+The index is built once and held in memory. File events come from Linux
+inotify (bound through ctypes) or, where that is unavailable, from
+polling stat signatures. After a burst of events has settled, only the
+affected specs are re-parsed and patched into the index, the per-spec
+validation checks are rerun for those specs alone, project checks only
+if what they read changed (see validate.Check), and the index and graph
+are rewritten atomically. The schemas directory is watched too, also
+where it lies outside specs/.
+
+Usage:
+    python3 scripts/index.py --watch
+    python3 scripts/index.py --watch --poll 2
+"""
+
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+import time
+from datetime import datetime
+from pathlib import Path
+
+from index import Resolver, patch_index, referenced_paths, update_index, write_index
+from model import SpecGraph
+from parsecache import project_cache
+from schema import find_schemas_dir
+from suggest import Suggester
+from validate import load_project_schemas, validate_index
+
+# inotify event masks (linux/inotify.h)
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_ONLYDIR
+
+# struct inotify_event header: wd, mask, cookie, len (name follows)
+EVENT = struct.Struct('iIII')
+
+# Reported in place of paths when the kernel dropped events
+RESCAN = ''
+
+def skip_dir(name):
+    """Directories index.py never reads (hidden ones, including .cache, and scripts)."""
+    return name.startswith('.') or name == 'scripts'
+
+def join(rel_dir, name):
+    return f"{rel_dir}/{name}" if rel_dir else name
+
+def is_spec_path(rel_path):
+    """Whether a path relative to specs/ is one walk_specs would index."""
+    parts = rel_path.split('/')
+    return rel_path.endswith('.md') and not any(skip_dir(part) for part in parts[:-1])
+
+def relative(root, path):
+    """Path below root as reported by the watchers: relative to root, or absolute outside it."""
+    try:
+        rel = Path(path).relative_to(root).as_posix()
+    except ValueError:
+        return Path(path).resolve().as_posix()
+    return '' if rel == '.' else rel
+
+class InotifyWatcher:
+    """
+    Recursive watch on a directory tree through Linux inotify, plus any
+    extra trees outside it (their paths are reported as absolute paths).
+    """
+
+    name = 'inotify'
+
+    def __init__(self, root, extra=()):
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self._rm_watch = libc.inotify_rm_watch
+        self._rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+
+        self.fd = libc.inotify_init1(os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+        self.root = Path(root)
+        self.dirs = {}
+        self.add_tree('')
+        for path in extra:
+            self.add_tree(relative(self.root, path))
+
+    def add_tree(self, rel_dir):
+        """Watch a directory and everything below it. Returns the files found inside."""
+        found = []
+        for current, dirs, files in os.walk(self.root / rel_dir):
+            dirs[:] = [d for d in dirs if not skip_dir(d)]
+            rel = relative(self.root, current)
+            wd = self._add_watch(self.fd, os.fsencode(current), WATCH_MASK)
+            if wd < 0:
+                err = ctypes.get_errno()
+                if err == errno.ENOENT:
+                    continue
+                raise OSError(err, f"inotify_add_watch failed: {current}")
+            self.dirs[wd] = rel
+            found.extend(join(rel, name) for name in files)
+        return found
+
+    def remove_tree(self, rel_dir):
+        """Stop watching a directory that was moved away."""
+        for wd, rel in list(self.dirs.items()):
+            if rel == rel_dir or rel.startswith(rel_dir + '/'):
+                self._rm_watch(self.fd, wd)
+                del self.dirs[wd]
+
+    def wait(self, timeout=None):
+        """Block for up to timeout seconds (None: forever). Returns changed paths."""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+        data = os.read(self.fd, 1 << 16)
+
+        changed = set()
+        pos = 0
+        while pos < len(data):
+            wd, mask, _, length = EVENT.unpack_from(data, pos)
+            pos += EVENT.size
+            name = os.fsdecode(data[pos:pos + length].rstrip(b'\0'))
+            pos += length
+
+            if mask & IN_Q_OVERFLOW:
+                changed.add(RESCAN)
+                continue
+            if mask & IN_IGNORED:
+                self.dirs.pop(wd, None)
+                continue
+            if wd not in self.dirs:
+                continue
+
+            rel = join(self.dirs[wd], name)
+            if mask & IN_ISDIR:
+                if skip_dir(name):
+                    continue
+                if mask & IN_MOVED_FROM:
+                    self.remove_tree(rel)
+                elif mask & (IN_CREATE | IN_MOVED_TO):
+                    changed.update(self.add_tree(rel))
+            changed.add(rel)
+        return changed
+
+    def close(self):
+        os.close(self.fd)
+
+class PollingWatcher:
+    """
+    Fallback watcher: compares stat signatures of the tree (and of extra
+    trees, reported as absolute paths) every interval seconds.
+    """
+
+    name = 'polling'
+
+    def __init__(self, root, interval=1.0, extra=()):
+        self.root = Path(root)
+        self.trees = [self.root] + [Path(path) for path in extra]
+        self.interval = interval
+        self.snapshot = self.scan()
+
+    def scan(self):
+        files = {}
+        for tree in self.trees:
+            for current, dirs, names in os.walk(tree):
+                dirs[:] = [d for d in dirs if not skip_dir(d)]
+                for name in names:
+                    path = os.path.join(current, name)
+                    try:
+                        st = os.stat(path)
+                    except OSError:
+                        continue
+                    files[relative(self.root, path)] = (st.st_mtime_ns, st.st_size)
+        return files
+
+    def wait(self, timeout=None):
+        """Sleep, rescan and return changed paths; with timeout None, until something changed."""
+        while True:
+            time.sleep(self.interval if timeout is None else timeout)
+            current = self.scan()
+            changed = {path for path in current.keys() | self.snapshot.keys()
+                       if current.get(path) != self.snapshot.get(path)}
+            self.snapshot = current
+            if changed or timeout is not None:
+                return changed
+
+    def close(self):
+        pass
+
+def make_watcher(root, poll=None, extra=()):
+    """
+    inotify watcher for root and the extra directories, or a polling one
+    if poll is set or inotify is unavailable.
+    """
+    if not poll:
+        try:
+            return InotifyWatcher(root, extra)
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher(root, poll or 1.0, extra)
+
+def affected_specs(index, specs_path, changed):
+    """Spec paths to re-read for a set of changed paths (files and directories)."""
+    paths = {path for path in changed if is_spec_path(path) and not path.startswith('/')}
+    # Directories that were deleted or moved away take their specs with them
+    prefixes = tuple(path + '/' for path in changed
+                     if path and not path.startswith('/') and not is_spec_path(path)
+                     and not (specs_path / path).is_file())
+    if prefixes:
+        paths.update(path for path in index['specs'] if path.startswith(prefixes))
+    return sorted(paths)
+
+def graph_fields(entry):
+    """What the reference graph (and specs-graph.json) takes from a spec; None if there is none."""
+    return None if entry is None else (entry['id'], entry['type'], tuple(entry['refs']))
+
+def index_fields(entry):
+    """What project checks read of a spec: its graph fields and more (input 'index', see validate.Check)."""
+    if entry is None:
+        return None
+    return (graph_fields(entry), entry['title'], entry['status'], entry['parent'], tuple(entry['children']))
+
+def print_messages(errors, warnings, marker='  '):
+    for e in errors:
+        print(f"{marker}❌ {e}")
+    for w in warnings:
+        print(f"{marker}⚠️  {w}")
+
+class LiveIndex:
+    """
+    An index held in memory and patched as files change, together with its
+    reference graph, its ref resolver table, the schemas, the cached
+    per-spec and project validation results and the "did you mean" suggester.
+    changed holds the check inputs (see validate.Check) that the last
+    apply() changed: 'index', 'graph', 'schemas' and 'files'.
+    """
+
+    def __init__(self, index, specs_dir='specs', jobs=1):
+        self.index = index
+        self.specs_dir = specs_dir
+        self.specs_path = Path(specs_dir)
+        self.jobs = jobs
+        self.counts = referenced_paths(index)
+        self.resolver = Resolver.from_specs(index['specs'])
+        self.graph = SpecGraph.from_index(index)
+        self.schemas, self.schema_error = load_project_schemas(specs_dir)
+        self.spec_results = {}
+        self.project_results = {}
+        self.changed = None
+        self.stale = None           # inputs changed since the last validate(); None: all
+        self.schemas_dir = find_schemas_dir(specs_dir)
+        self.cache = project_cache(specs_dir)
+        self.suggest = Suggester(index['specs'])
+
+    def apply(self, changed):
+        """
+        Patch the index for a set of changed paths and rewrite it on disk.
+        Returns what was patched (spec paths, 'schemas', 'rescan'); empty if nothing.
+        """
+        patched = set()
+        inputs = set()
+        if any(path.endswith(('.yaml', '.yml')) for path in changed):
+            self.schemas, self.schema_error = load_project_schemas(self.specs_dir)
+            self.spec_results.clear()
+            patched.add('schemas')
+            inputs.add('schemas')
+
+        if RESCAN in changed:
+            update_index(self.index, self.specs_path, self.jobs, self.cache)
+            self.counts = referenced_paths(self.index)
+            self.resolver = Resolver.from_specs(self.index['specs'])
+            self.suggest = Suggester(self.index['specs'])
+            patched.add('rescan')
+            inputs |= {'index', 'graph', 'files'}
+        else:
+            paths = affected_specs(self.index, self.specs_path, changed)
+            before = [index_fields(self.index['specs'].get(path)) for path in paths]
+            patched |= patch_index(self.index, self.specs_path, paths, 1, self.counts, self.cache,
+                                   resolver=self.resolver)
+            self.suggest.refresh(self.index['specs'], paths)
+            specs = self.index['specs']
+            for path, old in zip(paths, before):
+                new = index_fields(specs.get(path))
+                if new != old:
+                    inputs.add('index')
+                    if (old and old[0]) != (new and new[0]):
+                        inputs.add('graph')
+            if patched - {'schemas'}:
+                inputs.add('files')
+
+        if 'graph' in inputs:
+            self.graph = SpecGraph.from_index(self.index)
+        if patched:
+            write_index(self.index, self.specs_dir, graph=self.graph, adjacency='graph' in inputs)
+        self.changed = inputs
+        if self.stale is not None:
+            self.stale |= inputs
+        return patched
+
+    def watch_dirs(self):
+        """Directories to watch besides specs/: the schemas directory where it lies outside it."""
+        if self.schemas_dir is None:
+            return []
+        inside = Path(os.path.abspath(self.schemas_dir)).is_relative_to(os.path.abspath(self.specs_dir))
+        return [] if inside else [self.schemas_dir]
+
+    def validate(self):
+        """
+        Errors and warnings for the current index: per-spec checks are cached
+        by hash, project checks until one of their inputs changes.
+        """
+        result = validate_index(self.index, self.specs_dir, self.schemas, self.schema_error, self.spec_results,
+                                self.cache, graph=self.graph, suggest=self.suggest,
+                                project_results=self.project_results, changed=self.stale)
+        self.stale = set()
+        return result
+
+def next_changes(watcher, debounce=0.05):
+    """Block until something changes, then collect events until debounce seconds pass quietly."""
+    changed = watcher.wait()
+    while True:
+        more = watcher.wait(debounce)
+        if not more:
+            return changed
+        changed |= more
+
+def watch(index, specs_dir='specs', jobs=1, poll=None, debounce=0.05):
+    """
+    Keep an already written index in sync with specs_dir until interrupted.
+    Events are coalesced until debounce seconds pass without a new one.
+    """
+    live = LiveIndex(index, specs_dir, jobs)
+    watcher = make_watcher(Path(specs_dir), poll, live.watch_dirs())
+    errors, warnings = live.validate()
+
+    print_messages(errors, warnings)
+    print(f"Watching {specs_dir}/ ({watcher.name}): {len(errors)} errors, {len(warnings)} warnings. Ctrl-C to stop.")
+
+    try:
+        while True:
+            changed = next_changes(watcher, debounce)
+            started = time.perf_counter()
+            patched = live.apply(changed)
+            if not patched:
+                continue
+
+            previous = (set(errors), set(warnings))
+            errors, warnings = live.validate()
+            elapsed = (time.perf_counter() - started) * 1000
+
+            print(f"[{datetime.now():%H:%M:%S}] {', '.join(sorted(patched))}: {elapsed:.0f} ms, "
+                  f"{len(errors)} errors, {len(warnings)} warnings")
+            print_messages([e for e in errors if e not in previous[0]],
+                           [w for w in warnings if w not in previous[1]], '  + ')
+            print_messages(sorted(previous[0].difference(errors)),
+                           sorted(previous[1].difference(warnings)), '  - ')
+    except KeyboardInterrupt:
+        print("\nStopped")
+    finally:
+        watcher.close()
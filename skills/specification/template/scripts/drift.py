@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Compare .implemented.json against the current spec hashes.
+Run from project root (parent of specs/).
+
+Reports specs that are in sync, drifted (changed since they were
+implemented) and unimplemented. Inside a git repository the blob hashes
+of clean files come from a single `git ls-files` call; only files that
+are modified or untracked are hashed locally.
+
+Usage:
+    python3 scripts/drift.py [specs_dir]
+    python3 scripts/drift.py --mark what/features/login.md
+"""
+
+import json
+import os
+import subprocess
+from pathlib import Path
+
+from index import get_file_hash, walk_specs, write_json_atomic
+
+IMPLEMENTED_FILE = '.implemented.json'
+
+def find_implemented(specs_dir='specs'):
+    """Locate .implemented.json: project root first, then inside specs/."""
+    specs_path = Path(specs_dir)
+    for candidate in (specs_path.resolve().parent / IMPLEMENTED_FILE, specs_path / IMPLEMENTED_FILE):
+        if candidate.exists():
+            return candidate
+    return None
+
+def load_implemented(path):
+    """
+    Load .implemented.json as {key: hash or None}. Values may be a hash
+    string, null, or an object with a "hash" field.
+    """
+    with open(path) as f:
+        data = json.load(f) or {}
+    recorded = {}
+    for key, value in data.items():
+        if isinstance(value, dict):
+            value = value.get('hash')
+        recorded[key] = value or None
+    return recorded
+
+def spec_paths(specs_dir='specs'):
+    """Spec paths from specs-index.json, or from the tree if there is no index."""
+    index_path = os.path.join(specs_dir, 'specs-index.json')
+    if os.path.exists(index_path):
+        with open(index_path) as f:
+            return list(json.load(f)['specs'])
+    return walk_specs(Path(specs_dir))
+
+def git_blob_hashes(specs_dir='specs'):
+    """
+    Blob hashes of spec files from one `git ls-files` call, keyed by path
+    relative to specs_dir. Files git reports as modified or untracked are
+    left out (their hash must be computed from the working tree).
+    Returns None when specs_dir is not inside a git work tree.
+    """
+    try:
+        result = subprocess.run(
+            ['git', 'ls-files', '-z', '-t', '-s', '-m', '-o', '--exclude-standard', '--', '.'],
+            cwd=specs_dir, capture_output=True, check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+    hashes = {}
+    dirty = set()
+    for record in result.stdout.decode('utf-8', 'replace').split('\0'):
+        if not record:
+            continue
+        tag, _, rest = record.partition(' ')
+        if tag == 'H':
+            # "H <mode> <hash> <stage>\t<path>"
+            info, _, path = rest.partition('\t')
+            hashes[path] = info.split()[1]
+        else:
+            # "C ..." modified, "? <path>" untracked
+            dirty.add(rest.partition('\t')[2] if '\t' in rest else rest)
+    for path in dirty:
+        hashes.pop(path, None)
+    return hashes
+
+def current_hashes(specs_dir='specs', paths=None, use_git=True):
+    """Full blob hashes of the given spec paths (relative to specs_dir)."""
+    paths = spec_paths(specs_dir) if paths is None else paths
+    known = (git_blob_hashes(specs_dir) if use_git else None) or {}
+    hashes = {}
+    for path in paths:
+        if path in known:
+            hashes[path] = known[path]
+        elif os.path.exists(os.path.join(specs_dir, path)):
+            hashes[path] = get_file_hash(os.path.join(specs_dir, path))
+    return hashes
+
+def implemented_key(specs_dir, path):
+    """
+    Key of a spec in .implemented.json: its path from the project root
+    (the parent of specs/), e.g. specs/what/features/login.md, wherever
+    the file itself lives.
+    """
+    specs_path = Path(specs_dir).resolve()
+    return (Path(specs_path.name) / path).as_posix()
+
+def recorded_key(recorded, specs_dir, path):
+    """
+    The key under which a spec is recorded: the project-root key, or the
+    path relative to specs/ that some files use. The project-root key if
+    neither is present.
+    """
+    key = implemented_key(specs_dir, path)
+    if key not in recorded and path in recorded:
+        return path
+    return key
+
+def check_drift(specs_dir='specs', implemented_path=None, use_git=True, hashes=None):
+    """
+    Compare recorded hashes with current ones.
+
+    Returns a dict with lists 'in_sync', 'drifted' (path, recorded,
+    current), 'unimplemented' and 'missing' (recorded keys whose spec no
+    longer exists). Recorded hashes may be abbreviated (e.g. 8 chars).
+    hashes ({path: full blob hash}, e.g. from the index) skips hashing.
+    """
+    implemented_path = implemented_path or find_implemented(specs_dir)
+    recorded = load_implemented(implemented_path) if implemented_path else {}
+    if hashes is None:
+        hashes = current_hashes(specs_dir, use_git=use_git)
+
+    report = {'in_sync': [], 'drifted': [], 'unimplemented': [], 'missing': []}
+    seen = set()
+    for path in sorted(hashes):
+        key = recorded_key(recorded, specs_dir, path)
+        seen.add(key)
+        recorded_hash = recorded.get(key)
+        if not recorded_hash:
+            report['unimplemented'].append(path)
+        elif hashes[path].startswith(recorded_hash.lower()):
+            report['in_sync'].append(path)
+        else:
+            report['drifted'].append((path, recorded_hash, hashes[path]))
+
+    report['missing'] = sorted(key for key in recorded if key not in seen)
+    return report
+
+def mark_implemented(specs_dir, paths, implemented_path=None, use_git=True):
+    """
+    Record the current full blob hash of each spec in .implemented.json.
+    The file is rewritten atomically. Returns {key: hash} of updated entries.
+    """
+    implemented_path = implemented_path or find_implemented(specs_dir) or \
+        Path(specs_dir).resolve().parent / IMPLEMENTED_FILE
+    data = {}
+    if Path(implemented_path).exists():
+        with open(implemented_path) as f:
+            data = json.load(f) or {}
+
+    hashes = current_hashes(specs_dir, paths, use_git)
+    updated = {}
+    for path, spec_hash in hashes.items():
+        key = recorded_key(data, specs_dir, path)
+        if isinstance(data.get(key), dict):
+            data[key]['hash'] = spec_hash
+        else:
+            data[key] = spec_hash
+        updated[key] = spec_hash
+
+    write_json_atomic(implemented_path, dict(sorted(data.items())), indent=2)
+    return updated
+
+def normalize_spec_arg(specs_dir, name):
+    """Accept a spec as specs/what/x.md, what/x.md or what/x."""
+    name = name.strip().lstrip('/')
+    prefix = Path(specs_dir).as_posix().rstrip('/') + '/'
+    if name.startswith(prefix):
+        name = name[len(prefix):]
+    if not name.endswith('.md'):
+        name += '.md'
+    return name
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Compare .implemented.json against current spec hashes.')
+    parser.add_argument('specs_dir', nargs='?', default='specs')
+    parser.add_argument('--mark', nargs='+', metavar='SPEC',
+                        help='Record the current hash of these specs as implemented')
+    parser.add_argument('--no-git', action='store_true', help='Hash every file instead of asking git')
+    parser.add_argument('--json', action='store_true', help='Print the report as JSON')
+    args = parser.parse_args()
+    use_git = not args.no_git
+
+    if args.mark:
+        paths = [normalize_spec_arg(args.specs_dir, name) for name in args.mark]
+        missing = [path for path in paths if not os.path.exists(os.path.join(args.specs_dir, path))]
+        if missing:
+            print(f"Spec not found: {', '.join(missing)}")
+            exit(1)
+        for key, spec_hash in mark_implemented(args.specs_dir, paths, use_git=use_git).items():
+            print(f"Marked {key}: {spec_hash[:8]}")
+        exit(0)
+
+    report = check_drift(args.specs_dir, use_git=use_git)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        exit(0)
+
+    print("Implementation:")
+    print(f"  In sync:       {len(report['in_sync'])}")
+    print(f"  Drifted:       {len(report['drifted'])}")
+    print(f"  Unimplemented: {len(report['unimplemented'])}")
+
+    if report['drifted']:
+        print("\nDrifted:")
+        for path, recorded_hash, current_hash in report['drifted']:
+            print(f"  {path}: {recorded_hash[:8]} -> {current_hash[:8]}")
+
+    if report['missing']:
+        print("\nRecorded but missing:")
+        for key in report['missing']:
+            print(f"  {key}")
@@ -0,0 +1,590 @@
+#!/usr/bin/env python3
+"""
+YAML subset parser for spec frontmatter and schema files.
+
+Supports what specs and schemas use: nested block mappings and
+sequences (including "- key: value" items), flow sequences and mappings
+(quoted commas included, spanning lines, and "[key: value]" pairs),
+quoted and plain scalars (continued on more indented lines, folded as
+YAML does), literal (|) and folded (>) block scalars, and comments.
+Anchors, aliases and tags are not supported and raise a YAMLError that
+says so. Errors are raised as YAMLError with a 1-based line and column.
+
+Spec frontmatter keeps every scalar as a string, exactly like PyYAML's
+BaseLoader, whose libyaml (C) version is used when PyYAML is installed.
+Flat "key: value" frontmatter, the common case, takes a fast path that
+skips the full parser. Schema files (load_yaml) resolve plain scalars to
+numbers, booleans and null.
+"""
+
+import json
+import re
+
+class YAMLError(ValueError):
+    """A YAML syntax error at a 1-based line and column."""
+
+    def __init__(self, message, line=None, column=None):
+        self.message = message
+        self.line = line
+        self.column = column
+        where = f"line {line}, column {column}: " if line else ''
+        super().__init__(f"{where}{message}")
+
+# ---------------------------------------------------------------------------
+# Scalars
+# ---------------------------------------------------------------------------
+
+def _split_flow(text):
+    """Split the inside of a flow collection on top-level commas."""
+    items, depth, quote, start = [], 0, None, 0
+    for i, ch in enumerate(text):
+        if quote:
+            if ch == quote:
+                quote = None
+        elif ch in '"\'':
+            quote = ch
+        elif ch in '[{':
+            depth += 1
+        elif ch in ']}':
+            depth -= 1
+        elif ch == ',' and depth == 0:
+            items.append(text[start:i].strip())
+            start = i + 1
+    items.append(text[start:].strip())
+    if not all(items[:-1]):
+        raise YAMLError(f"empty entry in flow collection: {text!r}")
+    return [item for item in items if item]
+
+def _flow_depth(text):
+    """Net number of open flow brackets in a line (outside quotes)."""
+    depth, quote = 0, None
+    for ch in text:
+        if quote:
+            if ch == quote:
+                quote = None
+        elif ch in '"\'':
+            quote = ch
+        elif ch in '[{':
+            depth += 1
+        elif ch in ']}':
+            depth -= 1
+    return depth
+
+def _parse_quoted(text):
+    if text.startswith(('"', "'")) and _quote_end(text) != len(text) - 1:
+        if _quote_end(text) is None:
+            raise YAMLError(f"unterminated quoted scalar: {text!r}")
+        raise YAMLError(f"unexpected text after quoted scalar: {text!r}")
+    if text.startswith('"') and text.endswith('"') and len(text) > 1:
+        try:
+            return True, json.loads(text)
+        except ValueError:
+            return True, text[1:-1]
+    if text.startswith("'") and text.endswith("'") and len(text) > 1:
+        return True, text[1:-1].replace("''", "'")
+    return False, None
+
+def _flow_item(item, scalar):
+    """An item of a flow sequence: a scalar, or a {key: value} for a "key: value" pair."""
+    pair = _KEY_RE.match(item)
+    if pair and not item.startswith(('"', "'")):
+        return {scalar(pair.group(1)): scalar(pair.group(2) or '')}
+    return scalar(item)
+
+def _parse_flow(text, scalar):
+    if text.startswith('[') and text.endswith(']'):
+        return True, [_flow_item(item, scalar) for item in _split_flow(text[1:-1])]
+    if text.startswith('{') and text.endswith('}'):
+        result = {}
+        for item in _split_flow(text[1:-1]):
+            key, _, value = item.partition(':')
+            result[scalar(key.strip())] = scalar(value.strip())
+        return True, result
+    if text.startswith(('[', '{')):
+        raise YAMLError(f"unterminated flow collection: {text!r}")
+    return False, None
+
+_NOT_PLAIN_START = tuple('[]{}|>"\'&*!%@`#,?:')
+_UNSUPPORTED = {'&': 'anchors', '*': 'aliases', '!': 'tags'}
+
+def _is_item(text):
+    return text == '-' or text.startswith('- ')
+
+def _check_supported(text):
+    if text[:1] in _UNSUPPORTED:
+        raise YAMLError(f"unsupported YAML feature ({_UNSUPPORTED[text[0]]}): {text!r}")
+    if _is_item(text):
+        raise YAMLError(f"block sequence entries are not allowed here: {text!r}")
+
+def parse_scalar(text):
+    """Parse a scalar or flow collection, resolving null, booleans and numbers."""
+    quoted, value = _parse_quoted(text)
+    if quoted:
+        return value
+    flow, value = _parse_flow(text, parse_scalar)
+    if flow:
+        return value
+    _check_supported(text)
+    if text in ('null', '~', ''):
+        return None
+    if text in ('true', 'false'):
+        return text == 'true'
+    if re.fullmatch(r'-?\d+', text):
+        return int(text)
+    if re.fullmatch(r'-?\d+\.\d+', text):
+        return float(text)
+    return text
+
+def parse_string(text):
+    """Parse a scalar or flow collection, keeping every scalar a string (BaseLoader)."""
+    quoted, value = _parse_quoted(text)
+    if quoted:
+        return value
+    flow, value = _parse_flow(text, parse_string)
+    if flow:
+        return value
+    _check_supported(text)
+    return text
+
+# ---------------------------------------------------------------------------
+# Block structure
+# ---------------------------------------------------------------------------
+
+_KEY_RE = re.compile(r'^("(?:[^"\\]|\\.)*"|\'[^\']*\'|[^\s\'"\[{#][^:]*?)\s*:(?:\s+(.*))?$')
+_FLOW_START_RE = re.compile(r'(?:^|^-\s+|:\s+)[\[{]')
+_BLOCK_HEADER_RE = re.compile(r'(?:^-|:)\s+([|>])([1-9+-]{0,2})$')
+
+def _strip_comment(line):
+    """Remove a trailing # comment that is not inside quotes."""
+    quote = None
+    for i, ch in enumerate(line):
+        if quote:
+            if ch == quote:
+                quote = None
+        elif ch in '"\'':
+            quote = ch
+        elif ch == '#' and (i == 0 or line[i - 1] in ' \t'):
+            return line[:i].rstrip()
+    return line.rstrip()
+
+def _indent(line):
+    return len(line) - len(line.lstrip(' '))
+
+def _fold(lines):
+    """Join the lines of a folded (>) block scalar."""
+    out = []
+    for n, line in enumerate(lines):
+        if n:
+            prev = lines[n - 1]
+            if not prev:
+                out.append('\n')
+            elif not line:
+                out.append('\n' if prev.startswith((' ', '\t')) else '')
+            elif prev.startswith((' ', '\t')) or line.startswith((' ', '\t')):
+                out.append('\n')
+            else:
+                out.append(' ')
+        out.append(line)
+    return ''.join(out)
+
+def _block_scalar(raw, start, parent_indent, style, explicit, chomp):
+    """
+    Read a block scalar whose header is on raw line start-1. Returns
+    (value, index of the first raw line after the block).
+    """
+    indent = parent_indent + int(explicit) if explicit else None
+    end = start
+    while end < len(raw):
+        line = raw[end]
+        if line.strip():
+            if indent is None:
+                indent = _indent(line)
+                if indent <= parent_indent:
+                    break
+            elif _indent(line) < indent:
+                break
+        end += 1
+
+    content = [raw[n][indent:] if raw[n].strip() else '' for n in range(start, end)] if indent else []
+    trailing = 0
+    while content and not content[-1]:
+        content.pop()
+        trailing += 1
+
+    text = _fold(content) if style == '>' else '\n'.join(content)
+    if chomp == '-':
+        value = text
+    elif chomp == '+':
+        value = text + '\n' * (trailing + (1 if content else 0))
+    else:
+        value = text + '\n' if content else ''
+    return value, end
+
+def _quote_end(text):
+    """Index of the quote closing the quoted scalar text starts with, or None if it is still open."""
+    quote = text[0]
+    i = 1
+    while i < len(text):
+        if quote == '"' and text[i] == '\\':
+            i += 2
+            continue
+        if text[i] == quote:
+            if quote == "'" and text[i + 1:i + 2] == "'":
+                i += 2
+                continue
+            return i
+        i += 1
+    return None
+
+def _fold_lines(lines, newline='\n', escapes=False):
+    """
+    Join the lines of a multi-line flow scalar: each line break becomes a
+    space, and runs of empty lines become that many newlines. With escapes
+    (double quotes), a line ending in a backslash joins the next directly.
+    """
+    out = lines[0].rstrip(' \t')
+    breaks = 0
+    for line in lines[1:]:
+        line = line.strip(' \t')
+        if not line:
+            breaks += 1
+            continue
+        if escapes and (len(out) - len(out.rstrip('\\'))) % 2:
+            out = out[:-1]
+        else:
+            out += newline * breaks if breaks else ' '
+        out += line
+        breaks = 0
+    return out
+
+def _inline_scalar(text, indent):
+    """
+    Where the scalar a "key: value" or "- value" line ends with starts in
+    text, and the column of the key or dash that owns it; None if the line
+    ends without one.
+    """
+    offset, column = 0, indent
+    while _is_item(text[offset:]):
+        column = indent + offset
+        rest = text[offset + 1:].lstrip()
+        if not rest:
+            return None
+        offset = len(text) - len(rest)
+    match = _KEY_RE.match(text[offset:])
+    if match:
+        if not match.group(2):
+            return None
+        column = indent + offset
+        offset += match.start(2)
+    elif not offset:
+        return None
+    return offset, column
+
+def _continued_scalar(raw, start, first, column, lineno):
+    """
+    Value of a quoted scalar left open on its first line, or of a plain
+    scalar continued on the following lines indented past column. Returns
+    (value, index of the first raw line after it); value is None when the
+    scalar ends on its first line.
+    """
+    if first[0] in '"\'':
+        text, end = first, start
+        while _quote_end(text) is None:
+            if end == len(raw):
+                raise YAMLError("unterminated quoted scalar", lineno, column + 1)
+            text += '\n' + raw[end]
+            end += 1
+        tail = text[_quote_end(text) + 1:]
+        if tail.strip() and not re.match(r'\s+#', tail):
+            raise YAMLError("unexpected text after quoted scalar", lineno, column + 1)
+        text = text[:_quote_end(text) + 1]
+        if first[0] == '"':
+            return _parse_quoted(_fold_lines(text.split('\n'), '\\n', escapes=True))[1], end
+        return _parse_quoted(_fold_lines(text.split('\n')))[1], end
+
+    if first.startswith(_NOT_PLAIN_START) or _is_item(first):
+        return None, start
+    lines, end, n = [first], start, start
+    while n < len(raw):
+        line = _strip_comment(raw[n])
+        n += 1
+        if not line.strip():
+            if raw[n - 1].strip():
+                break  # a comment ends the scalar
+            lines.append('')
+            continue
+        if _indent(line) <= column or ': ' in line or line.endswith(':'):
+            break
+        lines.append(line)
+        end = n
+    if end == start:
+        return None, start
+    return _fold_lines(lines[:end - start + 1]), end
+
+def _tokenize(text):
+    """
+    Split YAML text into structural lines [indent, text, line number, block
+    scalar value or None], dropping comments and blank lines and joining
+    flow collections that span lines.
+    """
+    raw = text.splitlines()
+    tokens = []
+    n = 0
+    while n < len(raw):
+        line = _strip_comment(raw[n])
+        lineno = n + 1
+        n += 1
+        if not line.strip():
+            continue
+        if line[_indent(line)] == '\t':
+            raise YAMLError("tabs are not allowed for indentation", lineno, _indent(line) + 1)
+
+        indent = _indent(line)
+        stripped = line.strip()
+        block = None
+
+        flow = _FLOW_START_RE.search(stripped)
+        depth = _flow_depth(stripped[flow.end() - 1:]) if flow else 0
+        while depth > 0 and n < len(raw):
+            more = _strip_comment(raw[n]).strip()
+            n += 1
+            stripped += ' ' + more if more else ''
+            depth = _flow_depth(stripped[flow.end() - 1:])
+        if depth > 0:
+            raise YAMLError("unterminated flow collection", lineno, indent + 1)
+
+        header = _BLOCK_HEADER_RE.search(stripped)
+        if header:
+            indicators = header.group(2)
+            explicit = ''.join(ch for ch in indicators if ch.isdigit())
+            chomp = indicators.replace(explicit, '')
+            block, n = _block_scalar(raw, n, indent, header.group(1), explicit, chomp)
+            stripped = stripped[:header.start(1)].rstrip()
+        elif not flow:
+            scalar = _inline_scalar(stripped, indent)
+            if scalar:
+                offset, column = scalar
+                block, n = _continued_scalar(raw, n, stripped[offset:], column, lineno)
+                if block is not None:
+                    stripped = stripped[:offset].rstrip()
+        tokens.append([indent, stripped, lineno, block])
+    return tokens
+
+class _Parser:
+    def __init__(self, tokens, scalar):
+        self.tokens = tokens
+        self.scalar = scalar
+
+    def error(self, message, i):
+        indent, _, lineno, _ = self.tokens[i]
+        return YAMLError(message, lineno, indent + 1)
+
+    def value(self, i, rest):
+        """Value of an inline "key: rest" / "- rest" on token i."""
+        if self.tokens[i][3] is not None:
+            return self.tokens[i][3]
+        return self.scalar_at(i, rest)
+
+    def scalar_at(self, i, text):
+        try:
+            return self.scalar(text)
+        except YAMLError as e:
+            raise self.error(e.message, i)
+
+    def node(self, i, indent):
+        if _is_item(self.tokens[i][1]):
+            return self.sequence(i, indent)
+        return self.mapping(i, indent)
+
+    def child(self, i, indent, key=True):
+        """
+        Parse the block value that follows a "key:" (key=True) or "-" line at
+        the given indent. Only a key's value can be a sequence at its own
+        indent; after a "-" that is the next item.
+        """
+        if i < len(self.tokens):
+            child_indent, text = self.tokens[i][:2]
+            if child_indent > indent or (key and child_indent == indent and _is_item(text)):
+                return self.node(i, child_indent)
+        return self.scalar(''), i
+
+    def mapping(self, i, indent):
+        result = {}
+        tokens = self.tokens
+        while i < len(tokens) and tokens[i][0] == indent and not _is_item(tokens[i][1]):
+            match = _KEY_RE.match(tokens[i][1])
+            if not match:
+                if tokens[i][3] is not None:
+                    raise self.error("block scalar outside a mapping value", i)
+                raise self.error(f"expected 'key: value', got {tokens[i][1]!r}", i)
+            key = self.scalar_at(i, match.group(1))
+            rest = match.group(2)
+            if rest or tokens[i][3] is not None:
+                result[key] = self.value(i, rest or '')
+                i += 1
+            else:
+                result[key], i = self.child(i + 1, indent)
+        return result, i
+
+    def sequence(self, i, indent):
+        items = []
+        tokens = self.tokens
+        while i < len(tokens) and tokens[i][0] == indent and _is_item(tokens[i][1]):
+            rest = tokens[i][1][1:].lstrip()
+            if tokens[i][3] is not None and not rest:
+                value = tokens[i][3]
+                i += 1
+            elif not rest:
+                value, i = self.child(i + 1, indent, key=False)
+            elif _is_item(rest):
+                # "- - item" starts a sequence indented past the first dash
+                tokens[i] = [indent + len(tokens[i][1]) - len(rest), rest, tokens[i][2], tokens[i][3]]
+                value, i = self.sequence(i, tokens[i][0])
+            elif _KEY_RE.match(rest) and not rest.startswith(('"', "'", '[', '{')):
+                # "- key: value" starts a mapping indented past the dash
+                tokens[i] = [indent + len(tokens[i][1]) - len(rest), rest, tokens[i][2], tokens[i][3]]
+                value, i = self.mapping(i, tokens[i][0])
+            else:
+                value = self.value(i, rest)
+                i += 1
+            items.append(value)
+        return items, i
+
+    def parse(self):
+        if not self.tokens:
+            return None
+        value, i = self.node(0, self.tokens[0][0])
+        if i < len(self.tokens):
+            raise self.error("unexpected indentation" if self.tokens[i][0] != self.tokens[0][0]
+                             else "mapping and sequence mixed at the same level", i)
+        return value
+
+def load_yaml(text):
+    """Parse YAML text with typed scalars (schema files). Empty input gives {}."""
+    value = _Parser(_tokenize(text), parse_scalar).parse()
+    return {} if value is None else value
+
+def load_yaml_strings(text):
+    """Parse YAML text keeping every scalar a string (PyYAML BaseLoader semantics)."""
+    return _Parser(_tokenize(text), parse_string).parse()
+
+# ---------------------------------------------------------------------------
+# Frontmatter
+# ---------------------------------------------------------------------------
+
+_FLAT_RE = re.compile(r'([A-Za-z_$][\w$.-]*):(?:[ \t]+(.*?))?[ \t]*')
+_FLAT_ITEM_RE = re.compile(r'( *)- +(.*?)[ \t]*')
+_QUOTED_RE = re.compile(r'"([^"\\]*)"|\'([^\']*)\'')
+
+def _simple_scalar(value, in_flow=False):
+    """A plain or simply quoted scalar as a string, or None if it needs the full parser."""
+    quoted = _QUOTED_RE.fullmatch(value)
+    if quoted:
+        return quoted.group(1) if quoted.group(1) is not None else quoted.group(2)
+    if (value.startswith(_NOT_PLAIN_START) or value == '-' or value.startswith('- ')
+            or ' #' in value or '\t#' in value or ': ' in value or value.endswith(':')):
+        return None
+    if in_flow and any(ch in value for ch in '[]{},"\''):
+        return None
+    return value
+
+def _simple_value(value):
+    """Value of a flat "key: value" line (scalar or one-line flow sequence), or None."""
+    if not value:
+        return ''
+    if value.startswith('[') and value.endswith(']'):
+        inner = value[1:-1].strip()
+        if not inner:
+            return []
+        if re.search(r'^,|,\s*,', inner):
+            return None
+        items = [_simple_scalar(item.strip(), True) for item in _split_flow(inner)]
+        return None if None in items else items
+    return _simple_scalar(value)
+
+def _flat_frontmatter(text):
+    """
+    Fast path: top-level "key: value" lines whose values are plain or simply
+    quoted scalars, one-line flow sequences of those, or "- item" lists.
+    Returns None if anything else appears.
+    """
+    result = {}
+    list_key = None
+    item_indent = None
+    for line in text.splitlines():
+        if not line or line[0] == '#' or not line.strip():
+            continue
+        if line[0] in ' -':
+            item = _FLAT_ITEM_RE.fullmatch(line)
+            if not item or list_key is None or item_indent not in (None, len(item.group(1))):
+                return None
+            value = _simple_scalar(item.group(2))
+            if value is None:
+                return None
+            if item_indent is None:
+                item_indent = len(item.group(1))
+                result[list_key] = []
+            result[list_key].append(value)
+            continue
+
+        match = _FLAT_RE.fullmatch(line)
+        if not match:
+            return None
+        value = _simple_value(match.group(2) or '')
+        if value is None:
+            return None
+        result[match.group(1)] = value
+        list_key = match.group(1) if value == '' else None
+        item_indent = None
+    return result
+
+_libyaml = None
+
+def _libyaml_loader():
+    """PyYAML's libyaml BaseLoader, or False when it is not installed."""
+    global _libyaml
+    if _libyaml is None:
+        try:
+            import yaml
+            _libyaml = (yaml.load, yaml.CBaseLoader, yaml.YAMLError)
+        except (ImportError, AttributeError):
+            _libyaml = False
+    return _libyaml
+
+# Names the pure parser in parse cache keys; bump it when its output changes
+PURE_PARSER = 'pure2'
+
+def frontmatter_parser(use_libyaml=True):
+    """
+    Which parser parse_frontmatter falls back to: 'libyaml' or PURE_PARSER.
+    They can disagree on YAML the pure parser does not support, so cached
+    parse results record it.
+    """
+    return 'libyaml' if use_libyaml and _libyaml_loader() else PURE_PARSER
+
+def parse_frontmatter(text, use_libyaml=True):
+    """
+    Parse spec frontmatter into a dict whose scalars are all strings.
+    Raises YAMLError (line/column relative to the frontmatter text).
+    """
+    result = _flat_frontmatter(text)
+    if result is not None:
+        return result
+
+    libyaml = _libyaml_loader() if use_libyaml else False
+    if libyaml:
+        load, loader, error = libyaml
+        try:
+            result = load(text, Loader=loader)
+        except error as e:
+            mark = getattr(e, 'problem_mark', None)
+            message = getattr(e, 'problem', None) or str(e)
+            raise YAMLError(message, mark.line + 1 if mark else None, mark.column + 1 if mark else None)
+    else:
+        result = load_yaml_strings(text)
+
+    if result is None:
+        return {}
+    if not isinstance(result, dict):
+        raise YAMLError("frontmatter must be a mapping", 1, 1)
+    return result
@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+Spec reference graph: algorithms and the persistent adjacency index.
+
+In-memory graphs are adjacency mappings: plain dicts {spec_path:
+[referenced spec paths]} or a model.SpecGraph (integer nodes, array
+edges). Everything here is iterative, so deep reference chains cannot
+hit Python's recursion limit.
+
+index.py also writes specs-graph.json next to specs-index.json: spec
+paths numbered by integer id, with forward and reverse edge lists, so
+"who references X" is a lookup instead of a scan.
+
+Usage:
+    python3 scripts/graph.py refs-to what/features/checkout
+    python3 scripts/graph.py refs-from FEAT-001
+    python3 scripts/graph.py path-between why/vision what/entities/order
+    python3 scripts/graph.py impact why/constraints/gdpr --layer what --layer how
+"""
+
+import json
+import os
+from collections import deque
+
+from model import SpecGraph
+
+GRAPH_FILE = 'specs-graph.json'
+
+def strongly_connected_components(graph):
+    """
+    Return the strongly connected components of a graph (iterative Tarjan),
+    in reverse topological order. Runs in O(nodes + edges).
+    """
+    index_of = {}
+    low = {}
+    on_stack = set()
+    stack = []
+    components = []
+    counter = 0
+
+    for root in graph:
+        if root in index_of:
+            continue
+
+        index_of[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack.add(root)
+        work = [(root, iter(graph.get(root, ())))]
+
+        while work:
+            node, successors = work[-1]
+            for succ in successors:
+                if succ not in index_of:
+                    index_of[succ] = low[succ] = counter
+                    counter += 1
+                    stack.append(succ)
+                    on_stack.add(succ)
+                    work.append((succ, iter(graph.get(succ, ()))))
+                    break
+                if succ in on_stack and index_of[succ] < low[node]:
+                    low[node] = index_of[succ]
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    if low[node] < low[parent]:
+                        low[parent] = low[node]
+                if low[node] == index_of[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    components.append(component)
+
+    return components
+
+def cycle_groups(graph):
+    """
+    Every group of specs that reference each other in a cycle: SCCs with
+    more than one member, plus specs that reference themselves.
+    Members are sorted and groups are ordered by their first member.
+    """
+    groups = []
+    for component in strongly_connected_components(graph):
+        if len(component) > 1 or component[0] in graph.get(component[0], ()):
+            groups.append(sorted(component))
+    return sorted(groups)
+
+def shortest_cycle(graph, start, members):
+    """
+    Shortest cycle from start back to itself, staying inside members.
+    Returned as a path that begins and ends with start.
+    """
+    parents = {start: None}
+    queue = deque([start])
+    while queue:
+        node = queue.popleft()
+        for succ in graph.get(node, ()):
+            if succ == start:
+                path = [start]
+                while node is not None:
+                    path.append(node)
+                    node = parents[node]
+                path.reverse()
+                return path
+            if succ in members and succ not in parents:
+                parents[succ] = node
+                queue.append(succ)
+    return [start, start]
+
+def build_adjacency(index, graph=None):
+    """
+    Compact adjacency form of an index's references (the JSON shape of its
+    SpecGraph). Node ids are positions in 'paths': existing specs first
+    (same order as the index), then referenced paths that do not exist.
+    """
+    if graph is None:
+        graph = SpecGraph.from_index(index)
+    specs = index['specs']
+    nodes = range(len(graph.paths))
+    return {
+        'generated_at': index['generated_at'],
+        'spec_count': graph.spec_count,
+        'paths': graph.paths,
+        'ids': [specs[path]['id'] for path in graph.paths[:graph.spec_count]],
+        'types': [specs[path]['type'] for path in graph.paths[:graph.spec_count]],
+        'forward': [graph.successors(node).tolist() for node in nodes],
+        'reverse': [graph.predecessors(node).tolist() for node in nodes],
+    }
+
+def write_adjacency(index, specs_dir='specs', graph=None):
+    """Write specs-graph.json next to specs-index.json (graph: its SpecGraph, if built). Returns its path."""
+    output_file = os.path.join(specs_dir, GRAPH_FILE)
+    tmp = os.path.join(specs_dir, f".{GRAPH_FILE}.{os.getpid()}.tmp")
+    with open(tmp, 'w') as f:
+        json.dump(build_adjacency(index, graph), f, separators=(',', ':'))
+    os.replace(tmp, output_file)
+    return output_file
+
+def load_adjacency(specs_dir='specs'):
+    """Load specs-graph.json and add lookup tables by path and by spec id."""
+    with open(os.path.join(specs_dir, GRAPH_FILE)) as f:
+        return add_lookups(json.load(f))
+
+def add_lookups(graph):
+    """
+    Add the 'node' (by path) and 'id_node' (by spec id) lookup tables to a
+    graph. Ids that are not strings (e.g. `id: 42` or a list) are skipped,
+    as in index.py's Resolver: no ref can name them.
+    """
+    graph['node'] = {path: i for i, path in enumerate(graph['paths'])}
+    graph['id_node'] = {spec_id: i for i, spec_id in enumerate(graph['ids']) if isinstance(spec_id, str)}
+    return graph
+
+def resolve_node(graph, name):
+    """Node id for a spec path (with or without .md or a specs/ prefix) or spec id."""
+    name = name.strip().lstrip('/')
+    if name.startswith('specs/'):
+        name = name[len('specs/'):]
+    for candidate in (name, name + '.md'):
+        if candidate in graph['node']:
+            return graph['node'][candidate]
+    return graph['id_node'].get(name)
+
+def refs_to(graph, node):
+    """Paths of specs that reference a node."""
+    return [graph['paths'][i] for i in graph['reverse'][node]]
+
+def refs_from(graph, node):
+    """Paths a node references."""
+    return [graph['paths'][i] for i in graph['forward'][node]]
+
+def path_between(graph, start, goal):
+    """Shortest chain of references from start to goal (as paths), or None."""
+    parents = {start: None}
+    queue = deque([start])
+    while queue:
+        node = queue.popleft()
+        if node == goal:
+            path = []
+            while node is not None:
+                path.append(graph['paths'][node])
+                node = parents[node]
+            return path[::-1]
+        for succ in graph['forward'][node]:
+            if succ not in parents:
+                parents[succ] = node
+                queue.append(succ)
+    return None
+
+def spec_layer(path):
+    """Layer (why/what/how) of a spec path, or None."""
+    layer = path.split('/', 1)[0]
+    return layer if layer in ('why', 'what', 'how') else None
+
+def impact(graph, sources, max_depth=None, layers=None, types=None):
+    """
+    Specs downstream of the source nodes: everything that references them,
+    directly or transitively (BFS over reverse edges).
+
+    Returns [(distance, path)] sorted by distance, then path. Layer and
+    type filters select which specs are reported; traversal always passes
+    through every spec so indirect dependents are not lost.
+    """
+    distance = {node: 0 for node in sources}
+    queue = deque(sources)
+    while queue:
+        node = queue.popleft()
+        depth = distance[node]
+        if max_depth is not None and depth >= max_depth:
+            continue
+        for pred in graph['reverse'][node]:
+            if pred not in distance:
+                distance[pred] = depth + 1
+                queue.append(pred)
+
+    spec_count = graph['spec_count']
+    affected = []
+    for node, depth in distance.items():
+        if depth == 0 or node >= spec_count:
+            continue
+        path = graph['paths'][node]
+        if layers and spec_layer(path) not in layers:
+            continue
+        if types and graph['types'][node] not in types:
+            continue
+        affected.append((depth, path))
+    return sorted(affected)
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Query the spec reference graph.')
+    parser.add_argument('--specs-dir', default='specs')
+    commands = parser.add_subparsers(dest='command', required=True)
+    commands.add_parser('refs-to', help='Specs that reference a spec').add_argument('spec')
+    commands.add_parser('refs-from', help='Specs a spec references').add_argument('spec')
+    between = commands.add_parser('path-between', help='Shortest reference chain between two specs')
+    between.add_argument('source')
+    between.add_argument('target')
+    impact_parser = commands.add_parser('impact', help='Specs affected (transitively) by a change to specs')
+    impact_parser.add_argument('specs', nargs='+')
+    impact_parser.add_argument('--depth', type=int, help='Maximum distance to follow')
+    impact_parser.add_argument('--layer', action='append', choices=['why', 'what', 'how'],
+                               help='Only report specs in this layer (repeatable)')
+    impact_parser.add_argument('--type', action='append', help='Only report specs of this type (repeatable)')
+    args = parser.parse_args()
+
+    if not os.path.exists(os.path.join(args.specs_dir, GRAPH_FILE)):
+        print(f"Graph not found: {os.path.join(args.specs_dir, GRAPH_FILE)}")
+        print("Run: python3 scripts/index.py first")
+        exit(1)
+    graph = load_adjacency(args.specs_dir)
+
+    if args.command == 'path-between':
+        names = [args.source, args.target]
+    elif args.command == 'impact':
+        names = args.specs
+    else:
+        names = [args.spec]
+    nodes = [resolve_node(graph, name) for name in names]
+    for name, node in zip(names, nodes):
+        if node is None:
+            print(f"Unknown spec: {name}")
+            exit(1)
+
+    if args.command == 'refs-to':
+        for path in refs_to(graph, nodes[0]):
+            print(path)
+    elif args.command == 'refs-from':
+        for path in refs_from(graph, nodes[0]):
+            print(path)
+    elif args.command == 'impact':
+        for depth, path in impact(graph, nodes, args.depth, args.layer, args.type):
+            print(f"{depth}  {path}")
+    else:
+        path = path_between(graph, nodes[0], nodes[1])
+        if not path:
+            print(f"No reference path from {names[0]} to {names[1]}")
+            exit(1)
+        print(' -> '.join(path))
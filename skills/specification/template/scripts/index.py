@@ -9,13 +9,28 @@ Supports three-layer model: why/, what/, how/
 import os
 import json
 import hashlib
+import mmap
+import posixpath
 import re
+from bisect import bisect_left, bisect_right, insort
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 from pathlib import Path
+from contextlib import contextmanager
 from datetime import datetime
+from functools import lru_cache
+
+import timing
+from frontmatter import YAMLError, frontmatter_parser, parse_frontmatter
+from graph import write_adjacency
+from model import SpecRecord, intern, intern_index, json_default
+from parsecache import open_cache, project_cache
+from sections import parse_sections
 
 def parse_yaml(yaml_str):
     """
-    Simple YAML parser for frontmatter.
+    Simple, lenient YAML parser for frontmatter that is not valid YAML.
     Handles: scalars, inline lists [a, b], multi-line lists with dashes.
     """
     result = {}
@@ -74,27 +89,144 @@ def parse_yaml(yaml_str):
 
     return result
 
+# Files at least this large are memory-mapped instead of read into memory.
+MMAP_THRESHOLD = 1 << 20
+
+def split_frontmatter(data):
+    """
+    Locate the YAML frontmatter block in a raw spec buffer.
+    Returns (frontmatter_text, body_offset); frontmatter_text is None
+    when the file has no frontmatter.
+    """
+    if data[:3] != b'---':
+        return None, 0
+
+    end = data.find(b'---', 3)
+    if end < 0:
+        return None, 0
+
+    return data[3:end].decode('utf-8'), end + 3
+
 def extract_frontmatter(filepath):
     """Extract YAML frontmatter from markdown file."""
-    with open(filepath, 'r') as f:
+    with open(filepath, 'rb') as f:
         content = f.read()
 
-    if not content.startswith('---'):
-        return None, content
+    frontmatter_text, body_offset = split_frontmatter(content)
+    if frontmatter_text is None:
+        return None, content.decode('utf-8')
 
-    parts = content.split('---', 2)
-    if len(parts) < 3:
-        return None, content
+    return load_frontmatter(frontmatter_text)[0], content[body_offset:].decode('utf-8')
 
-    frontmatter = parse_yaml(parts[1])
-    return frontmatter, parts[2]
+def load_frontmatter(text):
+    """
+    Parse frontmatter text. Returns (frontmatter, error message or None).
+    Invalid YAML falls back to the lenient parse_yaml so the spec stays
+    indexed; error line numbers count from the file's first line.
+    """
+    try:
+        return parse_frontmatter(text), None
+    except YAMLError as e:
+        return parse_yaml(text), str(e)
+
+def blob_hash(data):
+    """Full git-style blob hash of a bytes-like buffer."""
+    digest = hashlib.sha1(b'blob %d\0' % len(data))
+    digest.update(data)
+    return digest.hexdigest()
 
 def get_file_hash(filepath):
-    """Get git-style blob hash of file."""
+    """Get git-style blob hash of file (full length, as `git hash-object` prints it)."""
     with open(filepath, 'rb') as f:
         content = f.read()
-    return hashlib.sha1(b'blob ' + str(len(content)).encode() + b'\0' + content).hexdigest()[:8]
-
+    return blob_hash(content)
+
+def write_json_atomic(path, data, **kwargs):
+    """Write JSON via a temporary file and rename, so readers never see a partial file."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp, 'w') as f:
+        json.dump(data, f, **kwargs)
+    os.replace(tmp, path)
+
+def count_lines(data):
+    """Count lines in a buffer the way str.splitlines() counts them."""
+    if isinstance(data, bytes):
+        lines = data.count(b'\n')
+    else:
+        # mmap has no count(); scan it in chunks
+        lines = sum(data[i:i + MMAP_THRESHOLD].count(b'\n')
+                    for i in range(0, len(data), MMAP_THRESHOLD))
+    if len(data) and data[-1:] != b'\n':
+        lines += 1
+    return lines
+
+@contextmanager
+def open_spec(filepath):
+    """
+    Open a spec file once for all the work done on it.
+    Yields (buffer, stat); large files are memory-mapped.
+    """
+    with open(filepath, 'rb') as f:
+        st = os.fstat(f.fileno())
+        timing.count_read(st.st_size)
+        if st.st_size >= MMAP_THRESHOLD:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                yield data, st
+        else:
+            with timing.span('read'):
+                data = f.read()
+            yield data, st
+
+def parse_spec(data):
+    """
+    Everything the index derives from a spec's content alone: frontmatter,
+    refs, section tree, line count. Empty if the file has no frontmatter.
+    This is what the parse cache stores per blob.
+    """
+    with timing.span('parse.frontmatter'):
+        frontmatter_text, body_offset = split_frontmatter(data)
+        if frontmatter_text is None:
+            return {}
+        frontmatter, error = load_frontmatter(frontmatter_text)
+    if not frontmatter:
+        return {}
+
+    parsed = {
+        'frontmatter': frontmatter,
+        'refs': timing.timed('parse.refs', extract_all_refs, frontmatter),
+        'sections': timing.timed('parse.sections', parse_sections, data, body_offset),
+        'lines': count_lines(data),
+        'body_offset': body_offset,
+    }
+    if error:
+        parsed['frontmatter_error'] = error
+    return parsed
+
+# Short names expand to these directories, using the three-layer model
+TYPE_PATHS = {
+    # Why layer
+    'vision': 'why',
+    'goal': 'why/goals',
+    'persona': 'why/personas',
+    'constraint': 'why/constraints',
+    'decision': 'why/decisions',
+    # What layer
+    'entity': 'what/entities',
+    'feature': 'what/features',
+    'rule': 'what/rules',
+    'journey': 'what/journeys',
+    'interface': 'what/interfaces',
+    # How layer
+    'agent': 'how/agents',
+    'skill': 'how/skills',
+    'lens': 'how/lenses',
+    'workflow': 'how/workflows',
+    'stack': 'how/stack',
+}
+
+@lru_cache(maxsize=8192)
 def normalize_ref(ref, ref_type=None):
     """Normalize a reference to a file path."""
     if not ref:
@@ -109,181 +241,214 @@ def normalize_ref(ref, ref_type=None):
             ref = ref + '.md'
         return ref
 
-    # Short name - expand based on type using three-layer model
-    type_paths = {
-        # Why layer
-        'vision': 'why',
-        'goal': 'why/goals',
-        'persona': 'why/personas',
-        'constraint': 'why/constraints',
-        'decision': 'why/decisions',
-        # What layer
-        'entity': 'what/entities',
-        'feature': 'what/features',
-        'rule': 'what/rules',
-        'journey': 'what/journeys',
-        'interface': 'what/interfaces',
-        # How layer
-        'agent': 'how/agents',
-        'skill': 'how/skills',
-        'lens': 'how/lenses',
-        'workflow': 'how/workflows',
-        'stack': 'how/stack',
-    }
-
-    if ref_type and ref_type in type_paths:
-        return f"{type_paths[ref_type]}/{ref}.md"
+    # Short name - expand based on type
+    if ref_type in TYPE_PATHS:
+        return f"{TYPE_PATHS[ref_type]}/{ref}.md"
 
     # Default: assume it's a path fragment
     if not ref.endswith('.md'):
         ref = ref + '.md'
     return ref
 
-def extract_all_refs(frontmatter):
-    """Extract all references from frontmatter, from multiple fields."""
+# Frontmatter fields holding references, mapped to the spec type used to
+# expand short names (None: the value is a path or path fragment). A dict
+# maps the fields of an object, or of each object in a list, the same way.
+# Every ref a shipped schema declares must be listed (tests/test_refs.py).
+REF_FIELDS = {
+    # Direct refs and cross-layer reference fields
+    'refs': None,
+    'why': None,
+    'what': None,
+    'how': None,
+    # Why layer
+    'vision': 'vision',
+    'personas': 'persona',
+    'target_personas': 'persona',
+    'goals': 'goal',
+    'constraints': 'constraint',
+    'decisions': 'decision',
+    'supersedes': 'decision',
+    'superseded_by': 'decision',
+    'implemented_by': None,
+    # What layer
+    'entities': 'entity',
+    'related_entities': 'entity',
+    'features': 'feature',
+    'rules': 'rule',
+    'journeys': 'journey',
+    'interfaces': 'interface',
+    'applies_to': None,
+    'relationships': {'entity': 'entity'},
+    # How layer
+    'agents': 'agent',
+    'skills': 'skill',
+    'lenses': 'lens',
+    'workflows': 'workflow',
+    'stacks': 'stack',
+    'implements': None,
+    'trigger': {'initiated_by': 'agent'},
+    # Hierarchy
+    'children': None,
+    'parent': None,
+}
+
+def extract_all_refs(frontmatter, fields=REF_FIELDS):
+    """Extract all references from frontmatter in one pass over its fields."""
     refs = set()
+    for field, values in frontmatter.items():
+        if field not in fields:
+            continue
+        ref_type = fields[field]
+        if isinstance(ref_type, dict):
+            for item in values if isinstance(values, list) else [values]:
+                if isinstance(item, dict):
+                    refs.update(extract_all_refs(item, ref_type))
+            continue
+        if isinstance(values, str):
+            values = [values]
+        elif not isinstance(values, list):
+            continue
+
+        for ref in values:
+            if isinstance(ref, str):
+                normalized = normalize_ref(ref, ref_type)
+                if normalized:
+                    refs.add(normalized)
+
+    return sorted(refs)
+
+# Directories normalize_ref puts in front of short names and ids
+HINT_DIRS = frozenset(TYPE_PATHS.values())
+
+def ref_key(ref, from_path=''):
+    """
+    Resolver key of a normalized ref: ./ and ../ paths are taken relative
+    to the referring spec, a leading / and the .md suffix are dropped.
+    """
+    if ref.startswith('.'):
+        ref = posixpath.normpath(posixpath.join(posixpath.dirname(from_path), ref))
+    ref = ref.lstrip('/')
+    return ref[:-3] if ref.endswith('.md') else ref
 
-    # Direct refs field
-    refs_list = frontmatter.get('refs', [])
-    if isinstance(refs_list, str):
-        refs_list = [refs_list]
-    for ref in refs_list:
-        normalized = normalize_ref(ref)
-        if normalized:
-            refs.add(normalized)
-
-    # Cross-layer reference fields (why, what, how)
-    for layer_field in ['why', 'what', 'how']:
-        layer_refs = frontmatter.get(layer_field, [])
-        if isinstance(layer_refs, str):
-            layer_refs = [layer_refs]
-        for ref in layer_refs:
-            normalized = normalize_ref(ref)
-            if normalized:
-                refs.add(normalized)
-
-    # Entity references
-    entities = frontmatter.get('entities', [])
-    if isinstance(entities, str):
-        entities = [entities]
-    for entity in entities:
-        normalized = normalize_ref(entity, 'entity')
-        if normalized:
-            refs.add(normalized)
-
-    # Persona references
-    personas = frontmatter.get('personas', [])
-    if isinstance(personas, str):
-        personas = [personas]
-    for persona in personas:
-        normalized = normalize_ref(persona, 'persona')
-        if normalized:
-            refs.add(normalized)
-
-    # Target personas (used in vision)
-    target_personas = frontmatter.get('target_personas', [])
-    if isinstance(target_personas, str):
-        target_personas = [target_personas]
-    for persona in target_personas:
-        normalized = normalize_ref(persona, 'persona')
-        if normalized:
-            refs.add(normalized)
-
-    # Goals
-    goals = frontmatter.get('goals', [])
-    if isinstance(goals, str):
-        goals = [goals]
-    for goal in goals:
-        normalized = normalize_ref(goal, 'goal')
-        if normalized:
-            refs.add(normalized)
-
-    # Constraints
-    constraints = frontmatter.get('constraints', [])
-    if isinstance(constraints, str):
-        constraints = [constraints]
-    for constraint in constraints:
-        normalized = normalize_ref(constraint, 'constraint')
-        if normalized:
-            refs.add(normalized)
-
-    # Decisions
-    decisions = frontmatter.get('decisions', [])
-    if isinstance(decisions, str):
-        decisions = [decisions]
-    for decision in decisions:
-        normalized = normalize_ref(decision, 'decision')
-        if normalized:
-            refs.add(normalized)
-
-    # Related entities
-    related = frontmatter.get('related_entities', [])
-    if isinstance(related, str):
-        related = [related]
-    for entity in related:
-        normalized = normalize_ref(entity, 'entity')
-        if normalized:
-            refs.add(normalized)
-
-    # Features
-    features = frontmatter.get('features', [])
-    if isinstance(features, str):
-        features = [features]
-    for feature in features:
-        normalized = normalize_ref(feature, 'feature')
-        if normalized:
-            refs.add(normalized)
-
-    # Skills (for agents)
-    skills = frontmatter.get('skills', [])
-    if isinstance(skills, str):
-        skills = [skills]
-    for skill in skills:
-        normalized = normalize_ref(skill, 'skill')
-        if normalized:
-            refs.add(normalized)
-
-    # Lenses (for agents)
-    lenses = frontmatter.get('lenses', [])
-    if isinstance(lenses, str):
-        lenses = [lenses]
-    for lens in lenses:
-        normalized = normalize_ref(lens, 'lens')
-        if normalized:
-            refs.add(normalized)
-
-    # Implements (for agents/workflows)
-    implements = frontmatter.get('implements', [])
-    if isinstance(implements, str):
-        implements = [implements]
-    for impl in implements:
-        normalized = normalize_ref(impl)
-        if normalized:
-            refs.add(normalized)
-
-    # Applies to (for constraints/rules)
-    applies_to = frontmatter.get('applies_to', [])
-    if isinstance(applies_to, str):
-        applies_to = [applies_to]
-    for apply in applies_to:
-        normalized = normalize_ref(apply)
-        if normalized:
-            refs.add(normalized)
-
-    return list(refs)
-
-def build_index(specs_dir='specs'):
-    """Build complete index of all specs."""
-    index = {
+def spec_id(entry):
+    """The id a spec declares in its frontmatter, or None."""
+    value = entry.get('id')
+    return value if isinstance(value, str) and value != entry['path'] else None
+
+def unique(paths):
+    return paths[0] if paths and len(paths) == 1 else None
+
+class Resolver:
+    """
+    Resolver table of an index: every way a ref can name a spec, mapped to
+    the spec's path, so a ref resolves in one dict lookup. Keys (see
+    ref_key) are, in order of precedence, canonical paths without .md,
+    spec ids and file basenames. An id or basename shared by several specs
+    resolves to none of them; duplicate ids are reported by validate.py.
+
+    patch_index keeps the table current with add() and remove(), then asks
+    settle() whether any key ended up resolving differently.
+    """
+
+    def __init__(self):
+        self.table = {}
+        self.paths = {}     # canonical key -> path
+        self.ids = {}       # id -> sorted paths
+        self.names = {}     # basename -> sorted paths
+        self.before = {}    # key -> what it resolved to at the last settle()
+
+    @classmethod
+    def from_specs(cls, specs):
+        """Table for a {path: entry} mapping in path order (an index's specs)."""
+        resolver = cls()
+        for path, entry in specs.items():
+            stem = path[:-3] if path.endswith('.md') else path
+            resolver.paths[stem] = path
+            resolver.names.setdefault(stem.rsplit('/', 1)[-1], []).append(path)
+            entry_id = spec_id(entry)
+            if entry_id:
+                resolver.ids.setdefault(entry_id, []).append(path)
+        table = resolver.table
+        table.update((name, paths[0]) for name, paths in resolver.names.items() if len(paths) == 1)
+        table.update((entry_id, paths[0]) for entry_id, paths in resolver.ids.items() if len(paths) == 1)
+        table.update(resolver.paths)
+        return resolver
+
+    def keys(self, entry):
+        path = entry['path']
+        stem = path[:-3] if path.endswith('.md') else path
+        return stem, spec_id(entry), stem.rsplit('/', 1)[-1]
+
+    def add(self, entry):
+        stem, entry_id, name = self.keys(entry)
+        self.paths[stem] = entry['path']
+        insort(self.names.setdefault(name, []), entry['path'])
+        if entry_id:
+            insort(self.ids.setdefault(entry_id, []), entry['path'])
+        self.refresh((stem, entry_id, name))
+
+    def remove(self, entry):
+        stem, entry_id, name = self.keys(entry)
+        self.paths.pop(stem, None)
+        for group, key in ((self.names, name), (self.ids, entry_id)):
+            if key in group:
+                discard_sorted(group[key], entry['path'])
+                if not group[key]:
+                    del group[key]
+        self.refresh((stem, entry_id, name))
+
+    def refresh(self, keys):
+        for key in keys:
+            if key is None:
+                continue
+            target = self.paths.get(key) or unique(self.ids.get(key)) or unique(self.names.get(key))
+            current = self.table.get(key)
+            if current != target:
+                self.before.setdefault(key, current)
+                if target is None:
+                    del self.table[key]
+                else:
+                    self.table[key] = target
+
+    def settle(self):
+        """Whether any key resolves differently than at the last settle()."""
+        before, self.before = self.before, {}
+        return any(self.table.get(key) != target for key, target in before.items())
+
+    def resolve(self, ref, from_path=''):
+        """Path of the spec a normalized ref names (from_path: the referring spec), or None."""
+        key = ref_key(ref, from_path)
+        target = self.table.get(key)
+        if target is None:
+            hint, _, name = key.rpartition('/')
+            if hint in HINT_DIRS:
+                # A short name or id expanded with its field's type directory
+                # (normalize_ref): accept the spec it names under that
+                # directory, or the spec with that id wherever it lives
+                target = self.table.get(name)
+                if target is not None and not target.startswith(hint + '/') and unique(self.ids.get(name)) != target:
+                    target = None
+        return target
+
+    def duplicate_ids(self):
+        """{id: paths} for ids declared by more than one spec."""
+        return {entry_id: paths for entry_id, paths in sorted(self.ids.items()) if len(paths) > 1}
+
+# Bump when the shape or extraction rules of spec entries change, so that
+# incremental runs never reuse entries produced by an older indexer.
+INDEX_VERSION = 9
+
+LAYERS = ('why', 'what', 'how')
+
+def new_index():
+    """Return an empty index skeleton."""
+    return {
         'generated_at': datetime.now().isoformat(),
+        'index_version': INDEX_VERSION,
         'specs': {},
         'by_type': {},
         'by_status': {},
-        'by_layer': {
-            'why': [],
-            'what': [],
-            'how': []
-        },
+        'by_layer': {layer: [] for layer in LAYERS},
         'relationships': {
             'refs': [],
             'parents': [],
@@ -291,103 +456,477 @@ def build_index(specs_dir='specs'):
         }
     }
 
-    all_refs = set()
-    all_specs = set()
-
-    specs_path = Path(specs_dir)
-    if not specs_path.exists():
-        print(f"Directory not found: {specs_dir}")
-        return index
-
+def walk_specs(specs_path):
+    """Return relative paths of all spec markdown files, sorted."""
+    paths = []
     for root, dirs, files in os.walk(specs_path):
         # Skip hidden directories and scripts
         dirs[:] = [d for d in dirs if not d.startswith('.') and d != 'scripts']
 
         for filename in files:
-            if not filename.endswith('.md'):
-                continue
+            if filename.endswith('.md'):
+                paths.append(str((Path(root) / filename).relative_to(specs_path)))
 
-            filepath = Path(root) / filename
-            rel_path = str(filepath.relative_to(specs_path))
+    return sorted(paths)
 
-            frontmatter, body = extract_frontmatter(filepath)
-            if not frontmatter:
-                continue
+def stat_signature(filepath):
+    """Cheap change signature of a file: [mtime_ns, size]."""
+    st = os.stat(filepath)
+    return [st.st_mtime_ns, st.st_size]
 
-            spec_id = frontmatter.get('id', rel_path)
-            spec_type = frontmatter.get('$schema', 'unknown')
-            status = frontmatter.get('status', 'unknown')
-
-            # Get all refs from multiple fields
-            all_spec_refs = extract_all_refs(frontmatter)
-
-            spec_entry = {
-                'path': rel_path,
-                'id': spec_id,
-                'title': frontmatter.get('title', filename.replace('.md', '')),
-                'type': spec_type,
-                'status': status,
-                'version': frontmatter.get('version', '0.0.0'),
-                'hash': get_file_hash(filepath),
-                'refs': all_spec_refs,
-                'parent': frontmatter.get('parent'),
-                'children': frontmatter.get('children', [])
-            }
-
-            index['specs'][rel_path] = spec_entry
-            all_specs.add(rel_path)
-
-            # Index by type
-            if spec_type not in index['by_type']:
-                index['by_type'][spec_type] = []
-            index['by_type'][spec_type].append(rel_path)
-
-            # Index by status
-            if status not in index['by_status']:
-                index['by_status'][status] = []
-            index['by_status'][status].append(rel_path)
-
-            # Index by layer
-            if rel_path.startswith('why/'):
-                index['by_layer']['why'].append(rel_path)
-            elif rel_path.startswith('what/'):
-                index['by_layer']['what'].append(rel_path)
-            elif rel_path.startswith('how/'):
-                index['by_layer']['how'].append(rel_path)
-
-            # Track relationships
-            for ref in all_spec_refs:
-                index['relationships']['refs'].append({
-                    'from': rel_path,
-                    'to': ref
-                })
-                all_refs.add(ref)
-
-            if spec_entry['parent']:
-                parent_path = normalize_ref(spec_entry['parent'])
-                if parent_path:
-                    index['relationships']['parents'].append({
-                        'child': rel_path,
-                        'parent': parent_path
-                    })
-                    all_refs.add(parent_path)
-
-    # Find orphans (specs never referenced, excluding vision)
-    for spec in all_specs:
-        if spec not in all_refs and 'vision' not in spec.lower():
-            index['relationships']['orphans'].append(spec)
+def index_file(specs_path, rel_path, previous=None, cache=None):
+    """
+    Parse one spec file into its index entry, or None if it has no frontmatter.
+    If the file's blob hash matches the previous entry, that entry is
+    returned with a refreshed stat signature instead of being re-parsed;
+    otherwise the parse is taken from (or added to) the parse cache.
+    """
+    filepath = Path(specs_path) / rel_path
+    with open_spec(filepath) as (data, st):
+        blob = timing.timed('hash', blob_hash, data)
+        stat = [st.st_mtime_ns, st.st_size]
+        if previous and previous.get('blob') == blob:
+            timing.count('unchanged')
+            return SpecRecord.from_entry(previous, stat=stat)
+
+        key = f"spec{INDEX_VERSION}:{frontmatter_parser()}:{blob}"
+        parsed = cache.get(key) if cache is not None else None
+        if parsed is None:
+            timing.count('parsed')
+            parsed = parse_spec(data)
+            if cache is not None:
+                cache.put(key, parsed)
+        else:
+            timing.count('parse_cache_hits')
+
+    if not parsed:
+        return None
+    frontmatter = parsed['frontmatter']
+    entry = {
+        'path': rel_path,
+        'id': frontmatter.get('id', rel_path),
+        'title': frontmatter.get('title', filepath.name.replace('.md', '')),
+        'type': frontmatter.get('$schema', 'unknown'),
+        'status': frontmatter.get('status', 'unknown'),
+        'version': frontmatter.get('version', '0.0.0'),
+        'hash': blob[:8],
+        'blob': blob,
+        'stat': stat,
+        'lines': parsed['lines'],
+        'body_offset': parsed['body_offset'],
+        'sections': parsed['sections'],
+        # Get all refs from multiple fields
+        'refs': parsed['refs'],
+        'parent': frontmatter.get('parent'),
+        'children': frontmatter.get('children') or [],
+        # Kept for schema validation in validate.py
+        'frontmatter': frontmatter
+    }
+    if 'frontmatter_error' in parsed:
+        entry['frontmatter_error'] = parsed['frontmatter_error']
+    return SpecRecord.from_entry(entry)
 
+def init_worker(cache_path, profile=False):
+    """
+    Pool initializer: the per-process setup (parse cache connection, PyYAML
+    import) is done here, as phase 'worker.init', so that it is not counted
+    as the time of the first spec each worker parses.
+    """
+    if profile:
+        timing.enable_worker()
+    with timing.phase('worker.init'):
+        cache = open_cache(cache_path)
+        if cache is not None:
+            cache.connect()
+        frontmatter_parser()
+
+def index_job(specs_path, rel_path, previous, cache_path, profile=False):
+    """
+    index_file in a worker process. Returns the entry, the parse cache
+    values it added and, with profile, what timing recorded for it.
+    """
+    cache = open_cache(cache_path)
+    if not profile:
+        return index_file(specs_path, rel_path, previous, cache), cache.take() if cache is not None else {}, None
+    profiler = timing.enable_worker()
+    entry = timing.spec_call(rel_path, index_file, specs_path, rel_path, previous, cache)
+    return entry, cache.take() if cache is not None else {}, profiler.drain()
+
+def parse_specs(specs_path, rel_paths, jobs=1, previous=None, cache=None):
+    """
+    Parse spec files into index entries, in the order given.
+    With jobs > 1 the per-file parse and hash work is fanned out to a
+    process pool; results are still yielded in input order, so the merged
+    index is identical to a serial run. New parses are written to the
+    parse cache once all files are done.
+    """
+    previous = previous or [None] * len(rel_paths)
+    if jobs > 1 and len(rel_paths) > 1:
+        chunksize = max(1, len(rel_paths) // (jobs * 4))
+        cache_path = cache.path if cache is not None else None
+        profile = timing.profiler is not None
+        with ProcessPoolExecutor(max_workers=jobs, initializer=init_worker,
+                                 initargs=(cache_path, profile)) as pool:
+            for entry, added, recorded in pool.map(index_job, repeat(str(specs_path)), rel_paths, previous,
+                                                   repeat(cache_path), repeat(profile), chunksize=chunksize):
+                if cache is not None:
+                    cache.update(added)
+                if recorded:
+                    timing.profiler.merge(recorded)
+                yield entry
+    else:
+        for rel_path, prev in zip(rel_paths, previous):
+            yield timing.spec_call(rel_path, index_file, specs_path, rel_path, prev, cache)
+    if cache is not None:
+        cache.flush()
+
+def spec_layer(rel_path):
+    """Return the layer (why/what/how) a spec path lives in, or None."""
+    layer = rel_path.split('/', 1)[0]
+    return layer if layer in LAYERS else None
+
+def referenced_paths(index):
+    """Count incoming refs and parent links per target path."""
+    counts = Counter()
+    for rel in index['relationships']['refs']:
+        counts[rel['to']] += 1
+    for rel in index['relationships']['parents']:
+        counts[rel['parent']] += 1
+    return counts
+
+def resolve_ref(ref, from_path, resolver=None):
+    """Path of the spec a normalized ref names, or the ref as written if it names none."""
+    target = resolver.resolve(ref, from_path) if resolver is not None else None
+    return intern(target or ref)
+
+def ref_targets(entry, resolver=None):
+    """Where a spec entry's refs point, in ref order without repeats."""
+    return list(dict.fromkeys(resolve_ref(ref, entry['path'], resolver) for ref in entry['refs']))
+
+def parent_path(entry, resolver=None):
+    """Path of a spec entry's parent (see resolve_ref), or None."""
+    if not entry.get('parent'):
+        return None
+    return resolve_ref(normalize_ref(entry['parent']), entry['path'], resolver)
+
+def add_spec(index, entry, counts, resolver=None):
+    """
+    Insert a spec entry and all of its relationships into the index,
+    with refs and parent resolved through resolver (see Resolver).
+    All lists are kept sorted by path, so inserting in any order yields
+    the same index as a full rebuild.
+    """
+    rel_path = entry['path']
+    index['specs'][rel_path] = entry
+
+    insort(index['by_type'].setdefault(entry['type'], []), rel_path)
+    insort(index['by_status'].setdefault(entry['status'], []), rel_path)
+    layer = spec_layer(rel_path)
+    if layer:
+        insort(index['by_layer'][layer], rel_path)
+
+    # Track relationships
+    refs = index['relationships']['refs']
+    pos = bisect_right(refs, rel_path, key=lambda rel: rel['from'])
+    targets = ref_targets(entry, resolver)
+    refs[pos:pos] = [{'from': rel_path, 'to': to} for to in targets]
+    counts.update(targets)
+
+    parent = parent_path(entry, resolver)
+    if parent:
+        insort(index['relationships']['parents'], {'child': rel_path, 'parent': parent},
+               key=lambda rel: rel['child'])
+        counts[parent] += 1
+
+def remove_spec(index, rel_path, counts):
+    """Remove a spec entry and all of its relationships from the index."""
+    entry = index['specs'].pop(rel_path)
+
+    for group, key in (('by_type', entry['type']), ('by_status', entry['status'])):
+        paths = index[group].get(key, [])
+        discard_sorted(paths, rel_path)
+        if not paths:
+            index[group].pop(key, None)
+    layer = spec_layer(rel_path)
+    if layer:
+        discard_sorted(index['by_layer'][layer], rel_path)
+
+    # Counts follow the targets as recorded, whatever they resolve to now
+    refs = index['relationships']['refs']
+    start = bisect_left(refs, rel_path, key=lambda rel: rel['from'])
+    end = bisect_right(refs, rel_path, key=lambda rel: rel['from'])
+    counts.subtract(rel['to'] for rel in refs[start:end])
+    del refs[start:end]
+
+    parents = index['relationships']['parents']
+    pos = bisect_left(parents, rel_path, key=lambda rel: rel['child'])
+    if pos < len(parents) and parents[pos]['child'] == rel_path:
+        counts[parents[pos]['parent']] -= 1
+        del parents[pos]
+
+    return entry
+
+def discard_sorted(items, value):
+    """Remove value from a sorted list if present."""
+    pos = bisect_left(items, value)
+    if pos < len(items) and items[pos] == value:
+        del items[pos]
+
+def update_orphans(index, counts, paths):
+    """Re-evaluate orphan status (never referenced, excluding vision) for the given paths."""
+    orphans = index['relationships']['orphans']
+    for path in paths:
+        discard_sorted(orphans, path)
+        if path in index['specs'] and counts[path] <= 0 and 'vision' not in path.lower():
+            insort(orphans, path)
+
+def touched_paths(entry, resolver=None):
+    """Paths whose orphan status may change when this entry is added or removed."""
+    paths = {entry['path']}
+    paths.update(ref_targets(entry, resolver))
+    parent = parent_path(entry, resolver)
+    if parent:
+        paths.add(parent)
+    return paths
+
+def resolve_relationships(index, resolver):
+    """
+    Re-resolve every ref and parent link of the index, after the resolver
+    table changed. Returns the new incoming counts (see referenced_paths).
+    """
+    refs = []
+    parents = []
+    for path, entry in index['specs'].items():
+        refs += [{'from': path, 'to': to} for to in ref_targets(entry, resolver)]
+        parent = parent_path(entry, resolver)
+        if parent:
+            parents.append({'child': path, 'parent': parent})
+    index['relationships']['refs'] = refs
+    index['relationships']['parents'] = parents
+    return referenced_paths(index)
+
+def build_index(specs_dir='specs', previous=None, jobs=1, use_cache=True, emit=None):
+    """
+    Build complete index of all specs.
+
+    When a previous index is given, only files whose stat signature and
+    blob hash changed are re-parsed; everything else is patched in place.
+    jobs > 1 parses files in a process pool. With use_cache, files whose
+    content was parsed before (by blob hash) come from the parse cache.
+    emit, if given, is called with each spec entry as soon as it is known
+    (see patch_index for removals).
+    """
+    specs_path = Path(specs_dir)
+    if not specs_path.exists():
+        print(f"Directory not found: {specs_dir}")
+        return new_index()
+
+    cache = project_cache(specs_dir) if use_cache else None
+    try:
+        if previous is not None and previous.get('index_version') == INDEX_VERSION:
+            return update_index(intern_index(previous), specs_path, jobs, cache, emit)
+
+        index = new_index()
+        counts = Counter()
+        with timing.phase('walk'):
+            rel_paths = walk_specs(specs_path)
+        specs = {}
+        with timing.phase('parse'):
+            for entry in parse_specs(specs_path, rel_paths, jobs, cache=cache):
+                if entry:
+                    specs[entry['path']] = entry
+                    if emit:
+                        emit(entry)
+    finally:
+        if cache is not None:
+            cache.close()
+
+    # Refs can name any spec (by id, basename, relative path), so they are
+    # resolved once all specs are known
+    with timing.phase('resolve'):
+        resolver = Resolver.from_specs(specs)
+    with timing.phase('merge'):
+        for entry in specs.values():
+            add_spec(index, entry, counts, resolver)
+
+    with timing.phase('orphans'):
+        update_orphans(index, counts, index['specs'])
     return index
 
-if __name__ == '__main__':
-    import sys
+def update_index(index, specs_path, jobs=1, cache=None, emit=None):
+    """Patch a previously built index to match the files currently on disk."""
+    with timing.phase('walk'):
+        current = walk_specs(specs_path)
+    present = set(current)
+    stale = [p for p in index['specs'] if p not in present]
+    with timing.phase('stat'):
+        for rel_path in current:
+            prev = index['specs'].get(rel_path)
+            if prev and prev.get('stat') == stat_signature(specs_path / rel_path):
+                if emit:
+                    emit(prev)
+                continue
+            stale.append(rel_path)
 
-    specs_dir = sys.argv[1] if len(sys.argv) > 1 else 'specs'
-    index = build_index(specs_dir)
+    with timing.phase('parse'):
+        patch_index(index, specs_path, stale, jobs, cache=cache, emit=emit)
+    return index
 
+def patch_index(index, specs_path, rel_paths, jobs=1, counts=None, cache=None, emit=None, resolver=None):
+    """
+    Re-read the given spec paths and patch their entries in place: paths
+    that no longer exist are removed, the rest are re-parsed (or taken
+    from the parse cache). counts (from referenced_paths) and resolver
+    (the index's Resolver) can be passed in to keep them across calls.
+    emit, if given, is called with each re-read entry and with
+    {'path': ..., 'removed': True} for each removal.
+    Returns the set of paths whose entry was added, changed or removed.
+    """
+    index['generated_at'] = datetime.now().isoformat()
+    counts = referenced_paths(index) if counts is None else counts
+    resolver = Resolver.from_specs(index['specs']) if resolver is None else resolver
+    touched = set()
+    changed = set()
+
+    def remove(rel_path):
+        entry = remove_spec(index, rel_path, counts)
+        touched.update(touched_paths(entry, resolver))
+        resolver.remove(entry)
+        changed.add(rel_path)
+
+    existing = []
+    for rel_path in rel_paths:
+        if (Path(specs_path) / rel_path).is_file():
+            existing.append(rel_path)
+        elif rel_path in index['specs']:
+            remove(rel_path)
+            if emit:
+                emit({'path': rel_path, 'removed': True})
+
+    added = False
+    previous = [index['specs'].get(rel_path) for rel_path in existing]
+    for rel_path, prev, entry in zip(existing, previous, parse_specs(specs_path, existing, jobs, previous, cache)):
+        if prev and entry and entry['blob'] == prev.get('blob'):
+            # Content unchanged (e.g. touched or checked out again)
+            prev['stat'] = entry['stat']
+            if emit:
+                emit(prev)
+            continue
+        if prev:
+            remove(rel_path)
+        if entry:
+            added = True
+            resolver.add(entry)
+            add_spec(index, entry, counts, resolver)
+            touched |= touched_paths(entry, resolver)
+            changed.add(rel_path)
+        if emit and (entry or prev):
+            emit(entry or {'path': rel_path, 'removed': True})
+
+    if added:
+        index['specs'] = dict(sorted(index['specs'].items()))
+
+    if resolver.settle():
+        # A spec came, went or changed its id: refs anywhere may now resolve differently
+        fresh = resolve_relationships(index, resolver)
+        counts.clear()
+        counts.update(fresh)
+        index['relationships']['orphans'] = []
+        touched = index['specs']
+    update_orphans(index, counts, touched)
+    return changed
+
+def read_index(index_path):
+    """Load a specs-index.json into the compact in-memory form (see model.py)."""
+    with timing.phase('load.index'), open(index_path) as f:
+        timing.count_read(os.fstat(f.fileno()).st_size)
+        return intern_index(json.load(f))
+
+def write_index(index, specs_dir='specs', sqlite=False, graph=None, adjacency=True):
+    """
+    Write specs-index.json and specs-graph.json atomically, plus
+    specs-index.sqlite if sqlite is set or that file already exists.
+    A search index (search.py), once created, is synced as well.
+    graph is the index's SpecGraph, if the caller already built one;
+    adjacency=False leaves specs-graph.json alone (the caller knows that
+    no spec's id, type or refs changed). Returns the paths written.
+    """
     output_file = os.path.join(specs_dir, 'specs-index.json')
-    with open(output_file, 'w') as f:
-        json.dump(index, f, indent=2)
+    with timing.phase('write.index'):
+        write_json_atomic(output_file, index, indent=2, default=json_default)
+    written = [output_file]
+    if adjacency:
+        with timing.phase('write.graph'):
+            written.append(write_adjacency(index, specs_dir, graph))
+
+    from sqlindex import sqlite_path, write_sqlite
+    if sqlite or os.path.exists(sqlite_path(specs_dir)):
+        with timing.phase('write.sqlite'):
+            written.append(write_sqlite(index, specs_dir))
+
+    from search import search_path, update_search
+    if os.path.exists(search_path(specs_dir)):
+        with timing.phase('write.search'):
+            update_search(index, specs_dir)
+    return written
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Generate specs-index.json from all spec files.')
+    parser.add_argument('specs_dir', nargs='?', default='specs')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Reuse the previous specs-index.json and re-parse only changed files')
+    parser.add_argument('--jobs', '-j', type=int, default=1,
+                        help='Parse files in N worker processes (0 = one per CPU)')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Do not read or write the parse cache (specs/.cache/parse.sqlite)')
+    parser.add_argument('--sqlite', action='store_true',
+                        help='Also write specs-index.sqlite (kept up to date from then on)')
+    parser.add_argument('--ndjson', action='store_true',
+                        help='Stream one JSON line per spec entry as it is parsed, then a summary line')
+    parser.add_argument('--watch', action='store_true',
+                        help='Keep running: patch the index and re-validate whenever a spec changes')
+    parser.add_argument('--poll', type=float, metavar='SECONDS',
+                        help='With --watch, poll every SECONDS instead of using inotify')
+    parser.add_argument('--profile', nargs='?', const=True, metavar='FILE',
+                        help='Record per-phase timings, bytes read and the slowest specs to FILE '
+                             '(default specs/.cache/profile-index.json) plus a Chrome trace next to it, not with --watch; '
+                             f'also enabled by {timing.ENV_VAR}=1 or {timing.ENV_VAR}=DIR')
+    args = parser.parse_args()
+    if args.ndjson and args.watch:
+        parser.error('--ndjson cannot be combined with --watch')
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+
+    specs_dir = args.specs_dir
+    profile = timing.output_path('index.py', args.profile, specs_dir)
+    if profile and not args.watch:
+        timing.enable('index.py', profile)
+    output_file = os.path.join(specs_dir, 'specs-index.json')
+
+    previous = None
+    if args.incremental and os.path.exists(output_file):
+        previous = read_index(output_file)
+
+    if args.ndjson:
+        try:
+            index = build_index(specs_dir, previous, jobs, use_cache=not args.no_cache,
+                                emit=lambda entry: print(json.dumps(entry, default=json_default), flush=True))
+            written = write_index(index, specs_dir, args.sqlite)
+            print(json.dumps({'summary': {
+                'specs': len(index['specs']),
+                'by_layer': {layer: len(paths) for layer, paths in index['by_layer'].items()},
+                'orphans': len(index['relationships']['orphans']),
+                'output': written,
+            }}))
+        except BrokenPipeError:
+            # The reader stopped early; the index is not written
+            os.dup2(os.open(os.devnull, os.O_WRONLY), 1)
+            exit(1)
+        exit(0)
+
+    index = build_index(specs_dir, previous, jobs, use_cache=not args.no_cache)
+    written = write_index(index, specs_dir, args.sqlite)
 
     print(f"Indexed {len(index['specs'])} specs")
     print(f"Layers: Why={len(index['by_layer']['why'])}, What={len(index['by_layer']['what'])}, How={len(index['by_layer']['how'])}")
@@ -395,4 +934,8 @@ if __name__ == '__main__':
     print(f"Statuses: {list(index['by_status'].keys())}")
     if index['relationships']['orphans']:
         print(f"Orphans: {len(index['relationships']['orphans'])}")
-    print(f"Output: {output_file}")
+    print(f"Output: {', '.join(written)}")
+
+    if args.watch:
+        from watch import watch
+        watch(index, specs_dir, jobs=jobs, poll=args.poll)
@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+Full-text and fielded search over specs.
+Run from project root (parent of specs/).
+
+The search index is an SQLite FTS5 table in specs/.cache/search.sqlite
+over each spec's path, id, title, frontmatter values, headings and body
+text, next to a table of the fields used as filters. It follows
+specs-index.json by blob hash: only specs whose content changed are read
+again. Once it exists, index.py (and --watch) refresh it on every write;
+a query refreshes it first if the index was rewritten since.
+
+Query syntax:
+    words           prefix match in any text field ('check' finds 'checkout')
+    "two words"     phrase
+    field:value     filter on type, status, layer, id, path (prefix) or any
+                    frontmatter field (list fields match any element)
+    -field:value    exclude
+Results are ranked by BM25, with id and title weighted above headings,
+frontmatter values and body text.
+
+Usage:
+    python3 scripts/search.py checkout
+    python3 scripts/search.py payment retry type:feature status:active
+    python3 scripts/search.py layer:what priority:high --json
+"""
+
+import json
+import os
+import re
+import sqlite3
+
+SEARCH_NAME = 'search.sqlite'
+# Bump when the tables or what gets indexed change
+SEARCH_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE docs (
+    rowid INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    blob TEXT,
+    id TEXT,
+    title TEXT,
+    type TEXT,
+    status TEXT,
+    layer TEXT,
+    frontmatter TEXT
+);
+CREATE INDEX docs_type ON docs (type);
+CREATE INDEX docs_status ON docs (status);
+CREATE INDEX docs_layer ON docs (layer);
+CREATE VIRTUAL TABLE fts USING fts5(
+    path, id, title, fields, headings, body, tokenize = 'porter unicode61'
+);
+"""
+
+# bm25 weights for the fts columns, in order
+WEIGHTS = (3.0, 10.0, 10.0, 2.0, 4.0, 1.0)
+COLUMN_FILTERS = ('type', 'status', 'layer', 'id')
+TOKEN_RE = re.compile(r'(-?)(?:(\w[\w$.-]*):("[^"]*"|\S+)|"([^"]*)"|(\S+))')
+
+def search_path(specs_dir='specs'):
+    return os.path.join(specs_dir, '.cache', SEARCH_NAME)
+
+def connect(specs_dir='specs'):
+    """Open (creating if needed) the search database of a spec tree."""
+    path = search_path(specs_dir)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    db = sqlite3.connect(path, timeout=10, check_same_thread=False)
+    db.execute('PRAGMA journal_mode=WAL')
+    db.execute('PRAGMA synchronous=NORMAL')
+    if db.execute('PRAGMA user_version').fetchone()[0] != SEARCH_VERSION:
+        with db:
+            for table in ('meta', 'docs', 'fts'):
+                db.execute(f'DROP TABLE IF EXISTS {table}')
+            db.executescript(SCHEMA)
+            db.execute(f'PRAGMA user_version={SEARCH_VERSION}')
+    return db
+
+def flat_values(value):
+    """Every scalar inside a frontmatter value, as strings."""
+    if isinstance(value, dict):
+        for item in value.values():
+            yield from flat_values(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from flat_values(item)
+    elif value is not None:
+        yield str(value)
+
+def headings(sections):
+    for node in sections:
+        yield node['heading']
+        yield from headings(node['sections'])
+
+def spec_document(specs_dir, spec):
+    """The fts row of a spec: (path, id, title, fields, headings, body)."""
+    try:
+        with open(os.path.join(specs_dir, spec['path']), 'rb') as f:
+            data = f.read()
+    except OSError:
+        data = b''
+    frontmatter = spec.get('frontmatter') or {}
+    fields = ' '.join(value for key, value in frontmatter.items()
+                      if key not in ('id', 'title') for value in flat_values(value))
+    return (spec['path'], str(spec['id']), str(spec['title']), fields,
+            '\n'.join(headings(spec.get('sections', []))),
+            data[spec.get('body_offset', 0):].decode('utf-8', 'replace'))
+
+def index_stamp(specs_dir='specs'):
+    """Change marker of specs-index.json (mtime and size), or None if it does not exist."""
+    try:
+        st = os.stat(os.path.join(specs_dir, 'specs-index.json'))
+    except OSError:
+        return None
+    return f"{st.st_mtime_ns}:{st.st_size}"
+
+def sync(db, index, specs_dir='specs', stamp=None):
+    """
+    Bring the search tables in line with an index: specs whose blob hash
+    changed are re-read, removed ones dropped. Returns the number of specs updated.
+    """
+    from index import spec_layer
+
+    specs = index['specs']
+    stored = dict(db.execute('SELECT path, blob FROM docs'))
+    stale = {path for path, blob in stored.items() if path not in specs or specs[path].get('blob') != blob}
+    fresh = [path for path in specs if path not in stored or path in stale]
+
+    with db:
+        for path in stale:
+            rowid = db.execute('SELECT rowid FROM docs WHERE path = ?', (path,)).fetchone()[0]
+            db.execute('DELETE FROM fts WHERE rowid = ?', (rowid,))
+            db.execute('DELETE FROM docs WHERE rowid = ?', (rowid,))
+        for path in fresh:
+            spec = specs[path]
+            cursor = db.execute('INSERT INTO docs (path, blob, id, title, type, status, layer, frontmatter) '
+                                'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                                (path, spec.get('blob'), str(spec['id']), str(spec['title']), spec['type'],
+                                 spec['status'], spec_layer(path), json.dumps(spec.get('frontmatter') or {})))
+            db.execute('INSERT INTO fts (rowid, path, id, title, fields, headings, body) '
+                       'VALUES (?, ?, ?, ?, ?, ?, ?)', (cursor.lastrowid,) + spec_document(specs_dir, spec))
+        if stamp is not None:
+            db.execute("INSERT OR REPLACE INTO meta VALUES ('index', ?)", (stamp,))
+    return len(fresh) + len(stale.difference(specs))
+
+def update_search(index, specs_dir='specs'):
+    """Sync the search index with a freshly written specs-index.json (see index.write_index)."""
+    db = connect(specs_dir)
+    try:
+        sync(db, index, specs_dir, index_stamp(specs_dir))
+    finally:
+        db.close()
+    return search_path(specs_dir)
+
+def refresh(db, specs_dir='specs', index=None):
+    """Sync with specs-index.json if it changed since the last sync (index: already loaded copy)."""
+    stamp = index_stamp(specs_dir)
+    row = db.execute("SELECT value FROM meta WHERE key = 'index'").fetchone()
+    if stamp is not None and (row is None or row[0] != stamp):
+        if index is None:
+            with open(os.path.join(specs_dir, 'specs-index.json')) as f:
+                index = json.load(f)
+        sync(db, index, specs_dir, stamp)
+
+def parse_query(text):
+    """
+    Split a query into FTS5 match expressions for the words to find and to
+    exclude (each None if there are none) and [(field, value, exclude)] filters.
+    """
+    include = []
+    exclude = []
+    filters = []
+    for negate, field, value, phrase, word in TOKEN_RE.findall(text):
+        if field:
+            filters.append((field, value.strip('"'), bool(negate)))
+            continue
+        if phrase:
+            term = '"' + phrase.replace('"', '""') + '"'
+        else:
+            words = re.findall(r'\w+', word)
+            if not words:
+                continue
+            # Punctuated words ('user-id') become a phrase, the last part a prefix
+            term = '"' + ' '.join(words) + '"*'
+        (exclude if negate else include).append(term)
+    return (' '.join(include) or None), (' OR '.join(exclude) or None), filters
+
+def filter_sql(field, value, negate):
+    if field in COLUMN_FILTERS:
+        sql, params = f'docs.{field} = ?', [value]
+    elif field == 'path':
+        sql, params = "docs.path GLOB ? || '*'", [value]
+    else:
+        sql = 'EXISTS (SELECT 1 FROM json_each(docs.frontmatter, ?) WHERE value = ?)'
+        params = ['$."' + field.replace('"', '') + '"', value]
+    return (f'NOT ({sql})' if negate else sql), params
+
+def search(db, text, limit=20):
+    """
+    Ranked matches for a query: [{path, id, title, type, status, score,
+    snippet}]. Filter-only queries list matching specs by path.
+    """
+    match, exclude, filters = parse_query(text)
+    where = []
+    params = []
+    if exclude:
+        where.append('docs.rowid NOT IN (SELECT rowid FROM fts WHERE fts MATCH ?)')
+        params.append(exclude)
+    for field, value, negate in filters:
+        sql, values = filter_sql(field, value, negate)
+        where.append(sql)
+        params += values
+
+    columns = 'docs.path, docs.id, docs.title, docs.type, docs.status'
+    if match:
+        sql = (f"SELECT {columns}, bm25(fts, {', '.join(map(str, WEIGHTS))}) AS score, "
+               f"snippet(fts, 5, '[', ']', '...', 12) AS snippet "
+               f"FROM fts JOIN docs ON docs.rowid = fts.rowid WHERE fts MATCH ?")
+        params = [match] + params
+        order = 'score, docs.path'
+    else:
+        sql = f"SELECT {columns}, 0.0 AS score, '' AS snippet FROM docs WHERE 1"
+        order = 'docs.path'
+    for clause in where:
+        sql += f' AND {clause}'
+    sql += f' ORDER BY {order} LIMIT ?'
+
+    try:
+        rows = db.execute(sql, params + [limit]).fetchall()
+    except sqlite3.OperationalError as e:
+        raise ValueError(f"Bad query {text!r}: {e}")
+    keys = ('path', 'id', 'title', 'type', 'status', 'score', 'snippet')
+    return [dict(zip(keys, row), score=round(-row[5], 3) or 0.0) for row in rows]
+
+def search_specs(specs_dir, text, limit=20, index=None):
+    """Refresh the search index if needed and run one query."""
+    db = connect(specs_dir)
+    try:
+        refresh(db, specs_dir, index)
+        return search(db, text, limit)
+    finally:
+        db.close()
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Full-text and fielded search over specs.')
+    parser.add_argument('query', nargs='*', help='Words, "phrases" and field:value filters')
+    parser.add_argument('--specs-dir', default='specs')
+    parser.add_argument('--limit', type=int, default=20)
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    # Exclusions (-word, -field:value) look like options to argparse
+    args, excluded = parser.parse_known_args()
+    text = ' '.join(args.query + excluded)
+    if not text.strip():
+        parser.error('a query is required')
+
+    if index_stamp(args.specs_dir) is None:
+        print(f"Index not found: {os.path.join(args.specs_dir, 'specs-index.json')}")
+        print("Run: python3 scripts/index.py first")
+        exit(1)
+    try:
+        results = search_specs(args.specs_dir, text, args.limit)
+    except ValueError as e:
+        print(e)
+        exit(1)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for result in results:
+            print(f"{result['path']}  [{result['type']}, {result['status']}]  {result['title']}")
+            if result['snippet']:
+                print(f"    {' '.join(result['snippet'].split())}")
+        if not results:
+            print("No matches")
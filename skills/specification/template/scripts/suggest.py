@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+"Did you mean" suggestions for references that name no spec.
+
+A TrigramIndex maps the character trigrams of each spec's file name, id
+and title to the specs that contain them (an inverted index, one sorted
+array of term numbers per trigram). A query only counts hits in the
+postings of its rarer trigrams to pick candidates, then scores those few
+exactly (Dice coefficient over trigram sets, common trigrams counted by
+binary search), so thousands of broken refs against tens of thousands of
+specs never compare strings pairwise.
+
+File names and ids are what a ref is written as; titles are a weaker hint.
+A title match scores TITLE_WEIGHT of its similarity, and for a ref that
+names a directory ('what/features/chekout') it only counts for specs under
+the same layer and type directory, so 'what/missing/product-21.md' is not
+answered with every spec titled 'Product ...'.
+
+Usage:
+    python3 scripts/suggest.py chekout            # Nearest specs to a name
+    python3 scripts/suggest.py what/features/chekout.md -k 5
+"""
+
+import re
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from heapq import nlargest
+from os.path import commonprefix
+
+import timing
+
+# Scores below this are not worth suggesting
+MIN_SCORE = 0.5
+# Candidates scored exactly per query
+CANDIDATES = 64
+# Share of its similarity a title match scores (file names and ids score in full)
+TITLE_WEIGHT = 0.8
+
+# Term kinds
+NAME, ID, TITLE = 0, 1, 2
+LAYERS = ('why', 'what', 'how')
+
+def normalize(text):
+    """Lowercase words separated by single spaces: 'User-Login' and 'user login' compare equal."""
+    return ' '.join(re.findall(r'[a-z0-9]+', text.lower()))
+
+def trigrams(text):
+    """Trigram set of a normalized string, padded so that short names still have some."""
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+def query_text(ref):
+    """The part of a reference that names the spec: its last path segment without .md."""
+    name = ref.strip().rstrip('/').rsplit('/', 1)[-1]
+    return normalize(name[:-3] if name.endswith('.md') else name)
+
+def type_dir(path):
+    """
+    The layer/type directory a spec path or ref points into ('what/features'),
+    a bare type directory for a relative ref ('../rules/x' gives 'rules'), or
+    None for a ref without a directory.
+    """
+    parts = [part for part in path.strip().split('/')[:-1] if part not in ('', '.', '..')]
+    if not parts:
+        return None
+    return '/'.join(parts[:2]) if parts[0] in LAYERS else parts[0]
+
+def same_type_dir(path, ref_dir):
+    spec_dir = type_dir(path)
+    return spec_dir is not None and (spec_dir == ref_dir or spec_dir.endswith('/' + ref_dir))
+
+def spec_terms(path, entry):
+    """What a spec is known by: (normalized text, kind) for its file name, id and title."""
+    stem = path[:-3] if path.endswith('.md') else path
+    terms = {normalize(stem.rsplit('/', 1)[-1]): NAME}
+    for field, kind in (('id', ID), ('title', TITLE)):
+        value = entry.get(field)
+        if isinstance(value, str) and value != path:
+            terms.setdefault(normalize(value), kind)
+    terms.pop('', None)
+    return frozenset(terms.items())
+
+class TrigramIndex:
+    """
+    Trigram inverted index over spec names, ids and titles. Specs can be
+    added and removed (index.py --watch): removed terms are only marked
+    dead, new ones get higher numbers so postings stay sorted.
+    """
+
+    def __init__(self):
+        self.paths = []             # spec path of each term
+        self.sizes = array('H')     # trigram count of each term
+        self.kinds = array('B')     # NAME, ID or TITLE
+        self.postings = {}          # trigram -> array('I') of term numbers, ascending
+        self.specs = {}             # spec path -> (its terms, their numbers)
+        self.dead = set()           # numbers of the terms of removed specs
+
+    @classmethod
+    def from_specs(cls, specs):
+        """Index for a {path: entry} mapping (an index's specs)."""
+        index = cls()
+        for path, entry in specs.items():
+            index.add_spec(path, entry)
+        return index
+
+    def add_spec(self, path, entry):
+        """Index a spec (replacing what was indexed for it). Returns whether its terms changed."""
+        terms = spec_terms(path, entry)
+        known = self.specs.get(path)
+        if known and known[0] == terms:
+            return False
+        self.remove_spec(path)
+        self.specs[path] = (terms, [self.add(term, kind, path) for term, kind in sorted(terms)])
+        return True
+
+    def remove_spec(self, path):
+        known = self.specs.pop(path, None)
+        if known:
+            self.dead.update(known[1])
+        return known is not None
+
+    def add(self, term, kind, path):
+        grams = trigrams(term)
+        number = len(self.paths)
+        self.paths.append(path)
+        self.sizes.append(min(len(grams), 0xFFFF))
+        self.kinds.append(kind)
+        postings = self.postings
+        for gram in grams:
+            if gram in postings:
+                postings[gram].append(number)
+            else:
+                postings[gram] = array('I', (number,))
+        return number
+
+    def search(self, ref, k=3, exclude=(), min_score=MIN_SCORE):
+        """Paths of up to k specs whose name, id or title is nearest to ref, best first."""
+        text = query_text(ref)
+        ref_dir = type_dir(ref)
+        grams = trigrams(text) if text else set()
+        lists = sorted((self.postings[gram] for gram in grams if gram in self.postings), key=len)
+        if not lists:
+            return []
+
+        # Candidates from the rarer half of the trigrams (at least one list);
+        # the common ones (e.g. 'ure' in every '...feature') are only looked up
+        # for the candidates, by binary search
+        split = max(1, len(lists) // 2)
+        hits = Counter()
+        for postings in lists[:split]:
+            hits.update(postings)
+        common = lists[split:]
+
+        scores = {}
+        for term in self.dead.intersection(hits):
+            del hits[term]
+        for term, shared in hits.most_common(CANDIDATES):
+            for postings in common:
+                pos = bisect_left(postings, term)
+                if pos < len(postings) and postings[pos] == term:
+                    shared += 1
+            score = 2 * shared / (len(grams) + self.sizes[term])
+            path = self.paths[term]
+            if self.kinds[term] == TITLE:
+                if ref_dir is not None and not same_type_dir(path, ref_dir):
+                    continue
+                score *= TITLE_WEIGHT
+            if score >= min_score and path not in exclude and score > scores.get(path, 0):
+                scores[path] = score
+
+        # Equal scores (the same file name in two directories): the one sharing
+        # the longer directory prefix with ref first, then by path
+        target = ref.strip().lstrip('/')
+        best = nlargest(2 * k, sorted(scores), key=scores.get)
+        best.sort(key=lambda path: (scores[path], len(commonprefix((target, path)))), reverse=True)
+        return best[:k]
+
+class Suggester:
+    """
+    Suggestions for the broken refs of one index. The trigram index is
+    built on the first call, so an index without broken refs costs nothing,
+    and results are kept per ref: many specs pointing at the same missing
+    spec are looked up once.
+    """
+
+    def __init__(self, specs, k=3):
+        self.specs = specs
+        self.k = k
+        self.trigrams = None
+        self.results = {}
+
+    def __call__(self, ref, exclude=None):
+        """Up to k spec paths nearest to ref, without exclude (the referring spec)."""
+        found = self.results.get(ref)
+        if found is None:
+            if self.trigrams is None:
+                self.trigrams = timing.timed('suggest.build', TrigramIndex.from_specs, self.specs)
+            # One more than needed, in case the referring spec is among them
+            found = self.results[ref] = timing.timed('suggest.search', self.trigrams.search, ref, self.k + 1)
+        return [path for path in found if path != exclude][:self.k]
+
+    def refresh(self, specs, paths):
+        """
+        Follow changes to the index: specs is its current {path: entry}
+        mapping, paths the specs added, changed or removed. Results are kept
+        unless a spec came, went or changed its id or title.
+        """
+        self.specs = specs
+        trigrams = self.trigrams
+        if trigrams is None:
+            self.results.clear()
+            return
+        changed = False
+        for path in paths:
+            entry = specs.get(path)
+            changed |= trigrams.add_spec(path, entry) if entry else trigrams.remove_spec(path)
+        if changed:
+            self.results.clear()
+        if len(trigrams.dead) > len(trigrams.paths) // 2:
+            # Mostly dead terms: rebuild on next use
+            self.trigrams = None
+
+if __name__ == '__main__':
+    import argparse
+    import os
+
+    from index import read_index
+
+    parser = argparse.ArgumentParser(description='Nearest existing specs to a name, path or id.')
+    parser.add_argument('ref', help='Spec name, path or id')
+    parser.add_argument('-k', type=int, default=5, help='Number of suggestions')
+    parser.add_argument('--specs-dir', default='specs')
+    args = parser.parse_args()
+
+    index_path = os.path.join(args.specs_dir, 'specs-index.json')
+    if not os.path.exists(index_path):
+        print(f"Index not found: {index_path}")
+        print("Run: python3 scripts/index.py first")
+        exit(1)
+    for path in TrigramIndex.from_specs(read_index(index_path)['specs']).search(args.ref, args.k):
+        print(path)
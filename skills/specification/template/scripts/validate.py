@@ -10,175 +10,679 @@ import json
 import os
 from pathlib import Path
 
-def validate_specs(specs_dir='specs'):
-    """Validate spec system and return errors/warnings."""
-    index_path = os.path.join(specs_dir, 'specs-index.json')
-
-    if not os.path.exists(index_path):
-        print(f"Index not found: {index_path}")
-        print("Run: python3 scripts/index.py first")
-        return [], []
-
-    with open(index_path) as f:
-        index = json.load(f)
-
-    errors = []
-    warnings = []
-
-    existing_paths = set(index['specs'].keys())
-
-    # Check 1: Broken references
+import timing
+from frontmatter import frontmatter_parser
+from graph import cycle_groups, shortest_cycle
+from index import INDEX_VERSION, Resolver, read_index
+from model import SpecGraph
+from parsecache import project_cache
+from schema import load_schemas, validate_frontmatter
+from sections import top_sections, validate_sections
+from suggest import Suggester
+
+def classify_cycle(cycle_paths):
+    """
+    Name the kind of an acceptable structural cycle, or return None when
+    the cycle is a genuine circular reference.
+    """
+    # Entity-to-entity cycles are common in domain models (bi-directional relationships)
+    all_entities = all('entities/' in p for p in cycle_paths)
+
+    # Feature-rule cycles are common (feature uses rule, rule applies_to feature)
+    feature_rule_cycle = (
+        len(cycle_paths) == 2 and
+        any('features/' in p for p in cycle_paths) and
+        any('rules/' in p for p in cycle_paths)
+    )
+
+    # Agent-feature cycles are common (agent implements feature, feature refs agent)
+    agent_feature_cycle = (
+        len(cycle_paths) == 2 and
+        any('agents/' in p for p in cycle_paths) and
+        any('features/' in p for p in cycle_paths)
+    )
+
+    # Constraint-decision-stack cycles are common (constraint influences decision, decision implemented by stack, stack follows constraint)
+    architectural_cycle = (
+        any('constraints/' in p for p in cycle_paths) and
+        any('decisions/' in p for p in cycle_paths) and
+        any('stack/' in p for p in cycle_paths)
+    )
+
+    # Decision-stack cycles (decision implemented_by stack, stack refs decision)
+    decision_stack_cycle = (
+        len(cycle_paths) == 2 and
+        any('decisions/' in p for p in cycle_paths) and
+        any('stack/' in p for p in cycle_paths)
+    )
+
+    # Parent-child cycles (parent lists children, children ref parent)
+    parent_child_cycle = (
+        len(cycle_paths) == 2 and
+        any('/' in p and p.count('/') > 2 for p in cycle_paths)  # Child has deeper path
+    )
+
+    # Cross-layer journey cycles (vision refs journey, journey refs features that ref vision)
+    journey_cycle = any('journeys/' in p for p in cycle_paths)
+
+    if all_entities:
+        return "Entity cycle (bi-directional relationship)"
+    if feature_rule_cycle:
+        return "Feature-rule cycle (applies_to reference)"
+    if agent_feature_cycle:
+        return "Agent-feature cycle (implements reference)"
+    if architectural_cycle:
+        return "Architectural cycle (constraint-decision-stack)"
+    if decision_stack_cycle:
+        return "Decision-stack cycle (implemented_by reference)"
+    if parent_child_cycle:
+        return "Parent-child cycle (children/parent reference)"
+    if journey_cycle:
+        return "Journey cycle (cross-layer reference)"
+    return None
+
+def finding(severity, code, path, message, related=()):
+    """
+    One validation result: severity ('error' or 'warning'), a stable code,
+    the spec it is about (None for project-wide findings), other specs
+    involved, and the message printed by validate.py.
+    """
+    return {'severity': severity, 'code': code, 'path': path, 'related': list(related), 'message': message}
+
+def did_you_mean(item, suggestions):
+    """Attach suggested spec paths to a broken-ref finding (also named at the end of its message)."""
+    if suggestions:
+        item['suggestions'] = suggestions
+        item['message'] += f" (did you mean {', '.join(suggestions)}?)"
+    return item
+
+def report_cycle(cycle_paths, cycle_str, report, related=None):
+    """
+    Report a cycle (its paths, start not repeated) as a warning if it is
+    structural, otherwise as an error. related defaults to the cycle's other specs.
+    """
+    kind = classify_cycle(cycle_paths)
+    related = cycle_paths[1:] if related is None else related
+    if kind:
+        report(finding('warning', 'structural-cycle', cycle_paths[0], f"{kind}: {cycle_str}", related))
+    else:
+        report(finding('error', 'circular-ref', cycle_paths[0], f"Circular reference: {cycle_str}", related))
+
+def genuine_cycle(graph, group, paths):
+    """
+    A cycle through group (node ids of one cycle group without 2-cycles)
+    that classify_cycle does not accept as structural, or None if every
+    cycle in the group is structural. Such a cycle has no journey, not only
+    entities, and lacks constraints, decisions or stacks, so it is searched
+    for in the group without journeys and without each of those in turn:
+    any cycle there through a spec that is not an entity qualifies.
+    """
+    members = [node for node in group if 'journeys/' not in paths[node]]
+    for kind in ('constraints/', 'decisions/', 'stack/'):
+        allowed = {node for node in members if kind not in paths[node]}
+        sub = {node: [to for to in graph.get(node) if to in allowed] for node in allowed}
+        for nodes in cycle_groups(sub):
+            for start in nodes:
+                if 'entities/' in paths[start]:
+                    continue
+                cycle = shortest_cycle(sub, start, set(nodes))
+                if classify_cycle([paths[node] for node in cycle[:-1]]) is None:
+                    return cycle
+    return None
+
+# Check 8: expected layer of each spec type
+LAYER_TYPES = {
+    'why': ['vision', 'goal', 'persona', 'constraint', 'decision'],
+    'what': ['entity', 'feature', 'rule', 'journey', 'interface'],
+    'how': ['agent', 'skill', 'lens', 'workflow', 'stack']
+}
+
+def load_project_schemas(specs_dir='specs'):
+    """Load the schemas used by check 9. Returns (schemas, error message or None)."""
+    try:
+        with timing.phase('load.schemas'):
+            return load_schemas(specs_dir), None
+    except (OSError, ValueError) as e:
+        return {}, f"Cannot load schemas: {e}"
+
+def schema_messages(compiled, spec, cache=None):
+    """
+    Schema check messages for one spec. They depend only on the spec's
+    content and its schema, so they are cached by blob hash and schema digest
+    (and the frontmatter parser, which the content was read with).
+    """
+    key = (f"check{INDEX_VERSION}:{frontmatter_parser()}:{spec['blob']}:{compiled['digest']}"
+           if spec.get('blob') else None)
+    messages = cache.get(key) if cache is not None and key else None
+    if messages is None:
+        messages = validate_frontmatter(compiled, spec['frontmatter'])
+        messages += validate_sections(compiled['sections'], top_sections(spec.get('sections', [])))
+        if cache is not None and key:
+            cache.put(key, messages)
+    return messages
+
+def check_broken_refs(index, report, suggest=None):
+    """
+    Check 1: Broken references (index.py resolves refs to spec paths where it can, see Resolver).
+    suggest(ref, exclude), if given, names the nearest existing specs (see suggest.Suggester).
+    """
+    specs = index['specs']
     for rel in index['relationships']['refs']:
         to_path = rel['to']
-        # Check various path formats
-        found = False
-        for check_path in [to_path, to_path.lstrip('/')]:
-            if check_path in existing_paths:
-                found = True
-                break
-        if not found:
-            errors.append(f"Broken ref: {rel['from']} -> {to_path}")
+        if to_path not in specs:
+            item = finding('error', 'broken-ref', rel['from'], f"Broken ref: {rel['from']} -> {to_path}", [to_path])
+            report(did_you_mean(item, suggest(to_path, rel['from'])) if suggest else item)
 
-    # Check 2: Broken parent references
+def check_broken_parents(index, report, suggest=None):
+    """Check 2: Broken parent references (suggest: see check_broken_refs)."""
+    specs = index['specs']
     for rel in index['relationships']['parents']:
         parent = rel['parent']
-        found = False
-        for check_path in [parent, parent.lstrip('/')]:
-            if check_path in existing_paths:
-                found = True
-                break
-        if not found:
-            errors.append(f"Broken parent: {rel['child']} -> {parent}")
+        if parent not in specs:
+            item = finding('error', 'broken-parent', rel['child'], f"Broken parent: {rel['child']} -> {parent}",
+                           [parent])
+            report(did_you_mean(item, suggest(parent, rel['child'])) if suggest else item)
 
-    # Check 3: Orphan specs
+def check_orphans(index, report):
+    """Check 3: Orphan specs (but not child specs with a parent)."""
     for orphan in index['relationships']['orphans']:
         spec = index['specs'].get(orphan, {})
+        # Skip child specs - they're linked via parent
+        if spec.get('parent'):
+            continue
         if spec.get('status') == 'active':
-            warnings.append(f"Orphan (no refs): {orphan}")
+            report(finding('warning', 'orphan', orphan, f"Orphan (no refs): {orphan}"))
 
-    # Check 4: Deprecated specs still referenced
+def check_deprecated_refs(index, report):
+    """Check 4: Deprecated specs still referenced."""
     deprecated = set(index['by_status'].get('deprecated', []))
     for rel in index['relationships']['refs']:
         to_path = rel['to']
         if to_path in deprecated:
             from_spec = index['specs'].get(rel['from'], {})
             if from_spec.get('status') != 'deprecated':
-                warnings.append(f"Active refs deprecated: {rel['from']} -> {to_path}")
-
-    # Check 5: Missing required fields
-    for path, spec in index['specs'].items():
-        if not spec.get('id'):
-            warnings.append(f"Missing id: {path}")
-        if not spec.get('title'):
-            errors.append(f"Missing title: {path}")
-        if spec.get('type') == 'unknown':
-            warnings.append(f"Missing $schema: {path}")
-
-    # Check 6: Large specs
-    for path in index['specs']:
+                report(finding('warning', 'deprecated-ref', rel['from'],
+                               f"Active refs deprecated: {rel['from']} -> {to_path}", [to_path]))
+
+def check_duplicate_ids(index, report):
+    """Check 10: Ids declared by more than one spec (refs by such an id resolve to none of them)."""
+    for spec_id, paths in Resolver.from_specs(index['specs']).duplicate_ids().items():
+        report(finding('error', 'duplicate-id', paths[0], f"Duplicate id {spec_id}: {', '.join(paths)}", paths[1:]))
+
+def check_fields(path, spec):
+    """Check 5: Missing required fields."""
+    found = []
+    if spec.get('frontmatter_error'):
+        found.append(finding('error', 'invalid-frontmatter', path,
+                             f"Invalid frontmatter ({spec['frontmatter_error']}): {path}"))
+    if not spec.get('id'):
+        found.append(finding('warning', 'missing-id', path, f"Missing id: {path}"))
+    if not spec.get('title'):
+        found.append(finding('error', 'missing-title', path, f"Missing title: {path}"))
+    if spec.get('type') == 'unknown':
+        found.append(finding('warning', 'missing-schema', path, f"Missing $schema: {path}"))
+    return found
+
+def check_size(path, spec, specs_dir='specs'):
+    """Check 6: Large specs (line counts are recorded by index.py)."""
+    lines = spec.get('lines')
+    if lines is None:
+        # Index written by an older index.py
         filepath = Path(specs_dir) / path
+        lines = 0
         if filepath.exists():
-            lines = len(filepath.read_text().splitlines())
-            if lines > 150:
-                warnings.append(f"Large spec ({lines} lines, consider split): {path}")
-
-    # Check 7: Circular references (proper cycle detection using DFS)
-    # Build adjacency list
-    graph = {}
-    for spec_path in index['specs']:
-        graph[spec_path] = []
-    for rel in index['relationships']['refs']:
-        from_path = rel['from']
-        to_path = rel['to']
-        # Only add edges for specs that exist
-        if from_path in graph and to_path in existing_paths:
-            graph[from_path].append(to_path)
-
-    def find_cycle(node, visited, rec_stack, path):
-        """
-        DFS-based cycle detection.
-        Returns the cycle path if found, None otherwise.
-        """
-        visited.add(node)
-        rec_stack.add(node)
-        path.append(node)
-
-        for neighbor in graph.get(node, []):
-            if neighbor not in visited:
-                result = find_cycle(neighbor, visited, rec_stack, path)
-                if result:
-                    return result
-            elif neighbor in rec_stack:
-                # Found cycle - return the cycle portion of the path
-                cycle_start = path.index(neighbor)
-                return path[cycle_start:] + [neighbor]
-
-        path.pop()
-        rec_stack.remove(node)
+            text = filepath.read_text()
+            timing.count_read(len(text))
+            lines = len(text.splitlines())
+    if lines > 150:
+        return [finding('warning', 'large-spec', path, f"Large spec ({lines} lines, consider split): {path}")]
+    return []
+
+def check_layer(path, spec):
+    """Check 8: Layer integrity (optional, warn if specs don't follow layer conventions)."""
+    spec_type = spec.get('type', 'unknown')
+    if spec_type == 'unknown':
+        return []
+    # Determine expected layer from spec type
+    expected_layer = None
+    for layer, types in LAYER_TYPES.items():
+        if spec_type in types:
+            expected_layer = layer
+            break
+
+    # Check if file is in correct layer directory
+    if expected_layer and not path.startswith(f"{expected_layer}/"):
+        return [finding('warning', 'layer-mismatch', path,
+                        f"Type/layer mismatch: {path} has type '{spec_type}' but not in {expected_layer}/")]
+    return []
+
+def check_schema(path, spec, schemas=None, cache=None):
+    """Check 9: Frontmatter and sections match the spec's schema (level 3+)."""
+    spec_type = spec.get('type', 'unknown')
+    if not schemas or spec_type == 'unknown' or 'frontmatter' not in spec:
+        return []
+    compiled = schemas.get(spec_type)
+    if not compiled:
+        return [finding('warning', 'unknown-schema', path, f"Unknown schema type '{spec_type}': {path}")]
+    return [finding('warning', 'schema', path, f"Schema: {path}: {message}")
+            for message in schema_messages(compiled, spec, cache)]
+
+def check_cycles(index, report, graph=None):
+    """
+    Check 7: Circular references (every cycle group, via strongly connected components).
+    graph is the index's SpecGraph, if one was already built.
+    """
+    if graph is None:
+        graph = SpecGraph.from_index(index)
+    paths = graph.paths
+
+    # Mutual references (A <-> B) are reported pair by pair; longer cycles
+    # are what remains of each group once those pairs are taken out. Such a
+    # group is an error if any cycle in it is one, shown by that cycle;
+    # otherwise a warning shown by its shortest cycle.
+    # Node ids follow path order, so sorting ids sorts paths.
+    for group in cycle_groups(graph):
+        members = set(group)
+        targets = {node: set(graph.get(node)) for node in group}
+        pairs = sorted({
+            tuple(sorted((a, b)))
+            for a in group for b in targets[a]
+            if b != a and b in members and a in targets[b]
+        })
+        for a, b in pairs:
+            report_cycle([paths[a], paths[b]], f"{paths[a]} -> {paths[b]} -> {paths[a]}", report)
+
+        paired = {frozenset(pair) for pair in pairs}
+        rest = {
+            node: [to for to in graph.get(node) if to in members and frozenset((node, to)) not in paired]
+            for node in group
+        }
+        for cycle_nodes in cycle_groups(rest):
+            cycle = genuine_cycle(rest, cycle_nodes, paths) or \
+                shortest_cycle(rest, cycle_nodes[0], set(cycle_nodes))
+            group_paths = [paths[node] for node in cycle_nodes]
+            cycle_str = ' -> '.join(paths[node] for node in cycle)
+            if len(group_paths) > len(cycle) - 1:
+                cycle_str += f" (cycle group of {len(group_paths)}: {', '.join(group_paths)})"
+            report_cycle([paths[node] for node in cycle[:-1]], cycle_str, report,
+                         [path for path in group_paths if path != paths[cycle[0]]])
+
+class Check:
+    """
+    A registered validation check.
+
+    scope is 'project' (run(ctx, report) once over the whole index) or
+    'spec' (run(ctx, path, spec) -> [finding, ...] for each spec; results
+    are cached per spec by hash). needs names the inputs beyond the index:
+    'files' (reads spec files), 'graph' (ctx.graph, the SpecGraph) and
+    'schemas' (ctx.schemas and the check result cache). Checks without
+    needs are the quick ones. inputs names what a project check's results
+    depend on, so they can be kept while none of it changes (index.py
+    --watch): 'index' (the specs' ids, titles, types, statuses, parents and
+    refs) plus its needs by default.
+    """
+
+    __slots__ = ('number', 'name', 'scope', 'run', 'needs', 'inputs')
+
+    def __init__(self, number, name, scope, run, needs=(), inputs=None):
+        self.number = number
+        self.name = name
+        self.scope = scope
+        self.run = run
+        self.needs = frozenset(needs)
+        self.inputs = frozenset(inputs) if inputs is not None else self.needs | {'index'}
+
+    @property
+    def label(self):
+        """Name used for timings, e.g. check7.cycles."""
+        return f"check{self.number}.{self.name}"
+
+    def __repr__(self):
+        return f"Check({self.number}, {self.name!r})"
+
+class CheckContext:
+    """What checks read. Shared, read-only, by every check of a run (also across worker processes)."""
+
+    __slots__ = ('index', 'specs_dir', 'schemas', 'cache', 'graph', 'suggest')
+
+    def __init__(self, index, specs_dir='specs', schemas=None, cache=None, graph=None, suggest=None):
+        self.index = index
+        self.specs_dir = specs_dir
+        self.schemas = schemas
+        self.cache = cache
+        self.graph = graph
+        # "Did you mean" lookup for broken refs; its trigram index is built on first use
+        self.suggest = suggest or Suggester(index['specs'])
+
+# name -> Check; checks run and report in number order
+CHECKS = {}
+
+# Selection names that stand for several checks
+CHECK_GROUPS = {
+    'all': lambda check: True,
+    'quick': lambda check: not check.needs,
+}
+
+def register_check(number, name, scope, run, needs=(), inputs=None):
+    """Add a check to the registry (replacing one of the same name) and return it."""
+    CHECKS[name] = Check(number, name, scope, run, needs, inputs)
+    return CHECKS[name]
+
+register_check(1, 'broken-refs', 'project', lambda ctx, report: check_broken_refs(ctx.index, report, ctx.suggest))
+register_check(2, 'broken-parents', 'project',
+               lambda ctx, report: check_broken_parents(ctx.index, report, ctx.suggest))
+register_check(3, 'orphans', 'project', lambda ctx, report: check_orphans(ctx.index, report))
+register_check(4, 'deprecated-refs', 'project', lambda ctx, report: check_deprecated_refs(ctx.index, report))
+register_check(5, 'fields', 'spec', lambda ctx, path, spec: check_fields(path, spec))
+register_check(6, 'size', 'spec', lambda ctx, path, spec: check_size(path, spec, ctx.specs_dir), needs=('files',))
+register_check(7, 'cycles', 'project', lambda ctx, report: check_cycles(ctx.index, report, ctx.graph),
+               needs=('graph',), inputs=('graph',))
+register_check(8, 'layer', 'spec', lambda ctx, path, spec: check_layer(path, spec))
+register_check(9, 'schema', 'spec', lambda ctx, path, spec: check_schema(path, spec, ctx.schemas, ctx.cache),
+               needs=('schemas',))
+register_check(10, 'duplicate-ids', 'project', lambda ctx, report: check_duplicate_ids(ctx.index, report))
+
+def select_checks(only=None, skip=None):
+    """
+    Registered checks to run, in order. only and skip are lists of check
+    names, numbers or groups ('quick', 'all'), each item possibly a
+    comma-separated list; unknown names raise ValueError.
+    """
+    ordered = sorted(CHECKS.values(), key=lambda check: check.number)
+
+    def resolve(values):
+        selected = set()
+        for name in [name.strip() for value in values for name in value.split(',') if name.strip()]:
+            if name in CHECK_GROUPS:
+                selected.update(check.name for check in ordered if CHECK_GROUPS[name](check))
+                continue
+            matches = [check.name for check in ordered if name in (check.name, str(check.number))]
+            if not matches:
+                choices = ', '.join([check.name for check in ordered] + list(CHECK_GROUPS))
+                raise ValueError(f"Unknown check '{name}' (choose from: {choices})")
+            selected.update(matches)
+        return selected
+
+    chosen = resolve(only) if only else {check.name for check in ordered}
+    chosen -= resolve(skip or [])
+    return [check for check in ordered if check.name in chosen]
+
+def check_spec(ctx, path, spec, checks):
+    """Run per-spec checks on one spec. Returns {check name: [finding, ...]}."""
+    return {check.name: timing.timed(check.label, check.run, ctx, path, spec) for check in checks}
+
+def run_project_check(ctx, check, emit=None):
+    """Run a project-wide check; its findings, each also passed to emit as it is produced."""
+    found = []
+
+    def report(item):
+        found.append(item)
+        if emit:
+            emit(item)
+
+    with timing.phase(check.label):
+        check.run(ctx, report)
+    return found
+
+# (context, checks) of the current parallel run; forked workers inherit it
+# instead of receiving the index and graph through pickling
+_shared = None
+
+def fork_context():
+    """multiprocessing context for parallel checks, or None where fork is unavailable."""
+    import multiprocessing
+    if 'fork' not in multiprocessing.get_all_start_methods():
         return None
-
-    visited = set()
-    cycles_found = set()
-    for spec_path in index['specs']:
-        if spec_path not in visited:
-            cycle = find_cycle(spec_path, visited, set(), [])
-            if cycle:
-                # Create a canonical representation to avoid duplicate cycle reports
-                cycle_key = tuple(sorted(cycle[:-1]))  # Exclude repeated start node
-                if cycle_key not in cycles_found:
-                    cycles_found.add(cycle_key)
-                    cycle_str = ' -> '.join(cycle)
-                    # Determine if this is an acceptable structural cycle
-                    cycle_paths = cycle[:-1]  # Exclude repeated start node
-
-                    # Entity-to-entity cycles are common in domain models (bi-directional relationships)
-                    all_entities = all('entities/' in p for p in cycle_paths)
-
-                    # Feature-rule cycles are common (feature uses rule, rule applies_to feature)
-                    feature_rule_cycle = (
-                        len(cycle_paths) == 2 and
-                        any('features/' in p for p in cycle_paths) and
-                        any('rules/' in p for p in cycle_paths)
-                    )
-
-                    if all_entities:
-                        warnings.append(f"Entity cycle (bi-directional relationship): {cycle_str}")
-                    elif feature_rule_cycle:
-                        warnings.append(f"Feature-rule cycle (applies_to reference): {cycle_str}")
-                    else:
-                        errors.append(f"Circular reference: {cycle_str}")
-
-    # Check 8: Layer integrity (optional, warn if specs don't follow layer conventions)
-    layer_types = {
-        'why': ['vision', 'goal', 'persona', 'constraint', 'decision'],
-        'what': ['entity', 'feature', 'rule', 'journey', 'interface'],
-        'how': ['agent', 'skill', 'lens', 'workflow', 'stack']
-    }
-
-    for path, spec in index['specs'].items():
-        spec_type = spec.get('type', 'unknown')
-        if spec_type == 'unknown':
-            continue
-
-        # Determine expected layer from spec type
-        expected_layer = None
-        for layer, types in layer_types.items():
-            if spec_type in types:
-                expected_layer = layer
+    return multiprocessing.get_context('fork')
+
+def check_job(name, paths, profile=False):
+    """
+    Run one project check (paths is None) or the selected per-spec checks
+    on a slice of specs in a worker process. Returns (name, findings or
+    {path: {check name: findings}}, cache values added, timing data).
+    """
+    ctx, checks = _shared
+    if ctx.cache is not None:
+        # The parent's SQLite connection must not be used after fork
+        from parsecache import open_cache
+        ctx = CheckContext(ctx.index, ctx.specs_dir, ctx.schemas, open_cache(ctx.cache.path), ctx.graph,
+                           ctx.suggest)
+    profiler = timing.enable_worker() if profile else None
+    if paths is None:
+        result = run_project_check(ctx, CHECKS[name])
+    else:
+        spec_checks = [check for check in checks if check.scope == 'spec']
+        specs = ctx.index['specs']
+        result = {path: timing.spec_call(path, check_spec, ctx, path, specs[path], spec_checks) for path in paths}
+    added = ctx.cache.take() if ctx.cache is not None else {}
+    return name, result, added, profiler.drain() if profiler else None
+
+def run_checks(ctx, checks, spec_results, jobs=1, emit=None):
+    """
+    Run the given checks. Per-spec results go into spec_results as
+    {path: (hash, {check name: findings})}, reusing those of specs whose
+    hash is unchanged; returns {check name: findings} for project checks.
+    With jobs > 1, project checks and slices of the per-spec work run
+    concurrently in forked worker processes that share ctx read-only.
+    """
+    global _shared
+    specs = ctx.index['specs']
+    spec_checks = [check for check in checks if check.scope == 'spec']
+    project = [check for check in checks if check.scope == 'project']
+    for path in [p for p in spec_results if p not in specs]:
+        del spec_results[path]
+
+    # Specs needing at least one selected check that is not cached for their hash
+    todo = []
+    for path, spec in specs.items():
+        cached = spec_results.get(path)
+        if not cached or cached[0] != spec.get('hash'):
+            cached = spec_results[path] = (spec.get('hash'), {})
+        if spec_checks and any(check.name not in cached[1] for check in spec_checks):
+            todo.append(path)
+
+    def emit_cached(paths):
+        if emit:
+            for path in paths:
+                for check in spec_checks:
+                    for item in spec_results[path][1][check.name]:
+                        emit(item)
+
+    def check_missing(path):
+        missing = [check for check in spec_checks if check.name not in spec_results[path][1]]
+        spec_results[path][1].update(timing.spec_call(path, check_spec, ctx, path, specs[path], missing))
+
+    found = {}
+    mp_context = fork_context() if jobs > 1 else None
+    if mp_context is None or len(project) + len(todo) < 2:
+        # Serial: project checks numbered before the first per-spec check, then
+        # one pass over the specs for all per-spec checks, then the rest
+        first_spec = spec_checks[0].number if spec_checks else None
+        for check in project:
+            if first_spec is not None and check.number > first_spec:
                 break
+            found[check.name] = run_project_check(ctx, check, emit)
+        if spec_checks:
+            todo = set(todo)
+            with timing.phase('checks.per-spec'):
+                for path in specs:
+                    if path in todo:
+                        check_missing(path)
+                    emit_cached((path,))
+        for check in project:
+            if check.name not in found:
+                found[check.name] = run_project_check(ctx, check, emit)
+    else:
+        from concurrent.futures import ProcessPoolExecutor, as_completed
+
+        pending = set(todo)
+        emit_cached([path for path in specs if path not in pending])
+        profile = timing.profiler is not None
+        chunksize = max(64, len(todo) // (jobs * 4))
+        _shared = (ctx, checks)
+        try:
+            with timing.phase('checks.parallel'), \
+                    ProcessPoolExecutor(max_workers=jobs, mp_context=mp_context) as pool:
+                # Project checks first: the cycle search is usually the longest single task
+                futures = [pool.submit(check_job, check.name, None, profile) for check in reversed(project)]
+                futures += [pool.submit(check_job, None, todo[i:i + chunksize], profile)
+                            for i in range(0, len(todo), chunksize)]
+                for future in as_completed(futures):
+                    name, result, added, recorded = future.result()
+                    if ctx.cache is not None:
+                        ctx.cache.update(added)
+                    if recorded:
+                        timing.profiler.merge(recorded)
+                    if name is not None:
+                        found[name] = result
+                        if emit:
+                            for item in result:
+                                emit(item)
+                        continue
+                    for path, results in result.items():
+                        spec_results[path][1].update(results)
+                    emit_cached(result)
+        finally:
+            _shared = None
+    if ctx.cache is not None:
+        ctx.cache.flush()
+    return found
+
+def validate_index(index, specs_dir='specs', schemas=None, schema_error=None, spec_results=None,
+                   cache=None, emit=None, graph=None, checks=None, jobs=1, suggest=None,
+                   project_results=None, changed=None):
+    """
+    Validate an in-memory index and return errors/warnings.
+
+    checks is a list of registered checks (see select_checks; default: all).
+    Schemas, defaulting to those in specs_dir, and the graph are loaded only
+    if a selected check needs them. spec_results caches the per-spec checks
+    across calls as {path: (hash, results)}: a spec whose hash is unchanged
+    is not checked again (used by index.py --watch). cache is the parse
+    cache holding schema check results across runs. emit, if given, is
+    called with each finding as soon as it is produced (the returned lists
+    keep the usual check order). graph is the index's SpecGraph if the
+    caller already has one. jobs > 1 runs checks in parallel (run_checks).
+    suggest is a suggest.Suggester for the index to reuse its trigram index
+    and results across calls. project_results likewise caches the project
+    checks as {check name: findings}; with changed, the set of inputs that
+    changed since the previous call (see Check), a check none of whose
+    inputs changed is not run again.
+    """
+    checks = select_checks() if checks is None else checks
+    needs = set().union(*(check.needs for check in checks))
+    if 'schemas' in needs and schemas is None:
+        schemas, schema_error = load_project_schemas(specs_dir)
+    if 'graph' in needs and graph is None:
+        with timing.phase('graph'):
+            graph = SpecGraph.from_index(index)
+    if spec_results is None:
+        spec_results = {}
+
+    kept = {}
+    if project_results is not None and changed is not None:
+        kept = {check.name: project_results[check.name] for check in checks
+                if check.scope == 'project' and check.name in project_results and not check.inputs & changed}
+    if emit:
+        for items in kept.values():
+            for item in items:
+                emit(item)
+
+    ctx = CheckContext(index, specs_dir, schemas, cache, graph, suggest)
+    found = run_checks(ctx, [check for check in checks if check.name not in kept], spec_results, jobs, emit)
+    found.update(kept)
+    if project_results is not None:
+        project_results.update(found)
 
-        if expected_layer:
-            # Check if file is in correct layer directory
-            if not path.startswith(f"{expected_layer}/"):
-                warnings.append(f"Type/layer mismatch: {path} has type '{spec_type}' but not in {expected_layer}/")
+    errors = []
+    warnings = []
+    for check in checks:
+        if 'schemas' in check.needs and schema_error:
+            item = finding('error', 'schema-load', None, schema_error)
+            errors.append(item['message'])
+            if emit:
+                emit(item)
+            schema_error = None
+        if check.scope == 'project':
+            items = found[check.name]
+        else:
+            items = (item for path in index['specs'] for item in spec_results[path][1][check.name])
+        for item in items:
+            (errors if item['severity'] == 'error' else warnings).append(item['message'])
 
     return errors, warnings
 
-if __name__ == '__main__':
-    import sys
+def validate_specs(specs_dir='specs', emit=None, checks=None, jobs=1):
+    """Validate spec system and return errors/warnings (emit, checks, jobs: see validate_index)."""
+    index_path = os.path.join(specs_dir, 'specs-index.json')
 
-    specs_dir = sys.argv[1] if len(sys.argv) > 1 else 'specs'
-    errors, warnings = validate_specs(specs_dir)
+    if not os.path.exists(index_path):
+        if emit:
+            message = f"Index not found: {index_path} (run: python3 scripts/index.py first)"
+            emit(finding('error', 'missing-index', None, message))
+            return [message], []
+        print(f"Index not found: {index_path}")
+        print("Run: python3 scripts/index.py first")
+        return [], []
+
+    index = read_index(index_path)
+
+    cache = project_cache(specs_dir)
+    try:
+        return validate_index(index, specs_dir, cache=cache, emit=emit, checks=checks, jobs=jobs)
+    finally:
+        cache.close()
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Validate spec system integrity.')
+    parser.add_argument('specs_dir', nargs='?', default='specs')
+    parser.add_argument('--ndjson', action='store_true',
+                        help='Stream findings as JSON lines (severity, code, path, related, message) '
+                             'as the checks produce them, then a summary line')
+    parser.add_argument('--only', action='append', metavar='CHECKS',
+                        help="Run only these checks: names or numbers, comma-separated "
+                             "(e.g. broken-refs,7), or 'quick' for those that need only the index")
+    parser.add_argument('--skip', action='append', metavar='CHECKS',
+                        help='Do not run these checks (same names as --only)')
+    parser.add_argument('--list-checks', action='store_true',
+                        help='List the registered checks and what they need, then exit')
+    parser.add_argument('--jobs', '-j', type=int, default=1,
+                        help='Run checks in N worker processes (0 = one per CPU)')
+    parser.add_argument('--profile', nargs='?', const=True, metavar='FILE',
+                        help='Record per-check timings, bytes read and the slowest specs to FILE '
+                             '(default specs/.cache/profile-validate.json) plus a Chrome trace next to it; '
+                             f'also enabled by {timing.ENV_VAR}=1 or {timing.ENV_VAR}=DIR')
+    args = parser.parse_args()
+
+    if args.list_checks:
+        for check in select_checks():
+            needs = ', '.join(sorted(check.needs)) or 'index only (quick)'
+            print(f"{check.number:>2}  {check.name:<16} {check.scope:<8} {needs}")
+        exit(0)
+    try:
+        checks = select_checks(args.only, args.skip)
+    except ValueError as e:
+        parser.error(str(e))
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+
+    profile = timing.output_path('validate.py', args.profile, args.specs_dir)
+    if profile:
+        timing.enable('validate.py', profile)
+
+    if args.ndjson:
+        try:
+            errors, warnings = validate_specs(args.specs_dir, lambda item: print(json.dumps(item), flush=True),
+                                              checks, jobs)
+            print(json.dumps({'summary': {'errors': len(errors), 'warnings': len(warnings)}}))
+        except BrokenPipeError:
+            # The reader stopped early (e.g. after the first error)
+            os.dup2(os.open(os.devnull, os.O_WRONLY), 1)
+            exit(1)
+        exit(1 if errors else 0)
+
+    errors, warnings = validate_specs(args.specs_dir, checks=checks, jobs=jobs)
 
     if errors:
         print("ERRORS:")
@@ -0,0 +1,104 @@
+"""
+annotations.py: @spec annotations found in source files and joined with
+the index.
+
+Run from the repository root:
+    python3 -m unittest discover skills/specification/tests
+"""
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'scripts'))
+
+from annotations import coverage_report, git_files, scan_tree, walk_files  # noqa: E402
+
+INDEX = {'specs': {
+    'what/features/login.md': {'id': 'FEAT-001', 'hash': 'a1b2c3d4'},
+    'what/features/logout.md': {'id': 'FEAT-002', 'hash': 'e5f6a7b8'},
+    'why/vision.md': {'id': 'VIS-001', 'hash': '01234567'},
+}}
+
+class AnnotationTest(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = tmp.name
+
+    def write(self, path, text):
+        full = os.path.join(self.root, path)
+        os.makedirs(os.path.dirname(full), exist_ok=True)
+        with open(full, 'w') as f:
+            f.write(text)
+
+    def test_scan_and_coverage(self):
+        self.write('src/login.py', "import x\n\n# @spec FEAT-001#a1b2c3d4, FEAT-002#ffff0000\ndef login(): pass\n")
+        self.write('src/other.py', "# @spec FEAT-404\n# no annotation: @specification\n")
+        self.write('src/plain.py', "print('nothing here')\n")
+
+        found = scan_tree(self.root)
+        self.assertEqual(found, {
+            'src/login.py': [[3, 'FEAT-001', 'a1b2c3d4'], [3, 'FEAT-002', 'ffff0000']],
+            'src/other.py': [[1, 'FEAT-404', None]],
+        })
+
+        report = coverage_report(INDEX, found)
+        self.assertEqual(report['annotations'], 3)
+        self.assertEqual(report['annotated'], {'what/features/login.md': ['src/login.py:3'],
+                                               'what/features/logout.md': ['src/login.py:3']})
+        self.assertEqual(report['unannotated'], ['why/vision.md'])
+        self.assertEqual(report['dangling'], [{'location': 'src/other.py:1', 'id': 'FEAT-404'}])
+        self.assertEqual([item['id'] for item in report['outdated']], ['FEAT-002'])
+
+    def test_ids_that_are_not_strings_are_skipped(self):
+        index = {'specs': dict(INDEX['specs'], **{'what/features/odd.md': {'id': ['FEAT-003'], 'hash': 'ffffffff'},
+                                                  'what/features/none.md': {'id': None, 'hash': 'eeeeeeee'}})}
+        report = coverage_report(index, {'src/a.py': [[1, 'FEAT-001', None], [2, 'FEAT-003', None]]})
+        self.assertEqual(report['annotated'], {'what/features/login.md': ['src/a.py:1']})
+        self.assertEqual(report['dangling'], [{'location': 'src/a.py:2', 'id': 'FEAT-003'}])
+
+    def test_cache_and_exclude(self):
+        self.write('src/a.py', "# @spec FEAT-001\n")
+        self.write('specs/what/features/login.md', "@spec FEAT-002\n")
+        cache_file = Path(self.root) / 'specs' / '.cache' / 'annotations.json'
+        self.assertEqual(list(scan_tree(self.root, ['specs'], cache_file)), ['src/a.py'])
+        self.write('src/a.py', "# @spec FEAT-001 FEAT-002\n")
+        self.assertEqual(scan_tree(self.root, ['specs'], cache_file)['src/a.py'],
+                         [[1, 'FEAT-001', None], [1, 'FEAT-002', None]])
+
+    def test_walk_honours_gitignore(self):
+        self.write('.gitignore', "*.log\nbuild/\n/top.txt\n")
+        self.write('src/.gitignore', "generated_*.py\n")
+        for path in ('app.py', 'debug.log', 'build/out.py', 'top.txt', 'src/top.txt',
+                     'src/generated_api.py', 'src/api.py', '.hidden/x.py'):
+            self.write(path, '')
+        self.assertEqual(walk_files(self.root), ['.gitignore', 'app.py', 'src/.gitignore', 'src/api.py',
+                                                 'src/top.txt'])
+
+    def write_negation_tree(self):
+        self.write('.gitignore', "*.log\n!keep.log\ndocs/**/draft.md\ngen/**\n!gen/README\nlib/**/*.tmp\n")
+        self.write('src/.gitignore', "!debug.log\n")
+        for path in ('a.log', 'keep.log', 'src/debug.log', 'src/other.log', 'docs/draft.md', 'docs/x/y/draft.md',
+                     'docs/x/final.md', 'gen/a.py', 'gen/README', 'gen/sub/b.py', 'lib/a.tmp', 'lib/x/y/b.tmp',
+                     'lib/c.py'):
+            self.write(path, '')
+
+    def test_walk_handles_negation_and_double_star(self):
+        self.write_negation_tree()
+        self.assertEqual(walk_files(self.root), ['.gitignore', 'docs/x/final.md', 'gen/README', 'keep.log',
+                                                 'lib/c.py', 'src/.gitignore', 'src/debug.log'])
+
+    @unittest.skipUnless(shutil.which('git'), "git not installed")
+    def test_walk_agrees_with_git(self):
+        self.write_negation_tree()
+        subprocess.run(['git', 'init', '-q'], cwd=self.root, check=True)
+        self.assertEqual(walk_files(self.root), git_files(self.root))
+
+if __name__ == '__main__':
+    unittest.main()
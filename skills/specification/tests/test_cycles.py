@@ -0,0 +1,82 @@
+"""
+Check 7 (circular references) on small hand-built indexes.
+
+Run from the repository root:
+    python3 -m unittest discover skills/specification/tests
+"""
+
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'scripts'))
+
+from validate import check_cycles  # noqa: E402
+
+def make_index(refs):
+    """Index with a spec for every path in refs ({from: [to, ...]})."""
+    paths = sorted(set(refs) | {to for targets in refs.values() for to in targets})
+    return {
+        'specs': {path: {'path': path} for path in paths},
+        'relationships': {'refs': [{'from': src, 'to': to} for src, targets in refs.items() for to in targets]},
+    }
+
+def run_check(refs):
+    found = []
+    check_cycles(make_index(refs), found.append)
+    return found
+
+GOAL = 'why/goals/growth.md'
+FEATURE = 'what/features/checkout.md'
+AGENT = 'how/agents/payments.md'
+JOURNEY = 'what/journeys/purchase.md'
+ORDER = 'what/entities/order.md'
+ITEM = 'what/entities/item.md'
+CART = 'what/entities/cart.md'
+
+class CycleGroupTest(unittest.TestCase):
+
+    def test_genuine_cycle_inside_group_with_journey_is_an_error(self):
+        # goal -> feature -> agent -> goal is a circular reference; the journey
+        # joins the same group (feature -> journey -> goal) without excusing it
+        found = run_check({
+            GOAL: [FEATURE],
+            FEATURE: [AGENT, JOURNEY],
+            AGENT: [GOAL],
+            JOURNEY: [GOAL],
+        })
+        self.assertEqual([item['code'] for item in found], ['circular-ref'])
+        message = found[0]['message']
+        self.assertIn(f"{AGENT} -> {GOAL} -> {FEATURE} -> {AGENT}", message)
+        self.assertIn('cycle group of 4', message)
+        self.assertEqual(sorted([found[0]['path']] + found[0]['related']), sorted([GOAL, FEATURE, AGENT, JOURNEY]))
+
+    def test_group_whose_cycles_all_pass_a_journey_is_a_warning(self):
+        found = run_check({
+            GOAL: [FEATURE, AGENT],
+            FEATURE: [JOURNEY],
+            AGENT: [JOURNEY],
+            JOURNEY: [GOAL],
+        })
+        self.assertEqual([item['code'] for item in found], ['structural-cycle'])
+        self.assertTrue(found[0]['message'].startswith('Journey cycle'))
+
+    def test_entity_cycle_next_to_genuine_one(self):
+        # Entities only: structural; the feature's loop through them is not
+        found = run_check({
+            ORDER: [ITEM],
+            ITEM: [CART],
+            CART: [ORDER, FEATURE],
+            FEATURE: [GOAL],
+            GOAL: [ORDER],
+        })
+        self.assertEqual([item['code'] for item in found], ['circular-ref'])
+        self.assertIn(FEATURE, found[0]['message'].split(' (cycle group')[0])
+
+    def test_mutual_references_are_reported_as_pairs(self):
+        found = run_check({FEATURE: [AGENT], AGENT: [FEATURE]})
+        self.assertEqual([item['code'] for item in found], ['structural-cycle'])
+        self.assertIn('Agent-feature cycle', found[0]['message'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+"""
+drift.py on the documented layout: specs/.implemented.json keyed by paths
+from the project root ("specs/what/features/login.md").
+
+Run from the repository root:
+    python3 -m unittest discover skills/specification/tests
+"""
+
+import json
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'scripts'))
+
+from drift import check_drift, mark_implemented  # noqa: E402
+from index import get_file_hash  # noqa: E402
+
+class DriftTest(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.specs = os.path.join(tmp.name, 'specs')
+        for path in ('why/vision.md', 'what/features/login.md', 'what/features/logout.md'):
+            self.write(path, f"---\nid: {path}\n---\n# {path}\n")
+        self.implemented = os.path.join(self.specs, '.implemented.json')
+
+    def write(self, path, text):
+        full = os.path.join(self.specs, path)
+        os.makedirs(os.path.dirname(full), exist_ok=True)
+        with open(full, 'w') as f:
+            f.write(text)
+
+    def record(self, data):
+        with open(self.implemented, 'w') as f:
+            json.dump(data, f)
+
+    def hash(self, path):
+        return get_file_hash(os.path.join(self.specs, path))
+
+    def test_project_root_keys(self):
+        self.record({
+            'specs/why/vision.md': self.hash('why/vision.md')[:8],
+            'specs/what/features/login.md': {'hash': self.hash('what/features/login.md')},
+            'specs/what/features/gone.md': 'abcdef12',
+        })
+        self.write('what/features/login.md', "---\nid: login\n---\n# Changed\n")
+        report = check_drift(self.specs, use_git=False)
+        self.assertEqual(report['in_sync'], ['why/vision.md'])
+        self.assertEqual([item[0] for item in report['drifted']], ['what/features/login.md'])
+        self.assertEqual(report['unimplemented'], ['what/features/logout.md'])
+        self.assertEqual(report['missing'], ['specs/what/features/gone.md'])
+
+    def test_keys_relative_to_specs_are_read_too(self):
+        self.record({'why/vision.md': self.hash('why/vision.md')})
+        report = check_drift(self.specs, use_git=False)
+        self.assertEqual(report['in_sync'], ['why/vision.md'])
+        self.assertEqual(report['missing'], [])
+
+    def test_mark_updates_the_existing_key(self):
+        self.record({'specs/why/vision.md': 'abcdef12'})
+        updated = mark_implemented(self.specs, ['why/vision.md', 'what/features/login.md'], use_git=False)
+        self.assertEqual(sorted(updated), ['specs/what/features/login.md', 'specs/why/vision.md'])
+        with open(self.implemented) as f:
+            self.assertEqual(json.load(f), {
+                'specs/what/features/login.md': self.hash('what/features/login.md'),
+                'specs/why/vision.md': self.hash('why/vision.md'),
+            })
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+"""
+The pure-Python YAML parser (used without PyYAML) on YAML beyond the flat
+frontmatter fast path.
+
+Run from the repository root:
+    python3 -m unittest discover skills/specification/tests
+"""
+
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'scripts'))
+
+from frontmatter import YAMLError, load_yaml, load_yaml_strings, parse_frontmatter  # noqa: E402
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+# YAML text and what libyaml's BaseLoader makes of it (YAMLError: rejected)
+DIFFERENTIAL = [
+    ("a:\n  -\n  - b\n", {'a': ['', 'b']}),
+    ("a:\n-\n- b\n", {'a': ['', 'b']}),
+    ("a:\n  -\n    - b\n", {'a': [['b']]}),
+    ("- -\n- b\n", [[''], 'b']),
+    ("- - a\n  - b\n- c\n", [['a', 'b'], 'c']),
+    ("a: 'x'y\n", YAMLError),
+    ('a: "x"y\n', YAMLError),
+    ("a: 'x' y'\n", YAMLError),
+    ("a: 'x' # c\n", {'a': 'x'}),
+    ("a:\n  - 'x\n    y' z\n", YAMLError),
+    ("t: - a\n", YAMLError),
+    ("t: -\n", YAMLError),
+    ("t: [- a]\n", YAMLError),
+    ("t: -a\n", {'t': '-a'}),
+    ("a: [a,, b]\n", YAMLError),
+    ("a: [,a]\n", YAMLError),
+    ("a: {x: 1,, y: 2}\n", YAMLError),
+    ("a: [a, b,]\n", {'a': ['a', 'b']}),
+    ("a: [a, 'b'c]\n", YAMLError),
+]
+
+def parse(text):
+    return parse_frontmatter(text, use_libyaml=False)
+
+class ContinuationTest(unittest.TestCase):
+
+    def test_plain_scalar_continued_on_indented_lines(self):
+        self.assertEqual(parse("title: A long\n  title\n\n  here\nstatus: draft\n"),
+                         {'title': 'A long title\nhere', 'status': 'draft'})
+
+    def test_quoted_scalars_spanning_lines(self):
+        self.assertEqual(parse('a: "one\n  two"\nb: \'it\'\'s\n  three\'\n'),
+                         {'a': 'one two', 'b': "it's three"})
+
+    def test_continued_item_and_nested_value(self):
+        self.assertEqual(parse("refs:\n  - what/a.md\n  - long\n    name\nm:\n  k: x\n    y\n"),
+                         {'refs': ['what/a.md', 'long name'], 'm': {'k': 'x y'}})
+
+    def test_sibling_keys_are_not_continuations(self):
+        with self.assertRaises(YAMLError):
+            parse("title: x\n  nested: y\n")
+
+class FlowPairTest(unittest.TestCase):
+
+    def test_key_value_pair_in_flow_sequence(self):
+        self.assertEqual(load_yaml("a: [k: 1, \"x: y\", z]\n"), {'a': [{'k': 1}, 'x: y', 'z']})
+
+class UnsupportedTest(unittest.TestCase):
+
+    def test_anchors_aliases_and_tags_are_named(self):
+        for text, feature in (("a: &x 1\n", 'anchors'), ("a: *x\n", 'aliases'), ("a: !!str 1\n", 'tags')):
+            with self.assertRaisesRegex(YAMLError, f"unsupported YAML feature \\({feature}\\)"):
+                parse(text)
+
+class DifferentialTest(unittest.TestCase):
+
+    def check(self, load, error):
+        for text, expected in DIFFERENTIAL:
+            with self.subTest(text=text):
+                if expected is YAMLError:
+                    with self.assertRaises(error):
+                        load(text)
+                else:
+                    self.assertEqual(load(text), expected)
+
+    def test_pure_parser(self):
+        self.check(load_yaml_strings, YAMLError)
+
+    @unittest.skipUnless(yaml and hasattr(yaml, 'CBaseLoader'), "PyYAML with libyaml not installed")
+    def test_libyaml_agrees(self):
+        self.check(lambda text: yaml.load(text, Loader=yaml.CBaseLoader), yaml.YAMLError)
+
+if __name__ == '__main__':
+    unittest.main()
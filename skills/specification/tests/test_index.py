@@ -0,0 +1,138 @@
+"""
+index.py: incremental runs, patch_index and --jobs give the same index as
+a full serial rebuild, and refs resolve by path, id, basename and
+relative path.
+
+Run from the repository root:
+    python3 -m unittest discover skills/specification/tests
+"""
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'scripts'))
+
+from index import Resolver, build_index, json_default, patch_index  # noqa: E402
+from validate import validate_index  # noqa: E402
+from watch import LiveIndex  # noqa: E402
+
+SPECS = {
+    'why/vision.md': "id: V-1\ntitle: Vision\n$schema: vision\n",
+    'why/goals/growth.md': "id: G-1\ntitle: Growth\n$schema: goal\nvision: vision\n",
+    'why/personas/buyer.md': "id: P-1\ntitle: Buyer\n$schema: persona\n",
+    'what/entities/order.md': "id: E-1\ntitle: Order\n$schema: entity\n",
+    'what/features/checkout.md': ("id: F-1\ntitle: Checkout\n$schema: feature\n"
+                                  "why: [G-1, ../../why/personas/buyer.md]\nwhat: [order]\n"),
+    'what/features/refund.md': "id: F-2\ntitle: Refund\n$schema: feature\nparent: checkout\nwhy: [growth]\n",
+    'how/agents/payments.md': "id: A-1\ntitle: Payments\n$schema: agent\nimplements: [F-1, F-9]\n",
+}
+
+def write_spec(specs_dir, path, frontmatter, body=''):
+    full = os.path.join(specs_dir, path)
+    os.makedirs(os.path.dirname(full), exist_ok=True)
+    with open(full, 'w') as f:
+        f.write(f"---\n{frontmatter}---\n# {path}\n{body}")
+
+def snapshot(index):
+    """The index as written to specs-index.json, without its timestamp."""
+    data = json.loads(json.dumps(index, default=json_default))
+    data.pop('generated_at')
+    return data
+
+class IndexTest(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.specs = os.path.join(tmp.name, 'specs')
+        for path, frontmatter in SPECS.items():
+            write_spec(self.specs, path, frontmatter)
+
+    def edit(self):
+        """Body and id edits, an added spec sharing a basename, a removal and a rename. Returns the paths."""
+        write_spec(self.specs, 'what/features/checkout.md', SPECS['what/features/checkout.md'], "More text.\n")
+        write_spec(self.specs, 'why/goals/growth.md', SPECS['why/goals/growth.md'].replace('G-1', 'G-2'))
+        write_spec(self.specs, 'how/skills/order.md', "id: S-1\ntitle: Order skill\n$schema: skill\n")
+        os.unlink(os.path.join(self.specs, 'why/personas/buyer.md'))
+        shutil.move(os.path.join(self.specs, 'what/features/refund.md'),
+                    os.path.join(self.specs, 'what/features/refunds.md'))
+        return ['what/features/checkout.md', 'why/goals/growth.md', 'how/skills/order.md',
+                'why/personas/buyer.md', 'what/features/refund.md', 'what/features/refunds.md']
+
+    def test_incremental_build_matches_full_rebuild(self):
+        previous = snapshot(build_index(self.specs, use_cache=False))
+        self.edit()
+        incremental = build_index(self.specs, previous, use_cache=False)
+        self.assertEqual(snapshot(incremental), snapshot(build_index(self.specs, use_cache=False)))
+
+    def test_patch_index_matches_full_rebuild(self):
+        index = build_index(self.specs, use_cache=False)
+        changed = patch_index(index, Path(self.specs), self.edit())
+        self.assertEqual(snapshot(index), snapshot(build_index(self.specs, use_cache=False)))
+        self.assertEqual(changed, {'what/features/checkout.md', 'why/goals/growth.md', 'how/skills/order.md',
+                                   'why/personas/buyer.md', 'what/features/refund.md',
+                                   'what/features/refunds.md'})
+
+    def test_live_index_matches_full_rebuild(self):
+        live = LiveIndex(build_index(self.specs, use_cache=False), self.specs)
+        live.validate()
+        live.apply(set(self.edit()))
+        fresh = build_index(self.specs, use_cache=False)
+        self.assertEqual(snapshot(live.index), snapshot(fresh))
+        self.assertEqual(live.validate(), validate_index(fresh, self.specs, live.schemas, live.schema_error))
+
+    def test_jobs_match_serial_build(self):
+        serial = build_index(self.specs, use_cache=False)
+        self.assertEqual(snapshot(build_index(self.specs, jobs=2, use_cache=False)), snapshot(serial))
+
+    def test_refs_resolve_by_path_id_basename_and_relative_path(self):
+        index = build_index(self.specs, use_cache=False)
+        refs = {(rel['from'], rel['to']) for rel in index['relationships']['refs']}
+        self.assertLessEqual({
+            ('what/features/checkout.md', 'why/goals/growth.md'),          # id
+            ('what/features/checkout.md', 'why/personas/buyer.md'),        # ../ path
+            ('what/features/checkout.md', 'what/entities/order.md'),       # basename
+            ('how/agents/payments.md', 'what/features/checkout.md'),       # id
+            ('what/features/refund.md', 'why/goals/growth.md'),            # basename
+        }, refs)
+        self.assertIn(('how/agents/payments.md', 'F-9.md'), refs)  # unresolved: kept for Check 1
+        self.assertEqual(index['relationships']['parents'],
+                         [{'child': 'what/features/refund.md', 'parent': 'what/features/checkout.md'}])
+
+class ResolverTest(unittest.TestCase):
+
+    def resolver(self, specs):
+        return Resolver.from_specs({path: {'path': path, 'id': specs[path]} for path in sorted(specs)})
+
+    def test_duplicate_ids_and_basenames_resolve_to_nothing(self):
+        resolver = self.resolver({'what/features/a.md': 'X', 'how/agents/a.md': 'X', 'why/goals/b.md': 'G'})
+        self.assertIsNone(resolver.resolve('X.md'))
+        self.assertIsNone(resolver.resolve('a.md'))
+        self.assertEqual(resolver.resolve('how/agents/a.md'), 'how/agents/a.md')
+        self.assertEqual(resolver.resolve('G'), 'why/goals/b.md')
+        self.assertEqual(resolver.duplicate_ids(), {'X': ['how/agents/a.md', 'what/features/a.md']})
+
+    def test_relative_refs_and_type_hints(self):
+        resolver = self.resolver({'what/features/a.md': 'F-1', 'why/goals/b.md': 'G-1'})
+        self.assertEqual(resolver.resolve('../../why/goals/b.md', 'what/features/a.md'), 'why/goals/b.md')
+        self.assertEqual(resolver.resolve('./a.md', 'what/features/c.md'), 'what/features/a.md')
+        # A short name expanded with its field's directory: found there, or by id anywhere
+        self.assertEqual(resolver.resolve('why/goals/b.md'), 'why/goals/b.md')
+        self.assertEqual(resolver.resolve('how/agents/G-1.md'), 'why/goals/b.md')
+        self.assertIsNone(resolver.resolve('how/agents/b.md'))
+
+    def test_add_and_remove_keep_the_table_current(self):
+        resolver = self.resolver({'what/features/a.md': 'F-1'})
+        resolver.add({'path': 'how/agents/a.md', 'id': 'F-1'})
+        self.assertTrue(resolver.settle())
+        self.assertIsNone(resolver.resolve('F-1'))
+        resolver.remove({'path': 'how/agents/a.md', 'id': 'F-1'})
+        self.assertEqual(resolver.resolve('F-1'), 'what/features/a.md')
+
+if __name__ == '__main__':
+    unittest.main()
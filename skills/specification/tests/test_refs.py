@@ -0,0 +1,95 @@
+"""
+Reference fields: every ref a shipped schema declares reaches the index,
+so Check 1 (broken refs) and Check 7 (cycles) see it.
+
+Run from the repository root:
+    python3 -m unittest discover skills/specification/tests
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+SKILL_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(SKILL_DIR / 'scripts'))
+
+from index import REF_FIELDS, build_index, extract_all_refs  # noqa: E402
+from schema import resolve_schemas  # noqa: E402
+from validate import check_broken_refs, check_cycles  # noqa: E402
+
+def declared_refs(rule, path, found):
+    """Add the field paths of the ref rules in a flattened schema rule to found."""
+    if not isinstance(rule, dict):
+        return
+    if rule.get('type') == 'ref':
+        found.add(path)
+    if 'items' in rule:
+        declared_refs(rule['items'], path, found)
+    fields = rule.get('fields')
+    for name, sub in (fields.items() if isinstance(fields, dict) else ()):
+        declared_refs(sub, path + (name,), found)
+    for variant in rule.get('variants') or ():
+        declared_refs(variant, path, found)
+
+def write_spec(specs_dir, path, frontmatter):
+    full = os.path.join(specs_dir, path)
+    os.makedirs(os.path.dirname(full), exist_ok=True)
+    with open(full, 'w') as f:
+        f.write(f"---\n{frontmatter}---\n# {path}\n")
+
+class RefFieldsTest(unittest.TestCase):
+
+    def test_every_schema_ref_is_a_ref_field(self):
+        found = set()
+        for schema in resolve_schemas(SKILL_DIR / 'schemas').values():
+            for name, rule in schema['fields'].items():
+                declared_refs(rule, (name,), found)
+        for path in sorted(found):
+            fields = REF_FIELDS
+            for name in path[:-1]:
+                fields = fields.get(name)
+                self.assertIsInstance(fields, dict, f"{'.'.join(path)} is not in REF_FIELDS")
+            self.assertIn(path[-1], fields, f"{'.'.join(path)} is not in REF_FIELDS")
+
+    def test_supersedes_and_superseded_by(self):
+        self.assertEqual(extract_all_refs({'supersedes': 'old-auth', 'superseded_by': ['new-auth']}),
+                         ['why/decisions/new-auth.md', 'why/decisions/old-auth.md'])
+
+    def test_workflow_trigger_initiated_by(self):
+        self.assertEqual(extract_all_refs({'trigger': {'type': 'manual', 'initiated_by': 'reviewer'}}),
+                         ['how/agents/reviewer.md'])
+        self.assertEqual(extract_all_refs({'trigger': 'manual'}), [])
+
+    def test_entity_relationships(self):
+        frontmatter = {'relationships': [{'entity': 'order', 'cardinality': 'many'}, 'not-an-object',
+                                         {'entity': 'what/entities/user.md'}]}
+        self.assertEqual(extract_all_refs(frontmatter), ['what/entities/order.md', 'what/entities/user.md'])
+
+class NestedRefChecksTest(unittest.TestCase):
+
+    def test_broken_and_circular_nested_refs_are_reported(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            specs_dir = os.path.join(tmp, 'specs')
+            write_spec(specs_dir, 'why/decisions/new-auth.md', "id: new-auth\nsupersedes: old-auth\n")
+            write_spec(specs_dir, 'how/workflows/release.md',
+                       "id: release\ntrigger:\n  type: manual\n  initiated_by: missing-agent\n")
+            write_spec(specs_dir, 'what/features/checkout.md', "id: checkout\nhow: [how/agents/payments.md]\n")
+            write_spec(specs_dir, 'how/agents/payments.md', "id: payments\nimplements: [what/features/checkout.md]\n")
+            write_spec(specs_dir, 'what/entities/order.md', "id: order\nrelationships:\n  - entity: cart\n")
+            write_spec(specs_dir, 'what/entities/cart.md', "id: cart\nrelationships:\n  - entity: order\n")
+            index = build_index(specs_dir, use_cache=False)
+
+        broken = []
+        check_broken_refs(index, broken.append)
+        self.assertEqual(sorted(item['path'] for item in broken),
+                         ['how/workflows/release.md', 'why/decisions/new-auth.md'])
+
+        cycles = []
+        check_cycles(index, cycles.append)
+        self.assertIn(['what/entities/cart.md', 'what/entities/order.md'],
+                      [sorted([item['path']] + item['related']) for item in cycles])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,126 @@
+"""
+The schema engine (schema.py: $extends/$imports resolution, compiled field
+checks) and section validation (sections.py).
+
+Run from the repository root:
+    python3 -m unittest discover skills/specification/tests
+"""
+
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+SKILL_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(SKILL_DIR / 'scripts'))
+
+from schema import compile_rule, compile_schema, resolve_schemas, validate_frontmatter  # noqa: E402
+from sections import compile_sections, parse_sections, top_sections, validate_sections  # noqa: E402
+
+FEATURE = {
+    '$schema': 'feature', 'id': 'FEAT-001', 'title': 'Checkout', 'status': 'active',
+    'version': '1.0.0', 'priority': 'high',
+}
+
+FEATURE_BODY = b"""# Checkout
+
+## Context
+
+Buyers pay for their cart.
+
+## Goals
+
+- MUST take cards
+
+## Rules and Scenarios
+
+### Rule: card payment
+
+- Given a cart, when paying, then an order exists
+
+```
+## Not a heading
+```
+"""
+
+class SchemaTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.schemas = resolve_schemas(SKILL_DIR / 'schemas')
+        cls.feature = compile_schema(cls.schemas['feature'])
+
+    def test_extends_and_imports_are_resolved(self):
+        fields = self.schemas['feature']['fields']
+        self.assertTrue(fields['id']['required'])                     # from _base/entity
+        self.assertEqual(fields['priority']['type'], 'enum')          # Priority from common
+        self.assertIn('active', fields['status']['values'])           # overridden by feature
+
+    def test_valid_feature(self):
+        self.assertEqual(validate_frontmatter(self.feature, FEATURE), [])
+
+    def test_field_messages(self):
+        frontmatter = dict(FEATURE, id='checkout', priority='urgent')
+        del frontmatter['title']
+        self.assertEqual(validate_frontmatter(self.feature, frontmatter), [
+            "'id' does not match ^[A-Z]+-\\d{3}$",
+            "missing required field 'title'",
+            "'priority' 'urgent' is not one of [critical, high, medium, low]",
+        ])
+
+    def test_cache_dir_reuses_resolved_schemas(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            first = resolve_schemas(SKILL_DIR / 'schemas', cache_dir)
+            self.assertTrue((Path(cache_dir) / 'schemas.json').exists())
+            self.assertEqual(resolve_schemas(SKILL_DIR / 'schemas', cache_dir), first)
+
+class RuleTest(unittest.TestCase):
+
+    def test_list_bounds_and_items(self):
+        check = compile_rule({'type': 'list', 'items': {'type': 'integer'}, 'min': 1, 'max': 2})
+        self.assertIsNone(check(['1', '2']))
+        self.assertEqual(check([]), "needs at least 1 item(s)")
+        self.assertEqual(check(['1', '2', '3']), "allows at most 2 item(s)")
+        self.assertEqual(check(['1', 'x']), "item 2 expected integer")
+        self.assertIsNone(check('7'))   # a single value counts as a one-item list
+
+    def test_number_range_and_const(self):
+        self.assertEqual(compile_rule({'type': 'number', 'min': 0, 'max': 1})('1.5'), "must be between 0 and 1")
+        self.assertEqual(compile_rule({'type': 'string', 'const': 'goal'})('vision'), "must be 'goal'")
+
+    def test_union_by_type_tag(self):
+        check = compile_rule({'type': 'union', 'variants': [
+            {'tag': 'manual', 'fields': {'initiated_by': {'type': 'ref', 'required': True}}},
+            {'tag': 'schedule', 'fields': {'cron': {'type': 'string'}}},
+        ]})
+        self.assertIsNone(check({'$type': 'schedule', 'cron': '0 * * * *'}))
+        self.assertEqual(check({'$type': 'manual'}), "missing 'initiated_by'")
+        self.assertEqual(check({'$type': 'event'}), "$type 'event' is not one of [manual, schedule]")
+        self.assertEqual(check('manual'), "expected an object with $type one of [manual, schedule]")
+
+class SectionTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.compiled = compile_sections(resolve_schemas(SKILL_DIR / 'schemas')['feature']['sections'])
+
+    def test_tree_skips_fenced_headings(self):
+        tree = parse_sections(FEATURE_BODY)
+        self.assertEqual([node['heading'] for node in tree[0]['sections']],
+                         ['Context', 'Goals', 'Rules and Scenarios'])
+        rule = tree[0]['sections'][2]['sections'][0]
+        self.assertEqual((rule['heading'], rule['items']), ('Rule: card payment', 1))
+        self.assertEqual(FEATURE_BODY[rule['start']:rule['body']], b"### Rule: card payment\n")
+
+    def test_valid_body(self):
+        self.assertEqual(validate_sections(self.compiled, top_sections(parse_sections(FEATURE_BODY))), [])
+
+    def test_missing_and_empty_sections(self):
+        body = FEATURE_BODY.replace(b"- MUST take cards\n", b"").replace(b"### Rule: card payment", b"### Notes")
+        self.assertEqual(validate_sections(self.compiled, top_sections(parse_sections(body))), [
+            "section 'Goals' needs at least 1 list item(s)",
+            "missing section 'Rule: *' under 'Rules and Scenarios'",
+        ])
+
+if __name__ == '__main__':
+    unittest.main()
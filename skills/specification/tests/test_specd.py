@@ -0,0 +1,82 @@
+"""
+specd.py: argument checks, the client's fallback when the daemon does not
+answer, and the daemon's recovery when patching the live index fails.
+
+Run from the repository root:
+    python3 -m unittest discover skills/specification/tests
+"""
+
+import io
+import os
+import socket
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'scripts'))
+
+from index import build_index, write_index  # noqa: E402
+from specd import LocalState, apply_changes, query, request, run_op, socket_path  # noqa: E402
+from watch import RESCAN, LiveIndex  # noqa: E402
+
+SPECS = {
+    'why/goals/growth.md': "id: GOAL-001\ntitle: Grow revenue\n$schema: goal\n",
+    'what/features/checkout.md': "id: FEAT-001\ntitle: Checkout\n$schema: feature\nwhy: [GOAL-001]\n",
+}
+
+class SpecdTest(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.specs = os.path.join(tmp.name, 'specs')
+        for path, frontmatter in SPECS.items():
+            self.write(path, frontmatter)
+        write_index(build_index(self.specs, use_cache=False), self.specs)
+
+    def write(self, path, frontmatter):
+        full = os.path.join(self.specs, path)
+        os.makedirs(os.path.dirname(full), exist_ok=True)
+        with open(full, 'w') as f:
+            f.write(f"---\n{frontmatter}---\n# {path}\n")
+
+    def test_argument_types(self):
+        state = LocalState(self.specs)
+        self.assertEqual(run_op(state, 'impact', {'specs': ['why/goals/growth']})['result'],
+                         [(1, 'what/features/checkout.md')])
+        for op, args, name in [('impact', {'specs': 'why/goals/growth'}, 'specs'),
+                               ('impact', {'specs': [1]}, 'specs'),
+                               ('impact', {'specs': ['why/goals/growth'], 'depth': '2'}, 'depth'),
+                               ('search', {'query': 'checkout', 'limit': True}, 'limit'),
+                               ('refs-to', {'spec': ['checkout']}, 'spec')]:
+            self.assertIn(f"Invalid argument '{name}'", run_op(state, op, args).get('error', ''))
+
+    def test_unanswered_request_falls_back_to_local(self):
+        os.makedirs(os.path.dirname(socket_path(self.specs)), exist_ok=True)
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.addCleanup(server.close)
+        server.bind(socket_path(self.specs))
+        server.listen()  # accepts connections, never answers
+
+        self.assertIn('No answer from', request(self.specs, 'stats', timeout=0.1)['error'])
+        self.assertEqual(query(self.specs, 'stats', timeout=0.1)['result']['total'], 2)
+
+    def test_failed_patch_falls_back_to_rescan(self):
+        live = LiveIndex(build_index(self.specs, use_cache=False), self.specs)
+        apply = live.apply
+
+        def failing_apply(changed):
+            if RESCAN not in changed:
+                raise RuntimeError('patch failed')
+            return apply(changed)
+
+        live.apply = failing_apply
+        self.write('what/features/refund.md', "id: FEAT-002\ntitle: Refunds\n$schema: feature\n")
+        log = io.StringIO()
+        self.assertEqual(apply_changes(live, {'what/features/refund.md'}, log), {'rescan'})
+        self.assertIn('what/features/refund.md', live.index['specs'])
+        self.assertIn('patch failed', log.getvalue())
+
+if __name__ == '__main__':
+    unittest.main()
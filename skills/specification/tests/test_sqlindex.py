@@ -0,0 +1,92 @@
+"""
+specs-index.sqlite (sqlindex.py) and the full-text search index (search.py).
+
+Run from the repository root:
+    python3 -m unittest discover skills/specification/tests
+"""
+
+import os
+import sqlite3
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'scripts'))
+
+from index import build_index, write_index  # noqa: E402
+from search import search_specs, update_search  # noqa: E402
+from sqlindex import query  # noqa: E402
+
+SPECS = {
+    'why/goals/growth.md': ("id: GOAL-001\ntitle: Grow revenue\n$schema: goal\nstatus: active\n",
+                            "## Context\n\nMore paying customers.\n"),
+    'what/features/checkout.md': ("id: FEAT-001\ntitle: Checkout\n$schema: feature\nstatus: active\n"
+                                  "priority: high\nwhy: [GOAL-001]\n",
+                                  "## Rule: card payment\n\n- Given a cart, pay by card\n"),
+    'what/features/refund.md': ("id: FEAT-002\ntitle: Refunds\n$schema: feature\nstatus: draft\n"
+                                "priority: low\nwhy: [GOAL-001]\nparent: checkout\n",
+                                "## Context\n\nReturn card payments to customers.\n"),
+}
+
+def fts5_available():
+    try:
+        sqlite3.connect(':memory:').execute('CREATE VIRTUAL TABLE t USING fts5(x)')
+        return True
+    except sqlite3.OperationalError:
+        return False
+
+class SqliteIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.specs = os.path.join(tmp.name, 'specs')
+        for path in SPECS:
+            self.write(path)
+
+    def write(self, path, body=None):
+        frontmatter, default_body = SPECS[path]
+        full = os.path.join(self.specs, path)
+        os.makedirs(os.path.dirname(full), exist_ok=True)
+        with open(full, 'w') as f:
+            f.write(f"---\n{frontmatter}---\n# {path}\n\n{default_body if body is None else body}")
+
+    def test_tables(self):
+        write_index(build_index(self.specs, use_cache=False), self.specs, sqlite=True)
+        self.assertEqual(query(self.specs, "SELECT source FROM refs WHERE target = ? ORDER BY source",
+                               ['why/goals/growth.md']),
+                         [{'source': 'what/features/checkout.md'}, {'source': 'what/features/refund.md'}])
+        self.assertEqual(query(self.specs, "SELECT child, parent FROM parents"),
+                         [{'child': 'what/features/refund.md', 'parent': 'what/features/checkout.md'}])
+        self.assertEqual(query(self.specs, "SELECT path FROM specs WHERE json_extract(frontmatter, '$.priority') = ?",
+                               ['high']), [{'path': 'what/features/checkout.md'}])
+        self.assertEqual(query(self.specs, "SELECT path FROM sections WHERE heading LIKE 'Rule:%'"),
+                         [{'path': 'what/features/checkout.md'}])
+        self.assertEqual({row['state'] for row in query(self.specs, "SELECT state FROM drift")}, {'unimplemented'})
+
+    @unittest.skipUnless(fts5_available(), "SQLite built without FTS5")
+    def test_search(self):
+        index = build_index(self.specs, use_cache=False)
+        write_index(index, self.specs)
+        update_search(index, self.specs)
+
+        def paths(text):
+            return [hit['path'] for hit in search_specs(self.specs, text)]
+
+        self.assertEqual(paths('checkout'), ['what/features/checkout.md', 'what/features/refund.md'])  # title first
+        self.assertEqual(paths('refu'), ['what/features/refund.md'])             # prefix
+        self.assertEqual(sorted(paths('card')), ['what/features/checkout.md', 'what/features/refund.md'])
+        self.assertEqual(paths('card status:draft'), ['what/features/refund.md'])
+        self.assertEqual(paths('card -priority:low'), ['what/features/checkout.md'])
+        self.assertEqual(paths('"paying customers"'), ['why/goals/growth.md'])
+        self.assertEqual(paths('type:feature'), ['what/features/checkout.md', 'what/features/refund.md'])
+
+        # A rewritten index is picked up by the next query
+        self.write('why/goals/growth.md', "## Context\n\nRetain subscribers.\n")
+        write_index(build_index(self.specs, index, use_cache=False), self.specs)
+        self.assertEqual(paths('subscribers'), ['why/goals/growth.md'])
+        self.assertEqual(paths('"paying customers"'), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+"""
+stats.py gives the counts the old stats.sh gave: layers count every .md
+file under why/, what/ and how/, large specs every .md file over 150 lines
+under specs/, missing $schema every layer file without a $schema: line.
+
+Run from the repository root:
+    python3 -m unittest discover skills/specification/tests
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'scripts'))
+
+from stats import compute_stats, load_index, unindexed_files  # noqa: E402
+
+LONG = 'line\n' * 160
+
+FILES = {
+    'why/vision.md': "---\n$schema: vision\nid: V-1\nstatus: active\n---\n# Vision\n",
+    'why/goals/growth.md': "---\n$schema: goal\nid: G-1\nstatus: draft\nvision: vision\n---\n# Growth\n",
+    'what/features/checkout.md': f"---\n$schema: feature\nid: F-1\nstatus: active\n---\n# Checkout\n{LONG}",
+    'what/features/untyped.md': "---\nid: F-2\nstatus: active\nwhy: [growth]\n---\n# Untyped\n",
+    'what/notes.md': f"# Notes without frontmatter\n{LONG}",
+    'how/readme.md': "# How without frontmatter\n",
+    'README.md': f"# Outside the layers\n{LONG}",
+}
+
+class StatsTest(unittest.TestCase):
+
+    def test_counts_match_stats_sh(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            specs_dir = os.path.join(tmp, 'specs')
+            for path, text in FILES.items():
+                os.makedirs(os.path.dirname(os.path.join(specs_dir, path)), exist_ok=True)
+                with open(os.path.join(specs_dir, path), 'w') as f:
+                    f.write(text)
+            index = load_index(specs_dir)
+            stats = compute_stats(index, unindexed_files(index, specs_dir))
+
+        self.assertEqual(stats['by_layer'], {'why': 2, 'what': 3, 'how': 1})
+        self.assertEqual(stats['total'], 6)
+        self.assertEqual(stats['by_type'], {'vision': 1, 'goal': 1, 'feature': 1})
+        self.assertEqual(stats['by_status'], {'draft': 1, 'active': 3})
+        self.assertEqual(stats['large'], ['README.md', 'what/features/checkout.md', 'what/notes.md'])
+        self.assertEqual(stats['missing_schema'], ['how/readme.md', 'what/features/untyped.md', 'what/notes.md'])
+        self.assertEqual(stats['orphans'], ['what/features/checkout.md', 'what/features/untyped.md'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+"""
+suggest.py: "did you mean" suggestions for broken refs.
+
+Run from the repository root:
+    python3 -m unittest discover skills/specification/tests
+"""
+
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'scripts'))
+
+from suggest import Suggester, TrigramIndex  # noqa: E402
+from validate import check_broken_refs  # noqa: E402
+
+SPECS = {
+    'what/features/checkout.md': {'id': 'FEAT-001', 'title': 'Checkout'},
+    'what/features/user-login.md': {'id': 'FEAT-002', 'title': 'User login'},
+    'what/entities/order.md': {'id': 'ENT-001', 'title': 'Order'},
+    'how/agents/order.md': {'id': 'AGEN-001', 'title': 'Order intake'},
+    'why/goals/growth.md': {'id': 'GOAL-001', 'title': 'Grow revenue'},
+}
+
+class SuggestTest(unittest.TestCase):
+
+    def setUp(self):
+        self.trigrams = TrigramIndex.from_specs(SPECS)
+
+    def test_typos_and_other_spellings(self):
+        self.assertEqual(self.trigrams.search('what/features/chekout.md', 1), ['what/features/checkout.md'])
+        self.assertEqual(self.trigrams.search('user_login', 1), ['what/features/user-login.md'])
+        self.assertEqual(self.trigrams.search('FEAT-02', 1), ['what/features/user-login.md'])
+        self.assertEqual(self.trigrams.search('grow revenu', 1), ['why/goals/growth.md'])
+
+    def test_same_name_prefers_the_nearer_directory(self):
+        self.assertEqual(self.trigrams.search('how/agents/ordr.md', 2), ['how/agents/order.md', 'what/entities/order.md'])
+        self.assertEqual(self.trigrams.search('what/entities/ordr.md', 2),
+                         ['what/entities/order.md', 'how/agents/order.md'])
+
+    def test_titles_count_only_in_the_ref_type_directory(self):
+        specs = dict(SPECS, **{'how/agents/sync.md': {'id': 'AGEN-157', 'title': 'Product sync'},
+                               'what/entities/price.md': {'id': 'ENT-021', 'title': 'Product 21'}})
+        trigrams = TrigramIndex.from_specs(specs)
+        self.assertEqual(trigrams.search('what/missing/product-21.md'), [])
+        self.assertEqual(trigrams.search('what/entities/product-21.md', 1), ['what/entities/price.md'])
+        self.assertEqual(trigrams.search('product 21', 1), ['what/entities/price.md'])
+
+    def test_file_name_outranks_equal_title(self):
+        specs = {'what/features/refunds.md': {'id': 'FEAT-001', 'title': 'Payments'},
+                 'what/features/payments.md': {'id': 'FEAT-002', 'title': 'Refunds'}}
+        self.assertEqual(TrigramIndex.from_specs(specs).search('refund', 2),
+                         ['what/features/refunds.md', 'what/features/payments.md'])
+
+    def test_nothing_close_enough(self):
+        self.assertEqual(self.trigrams.search('zzqx'), [])
+        self.assertEqual(self.trigrams.search(''), [])
+
+    def test_suggester_excludes_the_referring_spec_and_follows_changes(self):
+        specs = dict(SPECS)
+        suggest = Suggester(specs, k=1)
+        self.assertEqual(suggest('checkout2', exclude='what/features/checkout.md'), [])
+        self.assertEqual(suggest('checkout2'), ['what/features/checkout.md'])
+
+        del specs['what/features/checkout.md']
+        specs['what/features/checkouts.md'] = {'id': 'FEAT-009', 'title': 'Checkouts'}
+        suggest.refresh(specs, ['what/features/checkout.md', 'what/features/checkouts.md'])
+        self.assertEqual(suggest('checkout2'), ['what/features/checkouts.md'])
+
+    def test_broken_ref_message_names_suggestions(self):
+        index = {'specs': {path: dict(entry, path=path) for path, entry in SPECS.items()},
+                 'relationships': {'refs': [{'from': 'why/goals/growth.md', 'to': 'what/features/chekout.md'}]}}
+        found = []
+        check_broken_refs(index, found.append, Suggester(index['specs']))
+        self.assertEqual(len(found), 1)
+        self.assertIn('what/features/checkout.md', found[0]['message'])
+
+if __name__ == '__main__':
+    unittest.main()